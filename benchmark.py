@@ -0,0 +1,210 @@
+try:
+    import argparse
+except ImportError as e:
+    print("Error importing argparse: {}".format(e))
+try:
+    import os
+except ImportError as e:
+    print("Error importing os: {}".format(e))
+try:
+    import time
+except ImportError as e:
+    print("Error importing time: {}".format(e))
+try:
+    import sys
+except ImportError as e:
+    print("Error importing sys: {}".format(e))
+try:
+    import subprocess
+except ImportError as e:
+    print("Error importing subprocess: {}".format(e))
+try:
+    import statistics
+except ImportError as e:
+    print("Error importing statistics: {}".format(e))
+try:
+    from spellchecker import Suggester, SUGGEST_BACKENDS, build_suggest_index, report_suggest_index, load_files
+    from spellchecker import Spellchecker, CaseTable
+except ImportError as e:
+    print("Error importing spellchecker: {}".format(e))
+
+#misspellings from example.txt, plus common short typos
+default_queries = ["waht", "teh", "ekeven", "ta", "grascvd", "ankjv", "recieve", "definately", "wierd",
+                   "becuase", "thier", "untill", "occured", "seperate", "adress"]
+
+def time_suggestions(known_words, queries, index=None, repeat=1):
+    """
+    Times Suggester.get_suggestions over a list of misspellings.
+
+    Arguments:
+    -known_words (set): set of known words
+    -queries (list): list of misspellings
+    -index (optional): suggestion index, as returned by build_suggest_index.
+     Defaulted to None (full scan).
+    -repeat (int, optional): number of passes over queries. Defaulted to 1.
+
+    Returns:
+    -tuple: (average seconds per query, list of suggestions for each query)
+    """
+    results = []
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        results = [Suggester.get_suggestions(query, known_words, index) for query in queries]
+    elapsed = time.perf_counter()-start_time
+    return elapsed/(len(queries)*repeat), results
+
+def bench_suggesters(known_words, queries, backends, repeat=1):
+    """
+    Compares suggestion backends against the full scan, printing build time,
+    per-query latency, speedup and whether results match the full scan.
+
+    Arguments:
+    -known_words (set): set of known words
+    -queries (list): list of misspellings
+    -backends (list): names of backends, from SUGGEST_BACKENDS
+    -repeat (int, optional): number of passes over queries. Defaulted to 1.
+
+    Returns:
+    -None
+    """
+    scan_time, scan_results = time_suggestions(known_words, queries)
+    print("{:<10} {:>12.3f} ms/query".format("scan", scan_time*1000))
+    for backend in backends:
+        index = build_suggest_index(backend, known_words)
+        print(report_suggest_index(backend, index))
+        index_time, index_results = time_suggestions(known_words, queries, index, repeat)
+        matches = sum(1 for a, b in zip(scan_results, index_results) if a == b)
+        print("{:<10} {:>12.3f} ms/query  {:>8.1f}x  {}/{} match scan".format(
+            backend, index_time*1000, scan_time/index_time if index_time else float("inf"),
+            matches, len(queries)))
+
+def sample_tokens(known_words, queries, step=37):
+    """
+    Builds tokens as they appear in text: every step-th known word, lowercase,
+    capitalized and in all caps, followed by the misspellings.
+
+    Arguments:
+    -known_words (set): set of known words
+    -queries (list): list of misspellings
+    -step (int, optional): sampling step over sorted known words. Defaulted to 37.
+
+    Returns:
+    -list: list of tokens
+    """
+    tokens = []
+    for word in sorted(known_words)[::step]:
+        tokens.extend((word, word.capitalize(), word.upper()))
+    return tokens+list(queries)
+
+def bench_token_checks(known_words, tokens, repeat=1):
+    """
+    Compares the per-token known-word check with known words in a set (lowercase
+    lookup, then as typed) against a CaseTable (one lookup), printing the cost per
+    token and whether both agree on every token.
+
+    Arguments:
+    -known_words (set): set of known words
+    -tokens (list): list of tokens, as typed
+    -repeat (int, optional): number of passes over tokens. Defaulted to 1.
+
+    Returns:
+    -None
+    """
+    results = {}
+    for name, store in (("set", known_words), ("case", CaseTable(known_words))):
+        checker = Spellchecker(None, None, None, None, known_words=store)
+        check_token = checker.get_token_check()
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            known = [check_token(token) for token in tokens]
+        elapsed = time.perf_counter()-start_time
+        results[name] = (elapsed/(len(tokens)*repeat), known)
+        print("{:<10} {:>12.1f} ns/token  {} known of {}".format(
+            name, results[name][0]*1e9, sum(known), len(tokens)))
+    agree = sum(1 for a, b in zip(results["set"][1], results["case"][1]) if a == b)
+    print("case table {:.1f}x faster, {}/{} tokens agree".format(
+        results["set"][0]/results["case"][0], agree, len(tokens)))
+
+#optional dependencies that should only be imported when used
+lazy_modules = ["bs4", "fitz", "docx", "fuzzywuzzy", "googletrans", "Levenshtein", "numpy", "tkinter"]
+
+def import_times(folder):
+    """
+    Imports spellchecker in a new interpreter, with -X importtime.
+
+    Arguments:
+    -folder (str): folder of spellchecker.py
+
+    Returns:
+    -list: (self microseconds, cumulative microseconds, depth, module) tuples, in
+     import order (depth 0 is spellchecker itself, 1 its direct imports)
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "import spellchecker"], cwd=folder,
+                               capture_output=True, text=True)
+    times = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name)-len(name.lstrip())-1)//2
+        times.append((int(self_time), int(cumulative), depth, name.strip()))
+    return times
+
+def bench_imports(folder, words_file, repeat=5, top=8):
+    """
+    Reports the cost of starting spellchecker: import time of spellchecker (-X
+    importtime, median of repeat runs), its slowest direct imports, any of
+    lazy_modules imported at startup, and the wall time of a plain-text 'check'.
+
+    Arguments:
+    -folder (str): folder of spellchecker.py
+    -words_file (str): path to known words file, for the 'check' run
+    -repeat (int, optional): number of runs. Defaulted to 5.
+    -top (int, optional): number of direct imports listed. Defaulted to 8.
+
+    Returns:
+    -None
+    """
+    runs = [import_times(folder) for _ in range(repeat)]
+    totals = [next(cumulative for self_time, cumulative, depth, name in times if name == "spellchecker")
+              for times in runs]
+    print("import spellchecker: {:.1f} ms (median of {})".format(statistics.median(totals)/1000, repeat))
+    direct = sorted((item for item in runs[-1] if item[2] == 1), key=lambda item: -item[1])
+    for self_time, cumulative, depth, name in direct[:top]:
+        print("  {:<28} {:>8.1f} ms".format(name, cumulative/1000))
+    imported = sorted(set(item[3].split(".")[0] for times in runs for item in times) & set(lazy_modules))
+    print("optional modules imported at startup: {}".format(", ".join(imported) or "none"))
+    example = os.path.join(folder, "example.txt")
+    elapsed = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "spellchecker", "--words", words_file, "check", example],
+                       cwd=folder, capture_output=True)
+        elapsed.append(time.perf_counter()-start_time)
+    print("check example.txt: {:.0f} ms wall (median of {})".format(statistics.median(elapsed)*1000, repeat))
+
+if __name__ == "__main__":
+    default_folder = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Benchmark suggestion backends")
+    parser.add_argument("--words", type=str, default=os.path.join(default_folder, "words.txt"),
+                        help="Path to known words file")
+    parser.add_argument("--backends", type=str, nargs="+", default=sorted(SUGGEST_BACKENDS),
+                        choices=sorted(SUGGEST_BACKENDS), help="Suggestion backends to compare against the full scan")
+    parser.add_argument("--queries", type=str, nargs="+", default=default_queries, help="Misspellings to look up")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the queries, per backend")
+    parser.add_argument("--tokens", action="store_true",
+                        help="Benchmark per-token known-word checks (set against case table) instead of suggestions")
+    parser.add_argument("--imports", action="store_true",
+                        help="Report import time of spellchecker (-X importtime) and cold start of a plain-text check")
+    args = parser.parse_args()
+
+    if args.imports:
+        bench_imports(default_folder, args.words, args.repeat)
+        sys.exit(0)
+
+    known_words = load_files(args.words)
+    print("{} known words from {}".format(len(known_words), args.words))
+    if args.tokens:
+        bench_token_checks(known_words, sample_tokens(known_words, args.queries), args.repeat)
+    else:
+        bench_suggesters(known_words, args.queries, args.backends, args.repeat)
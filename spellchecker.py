@@ -1,55 +1,177 @@
-try:    
-    from bs4 import BeautifulSoup
+try:
+    import importlib
 except ImportError as e:
-    print("Error importing BeautifulSoup: {}".format(e))
+    print("Error importing importlib: {}".format(e))
 try:
-    import fitz
+    import re
 except ImportError as e:
-    print("Error importing fitz: {}".format(e))
+    print("Error importing re: {}".format(e))
 try:
-    from docx import Document
+    import time
 except ImportError as e:
-    print("Error importing Document: {}".format(e))
+    print("Error importing time: {}".format(e))
 try:
-    import tkinter as tk
+    import threading
 except ImportError as e:
-    print("Error importing tkinter: {}".format(e))
+    print("Error importing threading: {}".format(e))
 try:
-    from tkinter import filedialog
+    import os
 except ImportError as e:
-    print("Error importing filedialog: {}".format(e))
+    print("Error importing os: {}".format(e))
 try:
-    import re
+    import argparse
 except ImportError as e:
-    print("Error importing re: {}".format(e))
+    print("Error importing argparse: {}".format(e))
 try:
-    import time
+    import bisect
 except ImportError as e:
-    print("Error importing time: {}".format(e))
+    print("Error importing bisect: {}".format(e))
 try:
-    import Levenshtein
+    import sys
 except ImportError as e:
-    print("Error importing Levenshtein: {}".format(e))
+    print("Error importing sys: {}".format(e))
 try:
-    import threading
+    import heapq
 except ImportError as e:
-    print("Error importing threading: {}".format(e))
+    print("Error importing heapq: {}".format(e))
 try:
-    import os
+    from collections import OrderedDict, Counter, deque
 except ImportError as e:
-    print("Error importing os: {}".format(e))
+    print("Error importing OrderedDict: {}".format(e))
 try:
-    from fuzzywuzzy import process
+    from array import array
 except ImportError as e:
-    print("Error importing process: {}".format(e))
+    print("Error importing array: {}".format(e))
 try:
-    from googletrans import Translator, LANGUAGES
+    import atexit
 except ImportError as e:
-    print("Error importing Translator: {}".format(e))
+    print("Error importing atexit: {}".format(e))
 try:
-    import argparse
+    import weakref
 except ImportError as e:
-    print("Error importing argparse: {}".format(e))
+    print("Error importing weakref: {}".format(e))
+try:
+    import hashlib
+except ImportError as e:
+    print("Error importing hashlib: {}".format(e))
+try:
+    import math
+except ImportError as e:
+    print("Error importing math: {}".format(e))
+try:
+    import mmap
+except ImportError as e:
+    print("Error importing mmap: {}".format(e))
+try:
+    import struct
+except ImportError as e:
+    print("Error importing struct: {}".format(e))
+try:
+    import glob
+except ImportError as e:
+    print("Error importing glob: {}".format(e))
+try:
+    import json
+except ImportError as e:
+    print("Error importing json: {}".format(e))
+try:
+    import csv
+except ImportError as e:
+    print("Error importing csv: {}".format(e))
+try:
+    import contextlib
+except ImportError as e:
+    print("Error importing contextlib: {}".format(e))
+
+#imported by load_tkinter, only when the window is opened ('check' runs without them)
+tk = None
+filedialog = None
+
+class LazyImport():
+    """
+    Stands in for an optional or slow-to-import module (or a name from one) until
+    it is first used, so starting up, and checking plain text, never pays for
+    parsers and features that are not used. On first use, the module is imported
+    and put in place of the LazyImport in this module's globals, so later uses
+    cost nothing extra.
+
+    Attributes:
+    -global_name (str): name of the global this stands in for
+    -module_name (str): module to import
+    -attribute (str/None): name to take from the module, or None for the module
+    -feature (str): what needs the module, for the error message
+    -package (str): what to install, for the error message
+
+    Methods:
+    -load(): imports the module, raising ImportError (naming the feature and
+     package) if it is not installed
+    """
+    def __init__(self, global_name, module_name, attribute=None, feature=None, package=None):
+        self.global_name = global_name
+        self.module_name = module_name
+        self.attribute = attribute
+        self.feature = feature or module_name
+        self.package = package or module_name
+
+    def load(self):
+        """
+        Imports the module (once), and replaces this placeholder with it.
+
+        Returns:
+        -module/object: the module, or the name taken from it
+
+        Raises:
+        -ImportError: if the module is not installed
+        """
+        try:
+            value = importlib.import_module(self.module_name)
+            if self.attribute is not None:
+                value = getattr(value, self.attribute)
+        except ImportError as e:
+            raise ImportError("{} is needed for {}; install it with 'pip install {}' ({})".format(
+                self.module_name, self.feature, self.package, e))
+        if globals().get(self.global_name) is self:
+            globals()[self.global_name] = value
+        return value
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+def module_available(module):
+    """
+    Checks whether an optional module can be used, importing it if it is still a
+    LazyImport.
+
+    Arguments:
+    -module (module/LazyImport/None): the module's global
+
+    Returns:
+    -bool: True if the module is imported or importable
+    """
+    if isinstance(module, LazyImport):
+        try:
+            module.load()
+        except ImportError:
+            return False
+    return module is not None
+
+#optional dependencies (and slow imports), each imported on first use (see LazyImport)
+BeautifulSoup = LazyImport("BeautifulSoup", "bs4", "BeautifulSoup", "HTML files", "beautifulsoup4")
+fitz = LazyImport("fitz", "fitz", None, "PDF files", "PyMuPDF")
+Document = LazyImport("Document", "docx", "Document", ".docx files", "python-docx")
+Levenshtein = LazyImport("Levenshtein", "Levenshtein", None, "suggestions", "Levenshtein")
+process = LazyImport("process", "fuzzywuzzy.process", None, "language names in translation", "fuzzywuzzy")
+Translator = LazyImport("Translator", "googletrans", "Translator", "translation", "googletrans")
+LANGUAGES = LazyImport("LANGUAGES", "googletrans", "LANGUAGES", "translation", "googletrans")
+np = LazyImport("np", "numpy", None, "the 'numpy' suggestion backend", "numpy")
+ProcessPoolExecutor = LazyImport("ProcessPoolExecutor", "concurrent.futures", "ProcessPoolExecutor",
+                                 "--workers")
+similarity_scores = LazyImport("similarity_scores", "similarity_scores", None, "--keyboard")
 
 #Spellchecker class, basic spellchecking functionality
 class Spellchecker():
@@ -62,14 +184,77 @@ class Spellchecker():
     -known_words (set): a set of strings, a reference for correctly-spelled words
     -ignored_words_file_path (str): file path to a custom list of words to be ignored (when spellchecking)
     -personal_dict_file (str): file path to a personal dictionary, contained words will be ignored (when spellchecking)
-    -ignored_words (set): a set of words to be ignored when spellchecking
-    -unknown_words (list): a list of words identified as misspelled
+    -ignored_words (WordStore/set): words to be ignored when spellchecking, saved
+     to the ignored words file (a plain set if there is no file)
+    -personal_words (WordStore/None): words of the personal dictionary, saved to its file
+    -unknown_words (list): (word, suggestions) tuples for the words identified as
+     misspelled by the last spell_check
+    -suggest_index (optional): index used by Suggester, instead of a full scan
+     of known_words (see build_suggest_index)
+    -ranker (KeyboardDistance/None): optional reranking of suggestions, by
+     keyboard-weighted edit distance
+    -dict_version (int): counter bumped whenever known or ignored words change
+    -suggestion_cache (SuggestionCache): recent suggestions, keyed by word and
+     dict_version
+    -frequencies (FrequencyTable/None): frequency of each known word, for ranking
+     suggestions
+    -bloom (BloomFilter/None): fast-reject filter in front of known_words
+    -workers (int): number of worker processes for spell_check; 1 checks in this
+     process
+    -loaded (threading.Event): set once dictionaries are loaded (see load_dictionaries)
+    -load_time (float/None): seconds taken by load_dictionaries
+    -update_lock (threading.RLock): held while known words or the suggestion index
+     are changed or searched, so a reload never changes them mid-search
+    -runtime_words (set): words added while running (see add_known_word)
+    -watcher (FileWatcher/None): polls the word files, if watch_interval is given
+    -file_snapshots (dict): path to the contents of each watched file when last read
+    -chunk_size (int): number of parsed words checked (or sent to a worker) at a time
+    -words_checked (int): number of words read by the last (or current) iter_check
+    -parse_error (str/None): error that stopped the last iter_check reading the
+     reference file, if any
     
     Arguments:
     -reference_file (str): text input/ path to the text to be checked
     -known_words_file_path (str): path to file with correctly-spelled words
     -personal_dict_file_path (str): path to file for personal dictionary
     -ignored_words_file_path (str): path to file for words to ignore
+    -suggest_backend (str, optional): name of suggestion index to build from
+     known_words ('scan', 'bktree', 'symspell', 'bounded', 'trie', 'numpy',
+     'ngram' or 'phonetic'). Defaulted to None (full scan).
+    -keyboard_ranking (bool, optional): if True, suggestions are reranked by
+     KeyboardDistance. Defaulted to False.
+    -cache_size (int, optional): maximum number of cached suggestion lists.
+     Defaulted to 1024.
+    -workers (int, optional): defaulted to 1
+    -chunk_size (int, optional): defaulted to 5000
+    -known_words (set, optional): if given, used as known words instead of reading
+     the known words and personal dictionary files. Defaulted to None.
+    -frequency_file_path (str, optional): path to a word-frequency list, one
+     'word count' per line (or one word per line, most frequent first).
+     Defaulted to None (suggestion ties broken alphabetically).
+    -compiled_dict_path (str, optional): path to a compiled dictionary (see
+     compile_dictionary) of the known words file. If given, known words are
+     memory-mapped from it instead of read into a set; it is recompiled when the
+     known words file is newer. Defaulted to None.
+    -dictionary (str, optional): store for known words, from DICTIONARY_BACKENDS:
+     'set', 'case' for a CaseTable (one lookup per token, whatever its
+     capitalization), or 'dawg' for a Dawg (far smaller, also usable as the
+     suggestion index). Defaulted to 'set'.
+    -bloom_rate (float, optional): false-positive rate of a Bloom filter checked
+     before the known words store. Only used when known words are not a set (a
+     set lookup is already cheaper than the filter); with a compiled dictionary,
+     the filter is saved next to it. Defaulted to None (no filter).
+    -background (bool, optional): if True, dictionaries are loaded on a background
+     thread and __init__ returns at once; spell_check and suggest wait for the
+     load. Defaulted to False.
+    -layers (list, optional): (name, path) pairs of extra word lists, such as
+     domain or team lists, highest priority first. If given, known words are a
+     LayeredDictionary: the personal dictionary, then these layers, then the
+     known words file as 'base'. Defaulted to None.
+    -watch_interval (float, optional): if given, the known words, personal
+     dictionary and ignored words files are polled every watch_interval seconds
+     once loaded, and changes are applied without a restart (see reload_file).
+     Defaulted to None (no polling).
     
     -Takes in all words from argument file paths
     -Takes in ignored_words from a 'load_files' method
@@ -79,47 +264,427 @@ class Spellchecker():
     -known_words_file_path and personal_dict_file_path are text files, containing
      one word per line
      """
-    def __init__(self, reference_file, known_words_file_path, personal_dict_file_path, ignored_words_file_path):
+    def __init__(self, reference_file, known_words_file_path, personal_dict_file_path, ignored_words_file_path,
+                 suggest_backend=None, keyboard_ranking=False, cache_size=1024, workers=1, chunk_size=5000,
+                 known_words=None, frequency_file_path=None, compiled_dict_path=None, dictionary="set",
+                 bloom_rate=None, background=False, layers=None, watch_interval=None):
         self.reference_file = reference_file
-        self.known_words = self.get_known_words(known_words_file_path, personal_dict_file_path)
+        self.known_words_file_path = known_words_file_path
+        self.compiled_dict_path = compiled_dict_path
+        self.dictionary = dictionary
+        self.bloom_rate = bloom_rate
+        self.frequency_file_path = frequency_file_path
+        self.layers = layers
+        self.known_words = known_words if known_words is not None else set()
+        self.bloom = None
+        self.frequencies = None
         self.ignored_words_file_path = ignored_words_file_path
         self.personal_dict_file = personal_dict_file_path
-        self.ignored_words = load_files(ignored_words_file_path)
+        self.ignored_words = set()
+        self.personal_words = None
         self.unknown_words = []
+        self.suggest_backend = suggest_backend
+        self.suggest_index = None
+        self.ranker = KeyboardDistance() if keyboard_ranking else None
+        self.dict_version = 0
+        self.suggestion_cache = SuggestionCache(cache_size)
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.words_checked = 0
+        self.parse_error = None
+        self.pool = None
+        self.pool_version = None
+        self.loaded = threading.Event()
+        self.load_time = None
+        self.load_thread = None
+        self.update_lock = threading.RLock()
+        self.runtime_words = set()
+        self.watch_interval = watch_interval
+        self.watcher = None
+        self.file_snapshots = {}
+        if background:
+            self.load_thread = threading.Thread(target=self.load_dictionaries, args=(known_words is None,),
+                                                daemon=True)
+            self.load_thread.start()
+        else:
+            self.load_dictionaries(known_words is None)
+
+    def load_dictionaries(self, read_known_words=True):
+        """
+        Loads known words (and their Bloom filter and frequencies), ignored words,
+        and the suggestion index. Run by __init__, on a background thread when
+        background is True; loaded is set when it finishes, even if it fails.
+
+        Arguments:
+        -read_known_words (bool, optional): if False, known_words given to __init__
+         are kept instead of reading the files. Defaulted to True.
+
+        Returns:
+        -None
+        """
+        start_time = time.perf_counter()
+        try:
+            known_words = self.known_words
+            if read_known_words and self.layers:
+                known_words = self.get_layered_words(self.known_words_file_path, self.personal_dict_file,
+                                                     self.layers, self.compiled_dict_path)
+            elif read_known_words:
+                known_words = self.get_known_words(self.known_words_file_path, self.personal_dict_file,
+                                                   self.compiled_dict_path)
+            if isinstance(known_words, LayeredDictionary):
+                if self.dictionary != "set" and "base" in known_words.layers:
+                    known_words.attach("base", DICTIONARY_BACKENDS[self.dictionary](known_words.layers["base"]))
+            elif self.dictionary != "set" and not isinstance(known_words, DICTIONARY_BACKENDS[self.dictionary]):
+                build_start = time.perf_counter()
+                known_words = DICTIONARY_BACKENDS[self.dictionary](known_words)
+                known_words.build_time = time.perf_counter()-build_start
+            self.known_words = known_words
+            if self.bloom_rate and not isinstance(known_words, (set, CaseTable)):
+                self.bloom = self.get_bloom_filter(self.bloom_rate, self.compiled_dict_path)
+            if self.frequency_file_path:
+                self.frequencies = self.get_word_frequencies(self.frequency_file_path)
+            if self.ignored_words_file_path:
+                self.ignored_words = WordStore(self.ignored_words_file_path)
+            if self.personal_dict_file:
+                self.personal_words = WordStore(self.personal_dict_file)
+            self.suggest_index = build_suggest_index(self.suggest_backend, self.known_words)
+            if self.watch_interval:
+                self.start_watching()
+        finally:
+            self.dictionary_changed()
+            self.load_time = time.perf_counter()-start_time
+            self.loaded.set()
         
     def spell_check(self):
         """
         Parses the reference text and checks each individual word against known words and
         the personal dictionary. It then identifies the unknown words and produces suggestions
-        for them.
+        for them. A list-returning wrapper over iter_check.
         
-        -Each word, after the use of a regex match, is checked against known words
+        -Words are split from the text by tokenize, without surrounding punctuation
         -Words that are at the start of a sentence, regardless of punctuation are
          identified as known. Words that are captialized are identified as known.
+        -unknown_words is replaced (in place) with this run's findings
         -Exceptions are accounted for
         
         Returns:
-        None
+        -list: unknown_words, list of (word, suggestions) tuples in text order
         
         Required:
         -The reference file should be initialized with text to be parsed
         -known_words should be populated with correctly-spelled words
         """
-        words_to_check = []
+        self.unknown_words[:] = [(word, suggestions) for word, offset, suggestions in self.iter_check()]
+        return self.unknown_words
+
+    def iter_check(self):
+        """
+        Checks the reference text as it is parsed, yielding unknown words as they
+        are found. Words are read in chunks of chunk_size, and suggestions are made
+        once per distinct (lowercased) unknown word of a chunk, so memory is bounded
+        by the chunk size, not the document size.
+
+        -With more than one worker, the first chunk is checked here (so the first
+         findings come without waiting for the pool, and short texts never start
+         it) and later chunks in worker processes, at most two per worker in
+         flight; findings are still yielded in text order
+        -Exceptions are accounted for
+
+        Returns:
+        -generator: (word, offset, suggestions) tuples for unknown words, in text
+         order; offset is the character offset of the word in the reference text
+        """
+        self.loaded.wait()
+        self.words_checked = 0
+        self.parse_error = None
+        pending = deque()
+        for index, (words, offsets, sentence_starts) in enumerate(self.iter_chunks()):
+            if self.workers > 1 and index > 0:
+                pending.append((self.get_pool().submit(check_chunk, words, sentence_starts), offsets))
+                if len(pending) < self.workers*2:
+                    continue
+                future, offsets = pending.popleft()
+                found = future.result()
+            else:
+                found = self.check_words(words, sentence_starts)
+            for position, word, suggestions in found:
+                yield word, offsets[position], suggestions
+        while pending:
+            future, offsets = pending.popleft()
+            for position, word, suggestions in future.result():
+                yield word, offsets[position], suggestions
+
+    def iter_chunks(self):
+        """
+        Reads words from the reference file through tokenize, in chunks of chunk_size.
+
+        Returns:
+        -generator: (words, offsets, sentence_starts) tuples of parallel lists
+        """
+        words = []
+        offsets = []
+        sentence_starts = []
         try:
-            words_to_check = self.reference_file.parse()
+            for word, offset, sentence_start in tokenize(iter_reference_blocks(self.reference_file)):
+                words.append(word)
+                offsets.append(offset)
+                sentence_starts.append(sentence_start)
+                if len(words) >= self.chunk_size:
+                    self.words_checked += len(words)
+                    yield words, offsets, sentence_starts
+                    words = []
+                    offsets = []
+                    sentence_starts = []
         except Exception as e:
+            self.parse_error = str(e)
             print("Error parsing reference file: {}".format(e))
-        for index, word in enumerate(words_to_check):
+        if words:
+            self.words_checked += len(words)
+            yield words, offsets, sentence_starts
+
+    def find_unknown(self, words, sentence_starts):
+        """
+        Finds unknown words among words from tokenize: words that are neither known
+        (as typed, see get_token_check) nor ignored, skipping capitalized words at
+        the start of a sentence.
+
+        Arguments:
+        -words (list): words, from tokenize
+        -sentence_starts (list): for each word, True if it begins a sentence
+
+        Returns:
+        -list: indexes of the unknown words, in text order
+        """
+        found = []
+        check_token = self.get_token_check()
+        ignored_words = self.ignored_words
+        for index, word in enumerate(words):
             try:
-                if re.match(r"^[a-zA-Z'-]+$", word):
-                    known = (word.lower() in self.known_words) or (word in self.known_words)
-                    if_start_sent = self.start_sentence(index, words_to_check)
-                    if not known and not (if_start_sent and word.istitle()):
-                        suggestions = Suggester.get_suggestions(word.lower(), self.known_words)
-                        self.unknown_words.append((word, suggestions))
+                if check_token(word) or (sentence_starts[index] and word.istitle()):
+                    continue
+                if word.lower() not in ignored_words:
+                    found.append(index)
             except Exception as e:
                 print("Error in spellcheck, word-{}: {}".format(word,e))
+        return found
+
+    def check_words(self, words, sentence_starts):
+        """
+        Checks words against known words, with suggestions for the unknown ones.
+
+        Arguments:
+        -words (list): words, from tokenize
+        -sentence_starts (list): for each word, True if it begins a sentence
+
+        Returns:
+        -list: list of (index, word, suggestions) tuples for unknown words, in text
+         order; index is the position of the word in words
+        """
+        found = self.find_unknown(words, sentence_starts)
+        suggestions = self.suggest_batch(words[index] for index in found)
+        return [(index, words[index], suggestions[words[index].lower()]) for index in found]
+
+    def get_pool(self):
+        """
+        Gets the worker pool, starting it if needed. Known words are sent to each
+        worker once, when the pool starts; if known words changed since, the pool
+        is restarted so workers do not check against an old dictionary.
+
+        Returns:
+        -ProcessPoolExecutor: pool of self.workers processes
+        """
+        if self.pool is not None and self.pool_version != self.dict_version:
+            self.close_pool()
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_check_worker,
+                                            initargs=self.worker_initargs())
+            self.pool_version = self.dict_version
+        return self.pool
+
+    def worker_initargs(self):
+        """
+        Gets the arguments of init_check_worker, to set up worker processes that
+        check against this Spellchecker's words. The suggestion index is sent as
+        built, so workers do not each build their own.
+
+        Returns:
+        -tuple: known words, suggestion backend, keyboard ranking, frequencies,
+         ignored words and suggestion index
+        """
+        return (self.known_words, self.suggest_backend, self.ranker is not None, self.frequencies,
+                set(self.ignored_words), self.suggest_index)
+
+    def close_pool(self):
+        """
+        Shuts down the worker pool, if one was started.
+
+        Returns:
+        -None
+        """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def suggest(self, word):
+        """
+        Gets suggestions for a word from known words, through the suggestion index
+        if one was built. Recent results are served from the suggestion cache.
+
+        Arguments:
+        -word (str): word to produce suggestions for
+
+        Returns:
+        -list: list of top three suggestions
+        """
+        self.loaded.wait()
+        suggestions = self.suggestion_cache.get(word, self.dict_version)
+        if suggestions is None:
+            with self.update_lock:
+                suggestions = Suggester.get_suggestions(word, self.known_words, self.suggest_index, self.ranker, 3,
+                                                        self.frequencies)
+            self.suggestion_cache.put(word, self.dict_version, suggestions)
+        return suggestions
+
+    def suggest_batch(self, words):
+        """
+        Gets suggestions for many words at once, searching once per distinct
+        lowercased word that is not in the suggestion cache.
+
+        Arguments:
+        -words (iterable): words to produce suggestions for
+
+        Returns:
+        -dict: maps each lowercased word to its list of top three suggestions
+        """
+        suggestions = {}
+        missing = []
+        for word in words:
+            lower_word = word.lower()
+            if lower_word not in suggestions:
+                suggestions[lower_word] = self.suggestion_cache.get(lower_word, self.dict_version)
+                if suggestions[lower_word] is None:
+                    missing.append(lower_word)
+        with self.update_lock:
+            found = Suggester.get_suggestions_batch(missing, self.known_words, 3, self.suggest_index, self.ranker,
+                                                    self.frequencies)
+        for lower_word, word_suggestions in found.items():
+            self.suggestion_cache.put(lower_word, self.dict_version, word_suggestions)
+        suggestions.update(found)
+        return suggestions
+
+    def dictionary_changed(self):
+        """
+        Bumps dict_version, so that suggestions cached before a change to known or
+        ignored words are never served again.
+
+        Returns:
+        -None
+        """
+        self.dict_version += 1
+
+    def add_known_word(self, word):
+        """
+        Adds a word to known words, keeping the suggestion index (if any) up to date.
+        All runtime additions (+Dictionary, +Personal Dict, accepted suggestions)
+        should go through here.
+
+        Arguments:
+        -word (str): word to be added to known words
+
+        Returns:
+        -None
+        """
+        with self.update_lock:
+            self.known_words.add(word)
+            self.runtime_words.add(word)
+            if self.bloom is not None:
+                self.bloom.add(word)
+            if self.suggest_index is not None:
+                self.suggest_index.add(word)
+            if self.frequencies is not None:
+                self.frequencies.add(word)
+            self.dictionary_changed()
+
+    def add_personal_word(self, word):
+        """
+        Adds a word to known words and to the personal dictionary. The personal
+        dictionary file is written behind (see WordStore), so this never waits
+        on disk.
+
+        Arguments:
+        -word (str): word to be added
+
+        Returns:
+        -None
+        """
+        self.add_known_word(word)
+        if self.personal_words is not None:
+            self.personal_words.add(word)
+
+    def close_stores(self):
+        """
+        Flushes the personal dictionary and ignored words files.
+
+        Returns:
+        -None
+        """
+        for store in (self.personal_words, self.ignored_words):
+            if isinstance(store, WordStore):
+                store.close()
+
+    def is_known(self, word):
+        """
+        Checks if a word is a known word. With a Bloom filter, words the filter
+        rejects are unknown without touching the known words store; words it
+        accepts are confirmed in the store (the filter has false positives).
+
+        Arguments:
+        -word (str): word to check
+
+        Returns:
+        -bool: True if word is in known words, else False
+        """
+        if self.bloom is not None and word not in self.bloom:
+            return False
+        return word in self.known_words
+
+    def get_token_check(self):
+        """
+        Gets the function that checks a token, as typed, against known words. With
+        a CaseTable this is its accepts method (one lookup per token); otherwise the
+        token is looked up lowercased, then as typed.
+
+        Arguments:
+        -None
+
+        Returns:
+        -function: takes a token, returns True if it is a known word
+        """
+        if isinstance(self.known_words, CaseTable):
+            return self.known_words.accepts
+        return lambda word: self.is_known(word.lower()) or self.is_known(word)
+
+    def ignore_word(self, word):
+        """
+        Adds a word to ignored words.
+
+        Arguments:
+        -word (str): word to be ignored
+
+        Returns:
+        -None
+        """
+        self.ignored_words.add(word)
+        self.dictionary_changed()
+
+    def cache_stats(self):
+        """
+        Reports suggestion cache statistics.
+
+        Returns:
+        -dict: hits, misses, evictions, size and maxsize of the suggestion cache
+        """
+        return self.suggestion_cache.stats()
                 
     def start_sentence(self, word_index, words_to_check):
         """
@@ -146,17 +711,21 @@ class Spellchecker():
         except Exception as e:
             print("Error in start_sentence: {}".format(e))
 
-    def get_known_words(self, known_words_file_path, personal_dict_file_path):
+    def get_known_words(self, known_words_file_path, personal_dict_file_path, compiled_dict_path=None):
         """
         Reads known words from known words file and personal dictionary file, combining
-        them and returning them as a set.
+        them and returning them as a set. With a compiled dictionary, known words are
+        memory-mapped from it instead, and personal dictionary words are added on top.
         
         Arguments:
         -known_words_file_path (str): path to file of correctly-spelled words
         -personal_dict_file_path (str): path to file of personal dictionary
+        -compiled_dict_path (str, optional): path to compiled dictionary of the known
+         words file, (re)compiled if missing or older. Defaulted to None.
         
         Returns:
-        -set: set of known words, taken from known words file and personal dictionary file
+        -set/CompiledDictionary: known words, taken from known words file and personal
+         dictionary file
         
         -Exceptions accounted for
         
@@ -167,7 +736,9 @@ class Spellchecker():
          """
         known_words = set()
         try:
-            if os.path.isfile(known_words_file_path):
+            if compiled_dict_path:
+                known_words = load_compiled_dictionary(known_words_file_path, compiled_dict_path)
+            elif os.path.isfile(known_words_file_path):
                 with open(known_words_file_path, 'rt',encoding='utf-8') as known_file:
                     known_words.update(known_file.read().split())
             if os.path.isfile(personal_dict_file_path):
@@ -177,84 +748,3213 @@ class Spellchecker():
             print("Error in get_known_words: {}".format(e))
         return known_words
 
-#abstract class for subclass parsing
-class ReferenceFile():
-    """
-    Abstract class for different file types, for text extraction.
-    
-    Attributes:
-    -text (str): plain-text content of file
-    
-    Methods:
-    -parse: abstract method, is intended to be overridden by subclasses
-    """
-    def __init__(self, text):
+    def start_watching(self):
         """
-        Initializes ReferenceFile object with provided text.
-        
-        Arguments:
-        -text (str): plain-text content of file
+        Records the current contents of the known words, personal dictionary and
+        ignored words files, and starts a FileWatcher that calls reload_file when
+        one of them changes.
+
+        Returns:
+        -None
         """
-        self.text = text
-    def parse(self):
-        pass
+        paths = [path for path in (self.known_words_file_path, self.personal_dict_file,
+                                   self.ignored_words_file_path) if path]
+        for path in paths:
+            self.file_snapshots[path] = self.read_snapshot(path)
+        self.watcher = FileWatcher(paths, self.reload_file, self.watch_interval)
+        for store in (self.personal_words, self.ignored_words):
+            if isinstance(store, WordStore):
+                store.on_write = self.file_written
+        self.watcher.start()
 
-#class for suggestions
-class Suggester():
-    """
-    Checks whether given word is in known words, and if not, produces suggestions for
-    similarly spelled words, based on Levenshtein distance.
-    
-    (Levenshtein distance is a measure of single-character edits to transform one word
-     into another)
-    
-    Attributes:
-    -known_words (set): a set of correctly-spelled words
-    
-    Methods:
-    -get_suggestions(word, known_words): static method, returning list of suggestions
-    -checker(word): checks if word is in known_words
-    """
-    @staticmethod
-    def get_suggestions(word, known_words):
+    def stop_watching(self):
         """
-        Provides suggestions for given word, from known words, based on Levenshtein
-        distance.
-        
-        Arguments:
-        -word (str): word to produce suggestions for
-        -known_words (iterable): iterable containing known words
-        
+        Stops polling the word files.
+
         Returns:
-        -list: list of supposed top three suggestions
+        -None
         """
-        suggestions = sorted(known_words, key=lambda known_word:Levenshtein.distance(word, known_word))
-        return suggestions[:3]
-    
-    def __init__(self, known_words=None):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+    def file_written(self, path):
         """
-        Initializes Suggester with set of known words.
-        
+        Records a write by the personal dictionary or ignored words WordStore as
+        the file's last-read contents, so the watcher does not reload it as an
+        outside edit. Called by the WordStore, with its file_lock held.
+
         Arguments:
-        -known_words (iterable): optional iterable of known words; else, defaults
-         to empty set
-         """
-        self.known_words = known_words or set()
+        -path (str): path of the written file
 
-    def checker(self, word):
+        Returns:
+        -None
         """
-        Checks if word is in known words set.
-        
+        self.file_snapshots[path] = self.read_snapshot(path)
+        watcher = self.watcher
+        if watcher is not None and path in watcher.signatures:
+            watcher.signatures[path] = FileWatcher.signature(path)
+
+    def changes_applied(self, path, added, removed):
+        """
+        Checks whether a change to a watched file is already in effect (as after
+        a write by this Spellchecker's own WordStore, seen by the watcher before
+        file_written recorded it): every added word is known (or ignored), and no
+        removed word still is.
+
         Arguments:
-        -word (str): word to check against known words
-        
+        -path (str): path of the changed file
+        -added (set): words added to the file
+        -removed (set): words removed from the file
+
+        Returns:
+        -bool: True if there is nothing left to apply
+        """
+        stores = []
+        if path == self.ignored_words_file_path:
+            stores.append(self.ignored_words)
+        if path == self.personal_dict_file and isinstance(self.personal_words, WordStore):
+            stores.append(self.personal_words)
+        if path in (self.known_words_file_path, self.personal_dict_file):
+            stores.append(self.known_words)
+        return all(all(word in store for word in added) and not any(word in store for word in removed)
+                   for store in stores)
+
+    @staticmethod
+    def read_snapshot(path):
+        """
+        Reads the raw contents of a watched file (kept as bytes, which take far less
+        memory than a set of its words).
+
+        Arguments:
+        -path (str): path to file
+
+        Returns:
+        -bytes: file contents, empty if the file could not be read
+        """
+        try:
+            with open(path, 'rb') as watched_file:
+                return watched_file.read()
+        except OSError:
+            return b""
+
+    @staticmethod
+    def snapshot_words(snapshot):
+        """
+        Gets the set of words in a file snapshot.
+
+        Arguments:
+        -snapshot (bytes): file contents
+
+        Returns:
+        -set: words, one per line
+        """
+        return set(snapshot.decode('utf-8', 'replace').split())
+
+    def reload_file(self, path):
+        """
+        Applies a change to a watched file: the words added to and removed from it
+        since it was last read are found, and only those are applied to known words
+        (and their suggestion index, Bloom filter and frequencies), the personal
+        dictionary, or ignored words. Runs on the FileWatcher thread; the slow work
+        is done before update_lock is taken, so checks are not held up.
+
+        Arguments:
+        -path (str): path of the changed file
+
+        Returns:
+        -None
+        """
+        new_snapshot = self.read_snapshot(path)
+        old_words = self.snapshot_words(self.file_snapshots.get(path, b""))
+        new_words = self.snapshot_words(new_snapshot)
+        self.file_snapshots[path] = new_snapshot
+        added = new_words-old_words
+        removed = old_words-new_words
+        if not added and not removed or self.changes_applied(path, added, removed):
+            return
+        if path == self.ignored_words_file_path:
+            if isinstance(self.ignored_words, WordStore):
+                self.ignored_words.apply_changes(added, removed, len(new_snapshot.split()))
+            else:
+                with self.update_lock:
+                    self.ignored_words = (self.ignored_words-removed) | added
+        if path == self.personal_dict_file and isinstance(self.personal_words, WordStore):
+            self.personal_words.apply_changes(added, removed, len(new_snapshot.split()))
+        if path in (self.known_words_file_path, self.personal_dict_file):
+            self.update_known_words(path, added, removed)
+        with self.update_lock:
+            self.dictionary_changed()
+
+    def update_known_words(self, path, added, removed):
+        """
+        Applies words added to and removed from the known words file or personal
+        dictionary file to known words. Sets and CaseTables (and set layers of a
+        LayeredDictionary) are copied with the change applied and swapped in; their
+        suggestion index gets the added words, and removed words are pruned from its
+        results (see PrunedIndex) until rebuild_pruned_index replaces it. Stores that
+        cannot be changed (CompiledDictionary,
+        Dawg) take personal dictionary changes in their set of added words; they are
+        rebuilt from the files, with words added while running carried over, only
+        when the known words file changes or a removed word is part of the store
+        itself.
+
+        Arguments:
+        -path (str): path of the changed file
+        -added (set): words added to the file
+        -removed (set): words removed from the file
+
+        Returns:
+        -None
+        """
+        known_words = self.known_words
+        if isinstance(known_words, LayeredDictionary):
+            name = "base" if path == self.known_words_file_path else "personal"
+            layer = known_words.layers.get(name, set())
+            if isinstance(layer, set):
+                with self.update_lock:
+                    known_words.layers[name] = (layer-removed) | added
+                    if name in known_words.indexes:
+                        known_words.indexes[name] = PrunedIndex.update(known_words.indexes[name], added, removed)
+                    known_words.size = None
+            else:
+                layer = self.get_layered_words(path, None, [], self.compiled_dict_path).layers.get("base", set())
+                if self.dictionary != "set":
+                    layer = DICTIONARY_BACKENDS[self.dictionary](layer)
+                index = build_suggest_index(known_words.suggest_backend, layer) if (
+                    known_words.suggest_backend) else None
+                with self.update_lock:
+                    known_words.layers[name] = layer
+                    known_words.indexes.pop(name, None)
+                    if index is not None:
+                        known_words.indexes[name] = index
+                    known_words.size = None
+        elif isinstance(known_words, (set, CaseTable)):
+            if removed:
+                other_path = self.personal_dict_file if path == self.known_words_file_path else (
+                    self.known_words_file_path)
+                removed = removed-self.snapshot_words(self.file_snapshots.get(other_path, b""))-self.runtime_words
+            with self.update_lock:
+                if isinstance(self.known_words, CaseTable):
+                    known_words = self.known_words.copy()
+                    for word in removed:
+                        known_words.discard(word)
+                    for word in added:
+                        known_words.add(word)
+                    self.known_words = known_words
+                else:
+                    self.known_words = (self.known_words-removed) | added
+                if self.suggest_index is not None:
+                    self.suggest_index = PrunedIndex.update(self.suggest_index, added, removed)
+        elif path != self.personal_dict_file or not self.overlay_personal_changes(added, removed):
+            known_words = self.get_known_words(self.known_words_file_path, self.personal_dict_file,
+                                               self.compiled_dict_path)
+            if self.dictionary != "set":
+                known_words = DICTIONARY_BACKENDS[self.dictionary](known_words)
+            suggest_index = build_suggest_index(self.suggest_backend, known_words)
+            with self.update_lock:
+                for word in self.runtime_words:
+                    known_words.add(word)
+                    if suggest_index is not None and suggest_index is not known_words:
+                        suggest_index.add(word)
+                self.known_words = known_words
+                self.suggest_index = suggest_index
+        if removed and isinstance(self.known_words, LayeredDictionary):
+            self.rebuild_pruned_index("base" if path == self.known_words_file_path else "personal")
+        elif removed:
+            self.rebuild_pruned_index()
+        with self.update_lock:
+            for word in added:
+                if self.bloom is not None:
+                    self.bloom.add(word)
+                if self.frequencies is not None:
+                    self.frequencies.add(word)
+        if removed and self.frequencies is not None:
+            frequencies = self.get_word_frequencies(self.frequency_file_path)
+            with self.update_lock:
+                self.frequencies = frequencies
+
+    def rebuild_pruned_index(self, layer=None):
+        """
+        Rebuilds a suggestion index wrapped in a PrunedIndex, once it needs it (see
+        PrunedIndex.needs_rebuild), from a copy of the current words. The index is
+        built without holding update_lock and swapped in under it, unless it was
+        replaced in the meantime; words added while it was built are added to it.
+
+        Arguments:
+        -layer (str, optional): name of the LayeredDictionary layer whose index is
+         rebuilt, else suggest_index is. Defaulted to None.
+
+        Returns:
+        -bool: True if a rebuilt index was swapped in
+        """
+        with self.update_lock:
+            if layer is None:
+                pruned, words, suggest_backend = self.suggest_index, self.known_words, self.suggest_backend
+            else:
+                pruned = self.known_words.indexes.get(layer)
+                words = self.known_words.layers.get(layer, set())
+                suggest_backend = self.known_words.suggest_backend
+            if not isinstance(pruned, PrunedIndex) or not pruned.needs_rebuild():
+                return False
+            words = set(words)
+        index = build_suggest_index(suggest_backend, words)
+        with self.update_lock:
+            if layer is None:
+                current, known_words = self.suggest_index, self.known_words
+            else:
+                current = self.known_words.indexes.get(layer)
+                known_words = self.known_words.layers.get(layer, set())
+            if index is None or current is not pruned:
+                return False
+            for word in self.runtime_words-words:
+                if word in known_words:
+                    index.add(word)
+            if layer is None:
+                self.suggest_index = index
+            else:
+                self.known_words.indexes[layer] = index
+        return True
+
+    def overlay_personal_changes(self, added, removed):
+        """
+        Applies personal dictionary changes to a store that cannot be changed
+        (CompiledDictionary, Dawg) through its set of added words, without a
+        rebuild. Removed words that are in the known words file, or were added
+        while running, stay known.
+
+        Arguments:
+        -added (set): words added to the personal dictionary file
+        -removed (set): words removed from it
+
+        Returns:
+        -bool: True if applied, False if a removed word is part of the store
+         itself (it must be rebuilt)
+        """
+        known_words = self.known_words
+        if removed:
+            removed = removed-self.runtime_words-self.snapshot_words(
+                self.file_snapshots.get(self.known_words_file_path, b""))
+            if any(word not in known_words.added and word in known_words for word in removed):
+                return False
+        with self.update_lock:
+            known_words.added.difference_update(removed)
+            for word in added:
+                known_words.add(word)
+            if self.suggest_index is not None and self.suggest_index is not known_words:
+                self.suggest_index = PrunedIndex.update(self.suggest_index, added, removed)
+        return True
+
+    def get_layered_words(self, known_words_file_path, personal_dict_file_path, layers, compiled_dict_path=None):
+        """
+        Reads known words into a LayeredDictionary, one layer per file: the personal
+        dictionary ('personal', highest priority), then each extra layer, then the
+        known words file ('base', memory-mapped if compiled_dict_path is given).
+
+        Arguments:
+        -known_words_file_path (str): path to file of correctly-spelled words
+        -personal_dict_file_path (str): path to file of personal dictionary
+        -layers (list): (name, path) pairs of extra word lists, highest priority first
+        -compiled_dict_path (str, optional): path to compiled dictionary of the known
+         words file. Defaulted to None.
+
+        Returns:
+        -LayeredDictionary: known words, by layer
+        """
+        known_words = LayeredDictionary()
+        known_words.attach("personal", load_layer(personal_dict_file_path) if (
+            personal_dict_file_path and os.path.isfile(personal_dict_file_path)) else set())
+        for name, path in layers:
+            known_words.attach(name, load_layer(path))
+        if compiled_dict_path:
+            known_words.attach("base", load_compiled_dictionary(known_words_file_path, compiled_dict_path))
+        elif known_words_file_path and os.path.isfile(known_words_file_path):
+            known_words.attach("base", load_layer(known_words_file_path, intern=False))
+        return known_words
+
+    def attach_layer(self, name, path):
+        """
+        Attaches a word list as a layer of known words, below the personal
+        dictionary and earlier layers. Known words must be a LayeredDictionary.
+        The list is read and its suggestion index built before update_lock is
+        taken, so checks are not held up.
+
+        Arguments:
+        -name (str): layer name
+        -path (str): path to file of words, one per line
+
+        Returns:
+        -None
+        """
+        self.loaded.wait()
+        words = load_layer(path)
+        suggest_backend = self.known_words.suggest_backend
+        index = build_suggest_index(suggest_backend, words) if suggest_backend else None
+        with self.update_lock:
+            self.known_words.attach(name, words, before="base",
+                                    index=index if suggest_backend == self.known_words.suggest_backend else None)
+            if self.bloom is not None:
+                for word in words:
+                    self.bloom.add(word)
+            self.dictionary_changed()
+
+    def detach_layer(self, name):
+        """
+        Detaches a layer of known words. (A Bloom filter keeps the layer's words,
+        which then only cost a confirming lookup.)
+
+        Arguments:
+        -name (str): layer name
+
+        Returns:
+        -None
+        """
+        self.loaded.wait()
+        with self.update_lock:
+            self.known_words.detach(name)
+            self.dictionary_changed()
+
+    def get_bloom_filter(self, false_positive_rate, compiled_dict_path=None):
+        """
+        Gets a Bloom filter of known words. With a compiled dictionary, the filter
+        is loaded from '<compiled_dict_path>.bloom' if that is newer than the
+        dictionary and built for the same false-positive rate; otherwise it is
+        built and saved there. The saved filter only covers the compiled words (for
+        a LayeredDictionary, the 'base' layer), so personal dictionary, layer and
+        runtime words are added to it after loading.
+
+        Arguments:
+        -false_positive_rate (float): target false-positive rate
+        -compiled_dict_path (str, optional): path to compiled dictionary. Defaulted to None.
+
+        Returns:
+        -BloomFilter: filter of known words, else None if it could not be built
+        """
+        try:
+            layered = isinstance(self.known_words, LayeredDictionary)
+            saved_words = self.known_words.layers.get("base", set()) if layered else self.known_words
+            bloom_path = compiled_dict_path+".bloom" if compiled_dict_path else None
+            bloom = None
+            if bloom_path and os.path.isfile(bloom_path) and (
+                    os.path.getmtime(bloom_path) >= os.path.getmtime(compiled_dict_path)):
+                bloom = BloomFilter.load(bloom_path)
+                if bloom.false_positive_rate != false_positive_rate:
+                    bloom = None
+            if bloom is None:
+                bloom = BloomFilter(saved_words, len(self.known_words), false_positive_rate)
+                if bloom_path:
+                    bloom.save(bloom_path)
+            words = set(getattr(saved_words, "added", ()))|self.runtime_words
+            if layered:
+                for name, layer in self.known_words.layers.items():
+                    if name != "base":
+                        words.update(layer)
+            elif self.personal_dict_file and os.path.isfile(self.personal_dict_file):
+                words.update(load_layer(self.personal_dict_file))
+            for word in words:
+                bloom.add(word)
+            return bloom
+        except Exception as e:
+            print("Error in get_bloom_filter: {}".format(e))
+            return None
+
+    def get_word_frequencies(self, frequency_file_path):
+        """
+        Reads a word-frequency list into a FrequencyTable over known words. Words in
+        the list that are not known words are skipped.
+
+        Arguments:
+        -frequency_file_path (str): path to file of 'word count' lines, or of one
+         word per line, most frequent first
+
+        Returns:
+        -FrequencyTable: frequency of each known word, else None if the file could
+         not be read
+        """
+        try:
+            with open(frequency_file_path, 'rt', encoding='utf-8') as frequency_file:
+                return FrequencyTable(self.known_words, frequency_file)
+        except Exception as e:
+            print("Error in get_word_frequencies: {}".format(e))
+            return None
+
+#abstract class for subclass parsing
+class ReferenceFile():
+    """
+    Abstract class for different file types, for text extraction.
+    
+    Attributes:
+    -text (str): plain-text content of file
+    
+    Methods:
+    -parse: abstract method, is intended to be overridden by subclasses
+    -iter_blocks: text in blocks, with their offsets, as it is read
+    """
+    def __init__(self, text):
+        """
+        Initializes ReferenceFile object with provided text.
+        
+        Arguments:
+        -text (str): plain-text content of file
+        """
+        self.text = text
+    def parse(self):
+        pass
+    def iter_blocks(self):
+        """
+        Yields the text in blocks, with their character offsets, for tokenize. By
+        default from parse() (a list of words is joined with spaces), which
+        subclasses may override to read lazily.
+
+        Returns:
+        -iterator: (text, offset) tuples
+        """
+        words = self.parse()
+        if isinstance(words, str):
+            return text_blocks(words)
+        return iter([(" ".join(words), 0)])
+
+#class for suggestions
+class Suggester():
+    """
+    Checks whether given word is in known words, and if not, produces suggestions for
+    similarly spelled words, based on Levenshtein distance.
+    
+    (Levenshtein distance is a measure of single-character edits to transform one word
+     into another)
+    
+    Attributes:
+    -known_words (set): a set of correctly-spelled words
+    
+    Methods:
+    -get_suggestions(word, known_words, index, ranker, k, frequencies): static method, returning
+     list of suggestions
+    -get_suggestions_batch(words, known_words, k, index, ranker, frequencies): static method,
+     returning dict of suggestions for each distinct word
+    -checker(word): checks if word is in known_words
+    """
+    @staticmethod
+    def get_suggestions(word, known_words, index=None, ranker=None, k=3, frequencies=None):
+        """
+        Provides suggestions for given word, from known words, based on Levenshtein
+        distance. Ties in distance are broken alphabetically, so that the result
+        does not depend on set ordering.
+        
+        Arguments:
+        -word (str): word to produce suggestions for
+        -known_words (iterable): iterable containing known words
+        -index (optional): index built from known_words (see build_suggest_index); if given, it is
+         searched instead of sorting all of known_words. Defaulted to None.
+        -ranker (KeyboardDistance, optional): if given, the closest ranker.candidates
+         words by Levenshtein distance are reranked by it. Defaulted to None.
+        -k (int, optional): number of suggestions. Defaulted to 3.
+        -frequencies (FrequencyTable, optional): if given, ties in distance are broken
+         by word frequency (most frequent first), then alphabetically. Without an
+         index, the table's frequency-ordered scan is used. Defaulted to None.
+        
+        Returns:
+        -list: list of supposed top k suggestions
+        """
+        limit = max(ranker.candidates, k) if ranker is not None else k
+        if index is not None and frequencies is not None:
+            suggestions = frequencies.rerank(word, index.suggest(word, max(limit, frequencies.candidates)))
+        elif index is not None:
+            suggestions = index.suggest(word, limit)
+        elif frequencies is not None:
+            suggestions = frequencies.nearest(word, limit)
+        else:
+            suggestions = heapq.nsmallest(limit, known_words,
+                                          key=lambda known_word:(Levenshtein.distance(word, known_word), known_word))
+        if ranker is not None:
+            suggestions = ranker.rerank(word, suggestions)
+        return suggestions[:k]
+
+    @staticmethod
+    def get_suggestions_batch(words, known_words, k=3, index=None, ranker=None, frequencies=None):
+        """
+        Provides suggestions for many words, searching once per distinct lowercased
+        word, so a misspelling repeated throughout a text costs one search.
+
+        Arguments:
+        -words (iterable): words to produce suggestions for
+        -known_words (iterable): iterable containing known words
+        -k (int, optional): number of suggestions per word. Defaulted to 3.
+        -index (optional): index built from known_words (see build_suggest_index).
+         Defaulted to None.
+        -ranker (KeyboardDistance, optional): defaulted to None
+        -frequencies (FrequencyTable, optional): defaulted to None
+
+        Returns:
+        -dict: maps each lowercased word to its list of top k suggestions
+        """
+        suggestions = {}
+        for word in words:
+            lower_word = word.lower()
+            if lower_word not in suggestions:
+                suggestions[lower_word] = Suggester.get_suggestions(lower_word, known_words, index, ranker, k,
+                                                                    frequencies)
+        return suggestions
+    
+    def __init__(self, known_words=None):
+        """
+        Initializes Suggester with set of known words.
+        
+        Arguments:
+        -known_words (iterable): optional iterable of known words; else, defaults
+         to empty set
+         """
+        self.known_words = known_words or set()
+
+    def checker(self, word):
+        """
+        Checks if word is in known words set.
+        
+        Arguments:
+        -word (str): word to check against known words
+        
+        Returns:
+        -bool: True if word in set of known words, else False
+        """
+        if word in self.known_words:
+            return True
+        else:
+            return False
+
+#personal dictionary and ignored words, written behind
+class WordStore():
+    """
+    Set of words kept in a one-word-per-line file, such as the personal dictionary
+    or the ignored words list. The in-memory set is authoritative: add and
+    discard only change the set and queue the change, so they never touch disk.
+    Queued words are appended to the file in one batch by a timer thread
+    (flush_interval seconds after the first queued change), or by close (at
+    exit, for every store still in use, see close_word_stores), and each write
+    is fsynced. When the file holds more than compact_ratio lines per
+    word (duplicates from older versions or hand edits), or after a discard, the
+    next flush rewrites it from the set instead of appending.
+
+    Attributes:
+    -path (str): path to the file
+    -words (set): the words
+    -pending (list): words added since the last flush
+    -lines_on_disk (int): number of lines in the file
+    -needs_compact (bool): True if the next flush should rewrite the file
+    -flush_interval (float): seconds from the first queued change to its flush
+    -compact_ratio (float): lines per word above which the file is rewritten
+    -timer (threading.Timer/None): scheduled flush
+    -on_write (callable/None): called with path after each write to the file, so
+     a watcher of the file can tell this store's writes from outside edits
+
+    Arguments:
+    -path (str): path to the file (created on first flush if missing)
+    -flush_interval (float, optional): defaulted to 2.0
+    -compact_ratio (float, optional): defaulted to 2.0
+
+    Methods:
+    -add(word): adds a word, queued for the file
+    -discard(word): removes a word, if present
+    -apply_changes(added, removed, lines_on_disk): applies changes made to the file
+     by someone else
+    -flush(): writes queued changes to the file
+    -compact(): rewrites the file from the set
+    -close(): cancels the timer and flushes
+    """
+    def __init__(self, path, flush_interval=2.0, compact_ratio=2.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.compact_ratio = compact_ratio
+        self.words = set()
+        self.pending = []
+        self.lines_on_disk = 0
+        self.needs_compact = False
+        self.timer = None
+        self.on_write = None
+        self.lock = threading.Lock()
+        self.file_lock = threading.Lock()
+        try:
+            if os.path.isfile(path):
+                with open(path, 'rt', encoding='utf-8') as word_file:
+                    for line in word_file:
+                        word = line.strip()
+                        if word:
+                            self.words.add(word)
+                            self.lines_on_disk += 1
+        except (IOError, UnicodeDecodeError) as e:
+            print("Error reading the file-{}: {}".format(path, e))
+        open_word_stores.add(self)
+
+    def __contains__(self, word):
+        return word in self.words
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def __len__(self):
+        return len(self.words)
+
+    def add(self, word):
+        """
+        Adds a word to the set, queuing it to be appended to the file.
+
+        Arguments:
+        -word (str): word to add
+
+        Returns:
+        -bool: True if word was added, False if it was already in the set
+        """
+        with self.lock:
+            if word in self.words:
+                return False
+            self.words.add(word)
+            self.pending.append(word)
+            self.schedule_flush()
+        return True
+
+    def discard(self, word):
+        """
+        Removes a word from the set, if present; the file is rewritten on the
+        next flush.
+
+        Arguments:
+        -word (str): word to remove
+
+        Returns:
+        -None
+        """
+        with self.lock:
+            if word not in self.words:
+                return
+            self.words.discard(word)
+            if word in self.pending:
+                self.pending.remove(word)
+            self.needs_compact = True
+            self.schedule_flush()
+
+    def apply_changes(self, added, removed, lines_on_disk):
+        """
+        Applies words added to or removed from the file by someone else (see
+        Spellchecker.reload_file). Nothing is queued, since the file already has
+        the change.
+
+        Arguments:
+        -added (iterable): words added to the file
+        -removed (iterable): words removed from the file
+        -lines_on_disk (int): number of lines now in the file
+
+        Returns:
+        -None
+        """
+        with self.lock:
+            self.words.difference_update(removed)
+            self.words.update(added)
+            self.lines_on_disk = lines_on_disk
+
+    def schedule_flush(self):
+        """
+        Starts the flush timer, unless one is already waiting. Called with lock held.
+
+        Returns:
+        -None
+        """
+        if self.timer is None:
+            self.timer = threading.Timer(self.flush_interval, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        """
+        Writes queued words to the file: appended in one write, or, if the file
+        needs compacting, the whole set rewritten. The file is fsynced. file_lock
+        is held from taking the batch to the end of the write, so concurrent
+        flushes (timer, close) write in the order their batches were taken, and an
+        older snapshot never overwrites a newer append.
+
+        Returns:
+        -None
+        """
+        with self.file_lock:
+            with self.lock:
+                if self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+                batch, self.pending = self.pending, []
+                compact = self.needs_compact or (
+                    self.lines_on_disk+len(batch) > self.compact_ratio*max(len(self.words), 1))
+                snapshot = sorted(self.words) if compact else None
+                self.needs_compact = False
+            if not batch and not compact:
+                return
+            try:
+                if compact:
+                    self.write_words(snapshot)
+                else:
+                    with open(self.path, 'at', encoding='utf-8') as word_file:
+                        word_file.write("".join(word+'\n' for word in batch))
+                        word_file.flush()
+                        os.fsync(word_file.fileno())
+                    self.lines_on_disk += len(batch)
+                if self.on_write is not None:
+                    self.on_write(self.path)
+            except IOError as e:
+                print("Error writing to {}: {}".format(self.path, e))
+                with self.lock:
+                    self.pending[:0] = batch
+                    self.needs_compact = self.needs_compact or compact
+
+    def compact(self):
+        """
+        Rewrites the file from the set, dropping duplicates and discarded words.
+
+        Returns:
+        -None
+        """
+        with self.lock:
+            self.needs_compact = True
+        self.flush()
+
+    def write_words(self, words):
+        """
+        Writes words to the file, one per line, under a temporary name that is
+        fsynced and then renamed over the file. Called with file_lock held.
+
+        Arguments:
+        -words (list): words to write
+
+        Returns:
+        -None
+        """
+        temporary_path = self.path+".tmp"
+        with open(temporary_path, 'wt', encoding='utf-8') as word_file:
+            word_file.write("".join(word+'\n' for word in words))
+            word_file.flush()
+            os.fsync(word_file.fileno())
+        os.replace(temporary_path, self.path)
+        self.lines_on_disk = len(words)
+
+    def close(self):
+        """
+        Cancels the flush timer and flushes queued changes.
+
+        Returns:
+        -None
+        """
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        self.flush()
+
+#removed words, filtered out of a suggestion index's results
+class PrunedIndex():
+    """
+    Wraps a suggestion index from which words have been removed (most indexes
+    can only add words). Removed words are filtered out of its results, asking
+    it for as many more candidates as there are removed words. For indexes that
+    find the closest words exactly, results are the same as those of an index
+    rebuilt without them; NgramIndex and PhoneticIndex widen their search with
+    the number asked for, so their results can differ until the index is
+    rebuilt (see needs_rebuild).
+
+    Attributes:
+    -index: the wrapped suggestion index
+    -removed (set): words no longer known
+    -max_removed (int): class attribute, number of removed words past which the
+     index should be rebuilt
+
+    Arguments:
+    -index: suggestion index to wrap
+
+    Methods:
+    -update(index, added, removed): static method, applies a change to an index
+    -add(word): adds a word (no longer removed)
+    -suggest(word, limit): closest words, excluding removed words
+    -needs_rebuild(): tells if the wrapped index should be rebuilt
+    -stats(): size of the wrapped index
+    """
+    max_removed = 100
+
+    def __init__(self, index):
+        self.index = index
+        self.removed = set()
+        self.build_time = getattr(index, "build_time", 0.0)
+
+    def __len__(self):
+        return len(self.index)-len(self.removed)
+
+    @staticmethod
+    def update(index, added, removed):
+        """
+        Applies added and removed words to a suggestion index, wrapping it in a
+        PrunedIndex if words were removed.
+
+        Arguments:
+        -index: suggestion index (or PrunedIndex)
+        -added (iterable): words to add
+        -removed (iterable): words to remove
+
+        Returns:
+        -index, or a PrunedIndex wrapping it
+        """
+        if removed and not isinstance(index, PrunedIndex):
+            index = PrunedIndex(index)
+        if removed:
+            index.removed.update(removed)
+        for word in added:
+            index.add(word)
+        return index
+
+    def add(self, word):
+        """
+        Adds a word to the wrapped index, and stops filtering it out.
+
+        Arguments:
+        -word (str): word to be added
+
+        Returns:
+        -bool: True if word was added
+        """
+        was_removed = word in self.removed
+        self.removed.discard(word)
+        return self.index.add(word) or was_removed
+
+    def suggest(self, word, limit=3):
+        """
+        Gets the closest words to word from the wrapped index, excluding removed words.
+
+        Arguments:
+        -word (str): word to produce suggestions for
+        -limit (int, optional): number of suggestions. Defaulted to 3.
+
+        Returns:
+        -list: list of suggestions, closest first
+        """
+        suggestions = self.index.suggest(word, limit+len(self.removed))
+        return [suggestion for suggestion in suggestions if suggestion not in self.removed][:limit]
+
+    def needs_rebuild(self):
+        """
+        Tells if the wrapped index should be rebuilt without the removed words:
+        when there are more than max_removed of them (each one is an extra
+        candidate asked for on every suggest), or when its results are not exact
+        once filtered (NgramIndex, PhoneticIndex).
+
+        Returns:
+        -bool: True if the index should be rebuilt
+        """
+        return len(self.removed) > self.max_removed or isinstance(self.index, (NgramIndex, PhoneticIndex))
+
+    def stats(self):
+        """
+        Reports the size of the wrapped index.
+
+        Returns:
+        -dict: as the wrapped index's stats
+        """
+        return self.index.stats()
+
+#file polling, for hot reload of word files
+class FileWatcher():
+    """
+    Polls files for changes, by modification time and size, on a daemon thread,
+    calling back with the path of each changed file. Nothing is read from the
+    files here; a stat per file per interval is the whole cost.
+
+    Attributes:
+    -signatures (dict): path to (modification time, size), or None if missing
+    -callback (callable): called with the path of a changed file
+    -interval (float): seconds between polls
+    -stopped (threading.Event): set to stop polling
+    -thread (threading.Thread/None): polling thread
+
+    Arguments:
+    -paths (iterable): paths of files to watch
+    -callback (callable): called with the path of a changed file
+    -interval (float, optional): defaulted to 2.0
+
+    Methods:
+    -signature(path): static method, (modification time, size) of a file
+    -check(): polls once, calling back for each changed file
+    -start(): starts polling on a daemon thread
+    -stop(): stops polling
+    """
+    def __init__(self, paths, callback, interval=2.0):
+        self.signatures = {path: self.signature(path) for path in paths}
+        self.callback = callback
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = None
+
+    @staticmethod
+    def signature(path):
+        """
+        Gets the modification time and size of a file.
+
+        Arguments:
+        -path (str): path to file
+
+        Returns:
+        -tuple: (modification time in ns, size in bytes), else None if missing
+        """
+        try:
+            status = os.stat(path)
+            return (status.st_mtime_ns, status.st_size)
+        except OSError:
+            return None
+
+    def check(self):
+        """
+        Polls each file once, calling back for each file whose modification time or
+        size changed.
+
+        Returns:
+        -list: paths of changed files
+        """
+        changed = []
+        for path, previous in list(self.signatures.items()):
+            current = self.signature(path)
+            if current != previous:
+                self.signatures[path] = current
+                changed.append(path)
+                try:
+                    self.callback(path)
+                except Exception as e:
+                    print("Error reloading {}: {}".format(path, e))
+        return changed
+
+    def start(self):
+        """
+        Starts polling, every interval seconds, on a daemon thread.
+
+        Returns:
+        -None
+        """
+        def poll():
+            while not self.stopped.wait(self.interval):
+                self.check()
+        self.thread = threading.Thread(target=poll, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops polling.
+
+        Returns:
+        -None
+        """
+        self.stopped.set()
+
+#known words in layers (base, domain, team, personal), searched in priority order
+class LayeredDictionary():
+    """
+    Known words split into named layers, such as a base word list, domain
+    (medical, legal) and team lists, and the personal dictionary. Each layer is
+    loaded once and kept as it is; a lookup consults the layers in priority
+    order, and layers can be attached or detached at runtime without touching
+    the others. Words of the smaller layers are interned (see load_layer), so a
+    word found in several of them is one string object.
+
+    With a suggestion backend, each layer gets its own index, built when the
+    layer is attached; suggest merges the closest words of every layer, so
+    attaching a layer never rebuilds the indexes of the others.
+
+    Attributes:
+    -layers (OrderedDict): layer name to its words (set, CompiledDictionary,
+     Dawg...), highest priority first
+    -indexes (dict): layer name to its suggestion index
+    -suggest_backend (str/None): name of the suggestion backend of each layer
+    -writable (str): name of the layer that add puts words in
+
+    Arguments:
+    -layers (iterable, optional): (name, words) pairs, highest priority first.
+     Defaulted to None.
+    -writable (str, optional): defaulted to 'personal'
+
+    Methods:
+    -attach(name, words, first, before): adds (or replaces) a layer
+    -detach(name): removes a layer
+    -layer_of(word): name of the highest-priority layer holding word
+    -add(word): adds a word to the writable layer
+    -set_suggest_backend(suggest_backend): builds an index for each layer
+    -suggest(word, limit): closest words across all layers
+    -stats(): size of the layers and their indexes
+    """
+    def __init__(self, layers=None, writable="personal"):
+        self.layers = OrderedDict()
+        self.indexes = {}
+        self.suggest_backend = None
+        self.writable = writable
+        self.size = None
+        for name, words in layers or ():
+            self.attach(name, words)
+
+    def __contains__(self, word):
+        for words in self.layers.values():
+            if word in words:
+                return True
+        return False
+
+    def __iter__(self):
+        earlier = []
+        for words in self.layers.values():
+            for word in words:
+                if not any(word in higher for higher in earlier):
+                    yield word
+            earlier.append(words)
+
+    def __len__(self):
+        if self.size is None:
+            self.size = sum(1 for word in self)
+        return self.size
+
+    def attach(self, name, words, first=False, before=None, index=None):
+        """
+        Adds a layer, replacing any layer of the same name (which keeps its
+        place). New layers go last (lowest priority) unless first or before is
+        given. With a suggestion backend, an index is built for the layer only,
+        unless one is given; other layers keep theirs.
+
+        Arguments:
+        -name (str): layer name
+        -words (set or other word container): words of the layer
+        -first (bool, optional): if True, the layer is given the highest priority.
+         Defaulted to False.
+        -before (str, optional): name of a layer to place the new layer just above.
+         Defaulted to None.
+        -index (optional): suggestion index of words, already built with the
+         suggestion backend. Defaulted to None.
+
+        Returns:
+        -None
+        """
+        new_layer = name not in self.layers
+        self.layers[name] = words
+        if first:
+            self.layers.move_to_end(name, last=False)
+        elif new_layer and before in self.layers:
+            order = [layer for layer in self.layers if layer != name]
+            order.insert(order.index(before), name)
+            self.layers = OrderedDict((layer, self.layers[layer]) for layer in order)
+        self.indexes.pop(name, None)
+        if self.suggest_backend is not None:
+            if index is None:
+                index = build_suggest_index(self.suggest_backend, words)
+            if index is not None:
+                self.indexes[name] = index
+        self.size = None
+
+    def detach(self, name):
+        """
+        Removes a layer and its index.
+
+        Arguments:
+        -name (str): layer name
+
+        Returns:
+        -words of the layer, else None if there was no such layer
+        """
+        self.indexes.pop(name, None)
+        self.size = None
+        return self.layers.pop(name, None)
+
+    def layer_of(self, word):
+        """
+        Finds the highest-priority layer holding a word.
+
+        Arguments:
+        -word (str): word to look up
+
+        Returns:
+        -str: layer name, else None
+        """
+        for name, words in self.layers.items():
+            if word in words:
+                return name
+        return None
+
+    def add(self, word):
+        """
+        Adds a word to the writable layer (created, with the highest priority, if
+        missing) and to its index.
+
+        Arguments:
+        -word (str): word to be added
+
+        Returns:
+        -bool: True if word was added, False if it was already in some layer
+        """
+        if word in self:
+            return False
+        if self.writable not in self.layers:
+            self.attach(self.writable, set(), first=True)
+        self.layers[self.writable].add(word)
+        if self.writable in self.indexes:
+            self.indexes[self.writable].add(word)
+        if self.size is not None:
+            self.size += 1
+        return True
+
+    def set_suggest_backend(self, suggest_backend):
+        """
+        Builds an index, of the named backend, for each layer that lacks one.
+
+        Arguments:
+        -suggest_backend (str): name from SUGGEST_BACKENDS
+
+        Returns:
+        -None
+        """
+        if suggest_backend != self.suggest_backend:
+            self.indexes = {}
+        self.suggest_backend = suggest_backend
+        for name, words in self.layers.items():
+            if name not in self.indexes:
+                index = build_suggest_index(suggest_backend, words)
+                if index is not None:
+                    self.indexes[name] = index
+
+    def suggest(self, word, limit=3):
+        """
+        Gets the closest words across all layers, merging the closest words of each
+        layer's index (layers without an index are scanned). The result is the
+        same as a search of all layers' words at once.
+
+        Arguments:
+        -word (str): word to produce suggestions for
+        -limit (int, optional): number of suggestions. Defaulted to 3.
+
+        Returns:
+        -list: list of suggestions, closest first (ties alphabetical)
+        """
+        candidates = set()
+        for name, words in self.layers.items():
+            index = self.indexes.get(name)
+            if index is not None:
+                candidates.update(index.suggest(word, limit))
+            else:
+                candidates.update(heapq.nsmallest(limit, words, key=lambda known_word: (
+                    Levenshtein.distance(word, known_word), known_word)))
+        return heapq.nsmallest(limit, candidates, key=lambda known_word: (
+            Levenshtein.distance(word, known_word), known_word))
+
+    def stats(self):
+        """
+        Reports the size of the layers and their indexes.
+
+        Returns:
+        -dict: number of distinct words, number of layers, and approximate memory
+         (bytes) of the layer containers and indexes
+        """
+        memory = sum(sys.getsizeof(words) for words in self.layers.values())
+        memory += sum(index.stats()["memory"] for index in self.indexes.values())
+        return {"words": len(self), "entries": len(self.layers), "memory": memory}
+
+#compiled dictionary, memory-mapped
+class CompiledDictionary():
+    """
+    Read-only dictionary of known words, memory-mapped from a file written by
+    compile_dictionary. Words are looked up by binary search over the sorted
+    UTF-8 words, so no set of str objects is built, and the mapped pages are
+    shared between processes. Words added at runtime (personal dictionary,
+    'Add to dictionary') are kept in a small set on top.
+
+    File layout (integers are unsigned 32-bit, native byte order):
+    -magic (8 bytes), word count n
+    -n+1 offsets of each word into the word data, the last being its length
+    -word data: sorted, distinct UTF-8 words, concatenated
+
+    Attributes:
+    -path (str): path to compiled dictionary file
+    -count (int): number of words in the file
+    -offsets (memoryview): offsets of each word into the word data
+    -added (set): words added at runtime
+
+    Arguments:
+    -path (str): path to compiled dictionary file
+    -added (iterable, optional): words to add. Defaulted to None.
+
+    Methods:
+    -word(position): word at a position in the sorted file
+    -add(word): adds a word on top of the file
+    -update(words): adds words on top of the file
+    -close(): unmaps the file
+    -stats(): size of the dictionary
+    """
+    magic = b"SPDICT01"
+    header = struct.Struct("=8sI")
+
+    def __init__(self, path, added=None):
+        self.path = path
+        self.added = set(added or ())
+        with open(path, 'rb') as compiled_file:
+            self.data = mmap.mmap(compiled_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = self.header.unpack_from(self.data, 0)
+        if magic != self.magic:
+            self.data.close()
+            raise ValueError("Not a compiled dictionary: {}".format(path))
+        self.words_start = self.header.size+4*(self.count+1)
+        self.offsets = memoryview(self.data)[self.header.size:self.words_start].cast("I")
+
+    def __reduce__(self):
+        return (CompiledDictionary, (self.path, self.added))
+
+    def __len__(self):
+        return self.count+len(self.added)
+
+    def __iter__(self):
+        for position in range(self.count):
+            yield self.word(position)
+        yield from self.added
+
+    def __contains__(self, word):
+        if not isinstance(word, str):
+            return False
+        if word in self.added:
+            return True
+        try:
+            key = word.encode('utf-8')
+        except UnicodeEncodeError:
+            return False
+        low, high = 0, self.count
+        data, offsets, start = self.data, self.offsets, self.words_start
+        while low < high:
+            middle = (low+high)//2
+            if data[start+offsets[middle]:start+offsets[middle+1]] < key:
+                low = middle+1
+            else:
+                high = middle
+        return low < self.count and data[start+offsets[low]:start+offsets[low+1]] == key
+
+    def word(self, position):
+        """
+        Gets the word at a position in the sorted file.
+
+        Arguments:
+        -position (int): position, from 0 to count-1
+
+        Returns:
+        -str: word
+        """
+        start = self.words_start
+        return self.data[start+self.offsets[position]:start+self.offsets[position+1]].decode('utf-8')
+
+    def add(self, word):
+        """
+        Adds a word on top of the file (the file itself is not changed).
+
+        Arguments:
+        -word (str): word to add
+
+        Returns:
+        -None
+        """
+        if word not in self:
+            self.added.add(word)
+
+    def update(self, words):
+        """
+        Adds words on top of the file.
+
+        Arguments:
+        -words (iterable): words to add
+
+        Returns:
+        -None
+        """
+        for word in words:
+            self.add(word)
+
+    def close(self):
+        """
+        Unmaps the file. The dictionary can no longer be used afterwards.
+
+        Returns:
+        -None
+        """
+        self.offsets.release()
+        self.data.close()
+
+    def stats(self):
+        """
+        Gets size of the dictionary.
+
+        Returns:
+        -dict: number of words, words in the file, and bytes mapped
+        """
+        return {"words": len(self), "entries": self.count, "memory": len(self.data)}
+
+#fast-reject filter for known words
+class BloomFilter():
+    """
+    Bloom filter: a bit array with num_hashes bits set per word. A word with any
+    of its bits unset was never added; a word with all bits set probably was (the
+    false-positive rate is fixed by the size of the array). Bit positions come
+    from a 128-bit BLAKE2b digest of the word, split into two 64-bit hashes
+    h1, h2, as h1 + i*h2 mod num_bits; the digest is the same in every process,
+    so the filter can be saved and loaded.
+
+    Attributes:
+    -num_bits (int): size of the bit array
+    -num_hashes (int): bits set per word
+    -false_positive_rate (float): rate the filter was sized for
+    -count (int): number of words added
+    -bits (bytearray): bit array
+
+    Arguments:
+    -words (iterable, optional): words to add. Defaulted to None.
+    -capacity (int, optional): expected number of words. Defaulted to the number
+     of words, if they can be counted, else 1000.
+    -false_positive_rate (float, optional): defaulted to 0.01
+
+    Methods:
+    -add(word): adds a word
+    -save(path): writes the filter to a file
+    -load(path): class method, reads a filter written by save
+    -stats(): size of the filter
+    """
+    magic = b"SPBLOOM1"
+    header = struct.Struct("<8sQIQd")
+
+    def __init__(self, words=None, capacity=None, false_positive_rate=0.01):
+        if capacity is None:
+            capacity = len(words) if hasattr(words, "__len__") else 1000
+        capacity = max(capacity, 1)
+        self.false_positive_rate = false_positive_rate
+        self.num_bits = max(8, int(math.ceil(-capacity*math.log(false_positive_rate)/(math.log(2)**2))))
+        self.num_hashes = max(1, int(round(self.num_bits/capacity*math.log(2))))
+        self.bits = bytearray((self.num_bits+7)//8)
+        self.count = 0
+        for word in words or ():
+            self.add(word)
+
+    def __len__(self):
+        return self.count
+
+    def positions(self, word):
+        """
+        Gets the bit positions of a word.
+
+        Arguments:
+        -word (str): word to hash
+
+        Returns:
+        -generator: num_hashes bit positions
+        """
+        digest = hashlib.blake2b(word.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first+i*second) % self.num_bits for i in range(self.num_hashes))
+
+    def __contains__(self, word):
+        digest = hashlib.blake2b(word.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        position = int.from_bytes(digest[:8], 'little') % self.num_bits
+        step = (int.from_bytes(digest[8:], 'little') | 1) % self.num_bits
+        bits, num_bits = self.bits, self.num_bits
+        for _ in range(self.num_hashes):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            position += step
+            if position >= num_bits:
+                position -= num_bits
+        return True
+
+    def add(self, word):
+        """
+        Adds a word to the filter.
+
+        Arguments:
+        -word (str): word to add
+
+        Returns:
+        -None
+        """
+        for position in self.positions(word):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def save(self, path):
+        """
+        Writes the filter to a file, under a temporary name and then renamed.
+
+        Arguments:
+        -path (str): path of file to write
+
+        Returns:
+        -None
+        """
+        temporary_path = path+".tmp"
+        with open(temporary_path, 'wb') as bloom_file:
+            bloom_file.write(self.header.pack(self.magic, self.num_bits, self.num_hashes, self.count,
+                                              self.false_positive_rate))
+            bloom_file.write(self.bits)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a filter written by save.
+
+        Arguments:
+        -path (str): path of file to read
+
+        Returns:
+        -BloomFilter: the filter
+        """
+        with open(path, 'rb') as bloom_file:
+            data = bloom_file.read()
+        magic, num_bits, num_hashes, count, false_positive_rate = cls.header.unpack_from(data, 0)
+        if magic != cls.magic or len(data)-cls.header.size != (num_bits+7)//8:
+            raise ValueError("Not a Bloom filter: {}".format(path))
+        bloom = cls.__new__(cls)
+        bloom.num_bits, bloom.num_hashes, bloom.count = num_bits, num_hashes, count
+        bloom.false_positive_rate = false_positive_rate
+        bloom.bits = bytearray(data[cls.header.size:])
+        return bloom
+
+    def stats(self):
+        """
+        Gets size of the filter.
+
+        Returns:
+        -dict: number of words, bits per word, and bytes used by the bit array
+        """
+        return {"words": self.count, "entries": self.num_hashes, "memory": len(self.bits)}
+
+#word frequencies, for ranking suggestions
+class FrequencyTable():
+    """
+    Frequency of each known word, in compact arrays. Known words are stored most
+    frequent first (ties alphabetical), so a word's ID is its rank, and the
+    frequency of each ID is stored in an array('I'). A second array holds the IDs
+    in alphabetical order, for finding a word's ID by binary search. For 370k
+    words, the arrays take about 3 MB and the list of (shared) word references
+    about 3 MB.
+
+    Attributes:
+    -words (list): known words, most frequent first; a word's position is its ID
+    -frequencies (array): frequency of each word ID (0 if not in the list)
+    -alphabetical (array): word IDs, in alphabetical order of word
+    -added (list): words added after the table was built, with frequency 0
+    -candidates (int): number of index suggestions reranked by frequency
+    -chunk_size (int): number of words compared per step of nearest
+    -longest (int): length of the longest word, bounding any distance
+
+    Arguments:
+    -known_words (iterable): known words
+    -lines (iterable, optional): lines of a frequency list, each 'word count', or
+     just 'word' with the most frequent first. Defaulted to None.
+    -candidates (int, optional): defaulted to 10
+    -chunk_size (int, optional): defaulted to 4096
+
+    Methods:
+    -word_id(word): ID of word, else None
+    -frequency(word): frequency of word
+    -add(word): adds a word with frequency 0
+    -nearest(word, limit): closest words, most frequent first among ties
+    -rerank(word, suggestions): suggestions sorted by distance, then frequency
+    -stats(): size of the table
+    """
+    max_frequency = 0xFFFFFFFF
+
+    def __init__(self, known_words, lines=None, candidates=10, chunk_size=4096):
+        self.candidates = candidates
+        self.chunk_size = chunk_size
+        self.added = []
+        counts = dict.fromkeys(known_words, 0)
+        line_count = 0
+        rank_lines = []
+        for line in lines or ():
+            parts = line.split()
+            if not parts:
+                continue
+            line_count += 1
+            if parts[0] not in counts:
+                continue
+            if len(parts) > 1 and parts[-1].isdigit():
+                counts[parts[0]] = min(int(parts[-1]), self.max_frequency)
+            else:
+                rank_lines.append((parts[0], line_count))
+        for word, line_number in rank_lines:
+            counts[word] = line_count-line_number+1
+        self.words = sorted(counts, key=lambda word: (-counts[word], word))
+        self.frequencies = array('I', (counts[word] for word in self.words))
+        words = self.words
+        self.alphabetical = array('I', sorted(range(len(words)), key=words.__getitem__))
+        self.longest = max(map(len, words), default=0)
+
+    def __len__(self):
+        return len(self.words)+len(self.added)
+
+    def word_id(self, word):
+        """
+        Finds the ID of a word, by binary search over the alphabetical order.
+
+        Arguments:
+        -word (str): word to find
+
+        Returns:
+        -int: ID of word, else None
+        """
+        low, high = 0, len(self.alphabetical)
+        while low < high:
+            middle = (low+high)//2
+            if self.words[self.alphabetical[middle]] < word:
+                low = middle+1
+            else:
+                high = middle
+        if low < len(self.alphabetical) and self.words[self.alphabetical[low]] == word:
+            return self.alphabetical[low]
+        return None
+
+    def frequency(self, word):
+        """
+        Gets the frequency of a word.
+
+        Arguments:
+        -word (str): word to look up
+
+        Returns:
+        -int: frequency, 0 if the word is not in the table
+        """
+        word_id = self.word_id(word)
+        return 0 if word_id is None else self.frequencies[word_id]
+
+    def add(self, word):
+        """
+        Adds a word, with frequency 0, so that it is still searched by nearest.
+
+        Arguments:
+        -word (str): word to be added
+
+        Returns:
+        -bool: True if word was added, False if it was already in the table
+        """
+        if self.word_id(word) is not None or word in self.added:
+            return False
+        self.added.append(word)
+        return True
+
+    def nearest(self, word, limit):
+        """
+        Gets the closest words to word, ranked by (distance, -frequency, word).
+        Words are compared most frequent first, chunk_size at a time, with each
+        distance cut off at the current worst kept distance. Once limit words are
+        found at the smallest possible distance (1 for an unknown word), no less
+        frequent word can rank higher, so the search stops.
+
+        Arguments:
+        -word (str): word to produce suggestions for
+        -limit (int): number of suggestions
+
+        Returns:
+        -list: list of suggestions, closest first
+        """
+        best = []
+        if limit <= 0:
+            return best
+        floor = 0 if self.word_id(word) is not None or word in self.added else 1
+        bound = max(len(word), self.longest)
+        for start in range(0, len(self.words), self.chunk_size):
+            chunk = self.words[start:start+self.chunk_size]
+            distances = [Levenshtein.distance(word, known_word, score_cutoff=bound) for known_word in chunk]
+            for offset in [offset for offset, distance in enumerate(distances) if distance <= bound]:
+                key = (distances[offset], -self.frequencies[start+offset], chunk[offset])
+                if len(best) < limit or key < best[-1]:
+                    bisect.insort(best, key)
+                    if len(best) > limit:
+                        best.pop()
+                    if len(best) == limit:
+                        bound = best[-1][0]
+            if len(best) == limit and bound <= floor:
+                break
+        for known_word in self.added:
+            key = (Levenshtein.distance(word, known_word), 0, known_word)
+            if len(best) < limit or key < best[-1]:
+                bisect.insort(best, key)
+                if len(best) > limit:
+                    best.pop()
+        return [known_word for distance, frequency, known_word in best]
+
+    def rerank(self, word, suggestions):
+        """
+        Sorts suggestions by distance to word, then by frequency (most frequent
+        first), then alphabetically.
+
+        Arguments:
+        -word (str): the misspelling
+        -suggestions (list): candidate known words
+
+        Returns:
+        -list: suggestions, best first
+        """
+        return sorted(suggestions, key=lambda suggestion: (Levenshtein.distance(word, suggestion),
+                                                           -self.frequency(suggestion), suggestion))
+
+    def stats(self):
+        """
+        Gets size of the table.
+
+        Returns:
+        -dict: number of words, and bytes used by the frequency and ID arrays
+        """
+        return {"words": len(self), "entries": len(self.frequencies),
+                "memory": (self.frequencies.itemsize*len(self.frequencies)
+                           + self.alphabetical.itemsize*len(self.alphabetical))}
+
+#suggestion cache, least-recently-used
+class SuggestionCache():
+    """
+    Bounded least-recently-used cache of suggestion lists. Entries are keyed by
+    word and the spellchecker's dictionary version, so once known or ignored words
+    change, older entries are never returned again; they are evicted as newer
+    entries push them out.
+
+    Attributes:
+    -maxsize (int): maximum number of entries
+    -entries (OrderedDict): maps (word, version) to tuple of suggestions, least
+     recently used first
+    -hits (int): number of lookups found in the cache
+    -misses (int): number of lookups not found in the cache
+    -evictions (int): number of entries dropped to stay within maxsize
+
+    Arguments:
+    -maxsize (int, optional): defaulted to 1024
+
+    Methods:
+    -get(word, version): cached suggestions, else None
+    -put(word, version, suggestions): stores suggestions
+    -stats(): hit/miss/eviction counts
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, word, version):
+        """
+        Gets cached suggestions for a word, at a dictionary version.
+
+        Arguments:
+        -word (str): word that was searched for
+        -version (int): current dictionary version
+
+        Returns:
+        -list: copy of the cached suggestions, else None
+        """
+        key = (word, version)
+        suggestions = self.entries.get(key)
+        if suggestions is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return list(suggestions)
+
+    def put(self, word, version, suggestions):
+        """
+        Stores suggestions for a word, as a tuple (so callers cannot change the
+        cached entry), evicting the least recently used entries if the cache is full.
+
+        Arguments:
+        -word (str): word that was searched for
+        -version (int): dictionary version the suggestions were made at
+        -suggestions (list): list of suggestions
+
+        Returns:
+        -None
+        """
+        key = (word, version)
+        self.entries[key] = tuple(suggestions)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Reports cache statistics.
+
+        Returns:
+        -dict: hits, misses, evictions, size and maxsize
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self.entries), "maxsize": self.maxsize}
+
+#keyboard-weighted edit distance, for ranking suggestions
+class KeyboardDistance():
+    """
+    Edit distance in which substituting a character with one near it on the
+    keyboard costs less than substituting one far away. Substitution costs are
+    compiled from similarity_scores.sim_score into a flat array, indexed by
+    row*width+column, rather than looked up by tuple key. Insertions and deletions
+    cost 1; substitutions cost 1-weight*similarity (a character not in the table
+    costs 1). With weight at most 0.5, two substitutions never cost less than one
+    insertion or deletion, so keyboard proximity reorders suggestions with the
+    same number of edits rather than overriding Levenshtein distance.
+
+    The table is not symmetric, so the larger similarity of the two directions is
+    used.
+
+    Attributes:
+    -alphabet (str): characters in the table; a character's index is its row/column
+    -width (int): number of characters in the table
+    -costs (array): flat width*width array of substitution costs
+    -candidates (int): number of Levenshtein-closest words that are reranked
+
+    Arguments:
+    -scores (dict, optional): maps (char, char) to similarity in [0, 1]. Defaulted
+     to similarity_scores.sim_score.
+    -weight (float, optional): how much similarity lowers substitution cost.
+     Defaulted to 0.5.
+    -candidates (int, optional): defaulted to 6
+
+    Methods:
+    -distance(word, other): keyboard-weighted edit distance
+    -rerank(word, suggestions): suggestions sorted by keyboard-weighted distance
+    """
+    def __init__(self, scores=None, weight=0.5, candidates=6):
+        if scores is None:
+            scores = similarity_scores.sim_score
+        self.alphabet = "".join(sorted(set(char for pair in scores for char in pair)))
+        self.width = len(self.alphabet)
+        self.candidates = candidates
+        self.costs = array('d', [1.0])*(self.width*self.width)
+        for row, first in enumerate(self.alphabet):
+            for column, second in enumerate(self.alphabet):
+                similarity = max(scores.get((first, second), 0.0), scores.get((second, first), 0.0))
+                self.costs[row*self.width+column] = 0.0 if first == second else 1.0-weight*similarity
+        self.char_index = {char: index for index, char in enumerate(self.alphabet)}
+
+    def substitution_cost(self, first, second):
+        """
+        Gets the cost of substituting one character with another.
+
+        Arguments:
+        -first (str): character in the misspelling
+        -second (str): character in the known word
+
+        Returns:
+        -float: cost, between 0 and 1
+        """
+        if first == second:
+            return 0.0
+        row = self.char_index.get(first.lower())
+        column = self.char_index.get(second.lower())
+        if row is None or column is None:
+            return 1.0
+        return self.costs[row*self.width+column]
+
+    def distance(self, word, other):
+        """
+        Computes the keyboard-weighted edit distance between two words, one row
+        of the distance table at a time.
+
+        Arguments:
+        -word (str): the misspelling
+        -other (str): a known word
+
+        Returns:
+        -float: weighted edit distance
+        """
+        costs = self.costs
+        width = self.width
+        char_index = self.char_index
+        word_rows = [char_index.get(char, -1) for char in word.lower()]
+        other_columns = [char_index.get(char, -1) for char in other.lower()]
+        prev_row = [float(column) for column in range(len(other_columns)+1)]
+        for row_index, row in enumerate(word_rows):
+            left = row_index+1.0
+            curr_row = [left]
+            for column, (diagonal, above) in enumerate(zip(prev_row, prev_row[1:])):
+                column_char = other_columns[column]
+                if row == column_char and row != -1:
+                    substitution = diagonal
+                elif row == -1 or column_char == -1:
+                    substitution = diagonal+1.0
+                else:
+                    substitution = diagonal+costs[row*width+column_char]
+                left = min(left+1.0, above+1.0, substitution)
+                curr_row.append(left)
+            prev_row = curr_row
+        return prev_row[-1]
+
+    def rerank(self, word, suggestions):
+        """
+        Sorts suggestions by keyboard-weighted distance to word (ties alphabetical).
+
+        Arguments:
+        -word (str): the misspelling
+        -suggestions (list): candidate known words
+
+        Returns:
+        -list: suggestions, closest first
+        """
+        return sorted(suggestions, key=lambda suggestion: (self.distance(word, suggestion), suggestion))
+
+#suggestion index, BK-tree
+class BKTree():
+    """
+    Burkhard-Keller tree over known words, keyed by Levenshtein distance. Each
+    child of a node is stored under its distance to that node, so by the triangle
+    inequality, a search only has to visit children whose key is within the search
+    radius of the distance to the node.
+
+    Attributes:
+    -root (list/None): root node, as [word, {distance: child node}]
+    -size (int): number of words in the tree
+    -max_distance (int): radius of the first, cheap search done by suggest
+
+    Arguments:
+    -known_words (iterable, optional): words to build the tree from. Defaulted to None.
+    -max_distance (int, optional): search radius for suggest. Defaulted to 2.
+
+    Methods:
+    -add(word): adds a word to the tree
+    -query(word, radius): all words within radius of word
+    -nearest(word, limit, radius): closest words to word
+    -suggest(word, limit): closest words, same order as Suggester.get_suggestions
+    """
+    def __init__(self, known_words=None, max_distance=2):
+        self.root = None
+        self.size = 0
+        self.max_distance = max_distance
+        for word in known_words or ():
+            self.add(word)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, word):
+        """
+        Adds a word to the tree, if it is not already in it.
+
+        Arguments:
+        -word (str): word to be added
+
+        Returns:
+        -bool: True if word was added, False if it was already in the tree
+        """
+        if self.root is None:
+            self.root = [word, {}]
+            self.size = 1
+            return True
+        node = self.root
+        while True:
+            distance = Levenshtein.distance(word, node[0])
+            if distance == 0:
+                return False
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [word, {}]
+                self.size += 1
+                return True
+            node = child
+
+    def query(self, word, radius):
+        """
+        Finds all words in the tree within a given distance of word.
+
+        Arguments:
+        -word (str): word to search around
+        -radius (int): maximum Levenshtein distance of results
+
+        Returns:
+        -list: list of (distance, word) tuples, sorted
+        """
+        found = []
+        if self.root is None:
+            return found
+        stack = [self.root]
+        while stack:
+            node_word, children = stack.pop()
+            distance = Levenshtein.distance(word, node_word)
+            if distance <= radius:
+                found.append((distance, node_word))
+            for child_distance, child in children.items():
+                if distance-radius <= child_distance <= distance+radius:
+                    stack.append(child)
+        found.sort()
+        return found
+
+    def nearest(self, word, limit, radius=None):
+        """
+        Finds the closest words in the tree to word. The search radius shrinks to
+        the distance of the worst kept result, once limit results are found.
+
+        Arguments:
+        -word (str): word to search around
+        -limit (int): maximum number of results
+        -radius (int, optional): maximum Levenshtein distance of results. Defaulted
+         to None (no maximum).
+
+        Returns:
+        -list: list of (distance, word) tuples, sorted by distance then word
+        """
+        best = []
+        if self.root is None or limit <= 0:
+            return best
+        bound = radius
+        stack = [self.root]
+        while stack:
+            node_word, children = stack.pop()
+            distance = Levenshtein.distance(word, node_word)
+            if bound is None or distance <= bound:
+                bisect.insort(best, (distance, node_word))
+                if len(best) > limit:
+                    best.pop()
+                if len(best) == limit:
+                    bound = best[-1][0]
+            for child_distance, child in children.items():
+                if bound is None or distance-bound <= child_distance <= distance+bound:
+                    stack.append(child)
+        return best
+
+    def suggest(self, word, limit=3):
+        """
+        Gets the closest words to word, searching within max_distance first and
+        only widening the search if that finds fewer than limit words.
+
+        Arguments:
+        -word (str): word to produce suggestions for
+        -limit (int, optional): number of suggestions. Defaulted to 3.
+
+        Returns:
+        -list: list of suggestions, closest first
+        """
+        best = self.nearest(word, limit, self.max_distance)
+        if len(best) < limit and len(best) < self.size:
+            best = self.nearest(word, limit)
+        return [known_word for distance, known_word in best]
+
+    def stats(self):
+        """
+        Reports the size of the tree.
+
+        Returns:
+        -dict: number of words, number of nodes, and approximate memory (bytes)
+         of the tree structure (words themselves are shared with known_words)
+        """
+        memory = 0
+        nodes = 0
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            nodes += 1
+            memory += sys.getsizeof(node) + sys.getsizeof(node[1])
+            stack.extend(node[1].values())
+        return {"words": self.size, "entries": nodes, "memory": memory}
+
+#second suggestion engine, SymSpell
+class SymSpellSuggester():
+    """
+    Suggestion engine based on the SymSpell symmetric delete algorithm. Every
+    string reachable by deleting up to max_distance characters from a known word
+    is precomputed into a hash index. A lookup only generates the deletes of the
+    misspelling and probes the index, then verifies the few candidates with
+    Levenshtein distance.
+
+    Two words within Levenshtein distance d always share a string reachable by at
+    most d deletes from each, so every known word within max_distance is found.
+    Words further than max_distance are never suggested.
+
+    Attributes:
+    -max_distance (int): maximum edit distance of suggestions
+    -prefix_length (int): only the first prefix_length characters of a word are
+     used for deletes, which bounds the size of the index for long words
+    -deletes (dict): maps delete-variant (str) to a known word (str), or to a
+     list of known words when more than one shares the delete-variant
+    -size (int): number of words indexed
+
+    Arguments:
+    -known_words (iterable, optional): words to build the index from. Defaulted to None.
+    -max_distance (int, optional): defaulted to 2
+    -prefix_length (int, optional): defaulted to 7
+
+    Methods:
+    -add(word): adds a word to the index
+    -suggest(word, limit): closest words, same order as Suggester.get_suggestions
+    -stats(): size of the index
+    """
+    def __init__(self, known_words=None, max_distance=2, prefix_length=7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.deletes = {}
+        self.size = 0
+        for word in known_words or ():
+            self.add(word)
+
+    def __len__(self):
+        return self.size
+
+    def get_deletes(self, word):
+        """
+        Generates all strings reachable by deleting up to max_distance characters
+        from the prefix of word.
+
+        Arguments:
+        -word (str): word to generate deletes for
+
+        Returns:
+        -set: set of delete-variants, including the prefix itself
+        """
+        prefix = word[:self.prefix_length]
+        deletes = {prefix}
+        edits = [prefix]
+        for _ in range(self.max_distance):
+            next_edits = []
+            for edit in edits:
+                for index in range(len(edit)):
+                    delete = edit[:index]+edit[index+1:]
+                    if delete not in deletes:
+                        deletes.add(delete)
+                        next_edits.append(delete)
+            edits = next_edits
+        return deletes
+
+    def add(self, word):
+        """
+        Adds a word, and its delete-variants, to the index.
+
+        Arguments:
+        -word (str): word to be added
+
+        Returns:
+        -bool: True if word was added, False if it was already indexed
+        """
+        entry = self.deletes.get(word[:self.prefix_length])
+        if entry is not None and (entry == word if isinstance(entry, str) else word in entry):
+            return False
+        for delete in self.get_deletes(word):
+            entry = self.deletes.get(delete)
+            if entry is None:
+                self.deletes[delete] = word
+            elif isinstance(entry, str):
+                self.deletes[delete] = [entry, word]
+            else:
+                entry.append(word)
+        self.size += 1
+        return True
+
+    def suggest(self, word, limit=3):
+        """
+        Gets the closest known words to word, within max_distance.
+
+        Arguments:
+        -word (str): word to produce suggestions for
+        -limit (int, optional): number of suggestions. Defaulted to 3.
+
+        Returns:
+        -list: list of suggestions, closest first (ties alphabetical)
+        """
+        candidates = set()
+        for delete in self.get_deletes(word):
+            entry = self.deletes.get(delete)
+            if entry is None:
+                continue
+            if isinstance(entry, str):
+                candidates.add(entry)
+            else:
+                candidates.update(entry)
+        found = []
+        for candidate in candidates:
+            if abs(len(candidate)-len(word)) <= self.max_distance:
+                distance = Levenshtein.distance(word, candidate)
+                if distance <= self.max_distance:
+                    found.append((distance, candidate))
+        found.sort()
+        return [known_word for distance, known_word in found[:limit]]
+
+    def stats(self):
+        """
+        Reports the size of the index.
+
+        Returns:
+        -dict: number of words, number of delete-variants, and approximate
+         memory (bytes) of the index, including the delete strings
+        """
+        memory = sys.getsizeof(self.deletes)
+        for delete, entry in self.deletes.items():
+            memory += sys.getsizeof(delete)
+            if not isinstance(entry, str):
+                memory += sys.getsizeof(entry)
+        return {"words": self.size, "entries": len(self.deletes), "memory": memory}
+
+#bounded suggestion search, words bucketed by length
+class LengthBuckets():
+    """
+    Known words bucketed by length, for a bounded suggestion search. The
+    difference in length of two words is a lower bound on their Levenshtein
+    distance, so buckets are scanned outward from the length of the misspelling,
+    and the search stops once the length gap is larger than the distance of the
+    current third-best suggestion. Each distance is computed with a cutoff at that
+    distance, so most candidates are rejected without a full computation.
+
+    Attributes:
+    -buckets (dict): maps word length (int) to set of known words of that length
+    -size (int): number of words
+    -max_distance (int/None): optional bound on distance of suggestions
+
+    Arguments:
+    -known_words (iterable, optional): words to bucket. Defaulted to None.
+    -max_distance (int, optional): if given, words further than this are never
+     suggested. Defaulted to None (same results as a full scan).
+
+    Methods:
+    -add(word): adds a word to its bucket
+    -suggest(word, limit): closest words, same order as Suggester.get_suggestions
+    -stats(): size of the buckets
+    """
+    def __init__(self, known_words=None, max_distance=None):
+        self.buckets = {}
+        self.size = 0
+        self.max_distance = max_distance
+        for word in known_words or ():
+            self.add(word)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, word):
+        """
+        Adds a word to the bucket for its length.
+
+        Arguments:
+        -word (str): word to be added
+
+        Returns:
+        -bool: True if word was added, False if it was already in a bucket
+        """
+        bucket = self.buckets.setdefault(len(word), set())
+        if word in bucket:
+            return False
+        bucket.add(word)
+        self.size += 1
+        return True
+
+    def suggest(self, word, limit=3):
+        """
+        Gets the closest known words to word, scanning only the buckets that could
+        hold a word closer than the current third-best.
+
+        Arguments:
+        -word (str): word to produce suggestions for
+        -limit (int, optional): number of suggestions. Defaulted to 3.
+
+        Returns:
+        -list: list of suggestions, closest first (ties alphabetical)
+        """
+        best = []
+        if not self.buckets or limit <= 0:
+            return best
+        bound = self.max_distance
+        length = len(word)
+        max_gap = max(length, max(self.buckets)-length)
+        for gap in range(max_gap+1):
+            if bound is not None and gap > bound:
+                break
+            for bucket_length in ((length,) if gap == 0 else (length-gap, length+gap)):
+                for known_word in self.buckets.get(bucket_length, ()):
+                    if bound is None:
+                        distance = Levenshtein.distance(word, known_word)
+                    else:
+                        distance = Levenshtein.distance(word, known_word, score_cutoff=bound)
+                        if distance > bound:
+                            continue
+                    if len(best) < limit or (distance, known_word) < best[-1]:
+                        bisect.insort(best, (distance, known_word))
+                        if len(best) > limit:
+                            best.pop()
+                        if len(best) == limit:
+                            bound = best[-1][0]
+        return [known_word for distance, known_word in best]
+
+    def stats(self):
+        """
+        Reports the size of the buckets.
+
+        Returns:
+        -dict: number of words, number of buckets, and approximate memory (bytes)
+         of the bucket sets (words themselves are shared with known_words)
+        """
+        memory = sys.getsizeof(self.buckets)
+        for bucket in self.buckets.values():
+            memory += sys.getsizeof(bucket)
+        return {"words": self.size, "entries": len(self.buckets), "memory": memory}
+
+#trie suggestion search, DP rows shared across prefixes
+class SuggestionTrie():
+    """
+    Trie over known words, searched by walking the tree while carrying one row of
+    the Levenshtein distance table per node. Words that share a prefix share the
+    rows for that prefix, and a whole subtree is skipped once the smallest value in
+    its row is larger than the distance of the current third-best suggestion (no
+    word below it can be closer).
+
+    Attributes:
+    -root (list): root node, as [{character: child node}, word or None]
+    -size (int): number of words in the trie
+    -max_distance (int): radius of the first, cheap search done by suggest
+
+    Arguments:
+    -known_words (iterable, optional): words to build the trie from. Defaulted to None.
+    -max_distance (int, optional): search radius for suggest. Defaulted to 2.
+
+    Methods:
+    -add(word): adds a word to the trie
+    -nearest(word, limit, radius): closest words to word
+    -suggest(word, limit): closest words, same order as Suggester.get_suggestions
+    -stats(): size of the trie
+    """
+    def __init__(self, known_words=None, max_distance=2):
+        self.root = [{}, None]
+        self.size = 0
+        self.max_distance = max_distance
+        for word in known_words or ():
+            self.add(word)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, word):
+        """
+        Adds a word to the trie.
+
+        Arguments:
+        -word (str): word to be added
+
+        Returns:
+        -bool: True if word was added, False if it was already in the trie
+        """
+        node = self.root
+        for char in word:
+            child = node[0].get(char)
+            if child is None:
+                child = [{}, None]
+                node[0][char] = child
+            node = child
+        if node[1] is not None:
+            return False
+        node[1] = word
+        self.size += 1
+        return True
+
+    def nearest(self, word, limit, radius=None):
+        """
+        Finds the closest words in the trie to word, pruning subtrees whose
+        distance row cannot beat the worst kept result.
+
+        Arguments:
+        -word (str): word to search around
+        -limit (int): maximum number of results
+        -radius (int, optional): maximum Levenshtein distance of results. Defaulted
+         to None (no maximum).
+
+        Returns:
+        -list: list of (distance, word) tuples, sorted by distance then word
+        """
+        best = []
+        if limit <= 0:
+            return best
+        bound = radius
+        first_row = list(range(len(word)+1))
+        if self.root[1] is not None and (bound is None or first_row[-1] <= bound):
+            best.append((first_row[-1], self.root[1]))
+        stack = [(char, child, first_row) for char, child in self.root[0].items()]
+        while stack:
+            char, node, prev_row = stack.pop()
+            left = prev_row[0]+1
+            row = [left]
+            for word_char, diagonal, above in zip(word, prev_row, prev_row[1:]):
+                left = min(left+1, above+1, diagonal+(word_char != char))
+                row.append(left)
+            if node[1] is not None and (bound is None or row[-1] <= bound):
+                if len(best) < limit or (row[-1], node[1]) < best[-1]:
+                    bisect.insort(best, (row[-1], node[1]))
+                    if len(best) > limit:
+                        best.pop()
+                    if len(best) == limit:
+                        bound = best[-1][0]
+            if node[0] and (bound is None or min(row) <= bound):
+                for child_char, child in node[0].items():
+                    stack.append((child_char, child, row))
+        return best
+
+    def suggest(self, word, limit=3):
+        """
+        Gets the closest words to word, searching within max_distance first and
+        widening the radius one edit at a time while that finds fewer than limit
+        words (a tight radius prunes far more of the trie than an open search).
+
+        Arguments:
+        -word (str): word to produce suggestions for
+        -limit (int, optional): number of suggestions. Defaulted to 3.
+
+        Returns:
+        -list: list of suggestions, closest first (ties alphabetical)
+        """
+        radius = self.max_distance
+        best = self.nearest(word, limit, radius)
+        while len(best) < limit and len(best) < self.size:
+            radius += 1
+            best = self.nearest(word, limit, radius)
+        return [known_word for distance, known_word in best]
+
+    def stats(self):
+        """
+        Reports the size of the trie.
+
+        Returns:
+        -dict: number of words, number of nodes, and approximate memory (bytes)
+         of the trie structure
+        """
+        memory = 0
+        nodes = 0
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            nodes += 1
+            memory += sys.getsizeof(node) + sys.getsizeof(node[0])
+            stack.extend(node[0].values())
+        return {"words": self.size, "entries": nodes, "memory": memory}
+
+#known words keyed by lowercase form, with a case class per entry
+class CaseTable():
+    """
+    Known words keyed by their lowercase form, each with a precomputed case
+    class: always-lower ('jolly', any capitalization accepted), proper noun
+    ('Christmas', accepted capitalized or all caps), acronym ('NASA', accepted
+    in all caps) or mixed case ('iPhone', exact forms kept aside). Always-lower
+    words, nearly all of a dictionary, are kept in a set, so a known token costs
+    one lowercase and one hash probe whatever its capitalization; only tokens
+    missing from it look up the (small) table of the other classes.
+
+    Attributes:
+    -lower (set): always-lower words
+    -classes (dict): lowercase form of other words to their case classes (bit flags)
+    -forms (dict): lowercase form of mixed-case words to their exact forms
+    -size (int): number of words
+
+    Arguments:
+    -known_words (iterable, optional): words to build the table from. Defaulted to None.
+
+    Methods:
+    -case_class(word, key): case class of a word (static)
+    -accepts(word): True if a token, as typed, is a known word
+    -add(word): adds a word
+    -discard(word): removes a word
+    -copy(): copy of the table
+    -stats(): size of the table
+    """
+    lower_case = 1
+    proper_noun = 2
+    acronym = 4
+    mixed_case = 8
+
+    def __init__(self, known_words=None):
+        self.lower = set()
+        self.classes = {}
+        self.forms = {}
+        self.size = 0
+        for word in known_words or ():
+            self.add(word)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, word):
+        if not isinstance(word, str):
+            return False
+        key = word.lower()
+        if word == key:
+            return word in self.lower
+        case = self.classes.get(key, 0)
+        return bool((case & CaseTable.proper_noun and word == key.capitalize()) or (
+            case & CaseTable.acronym and word == key.upper()) or (
+            case & CaseTable.mixed_case and word in self.forms[key]))
+
+    def __iter__(self):
+        yield from self.lower
+        for key, case in self.classes.items():
+            if case & CaseTable.proper_noun:
+                yield key.capitalize()
+            if case & CaseTable.acronym:
+                yield key.upper()
+            if case & CaseTable.mixed_case:
+                yield from self.forms[key]
+
+    @staticmethod
+    def case_class(word, key):
+        """
+        Classifies a word by its capitalization.
+
+        Arguments:
+        -word (str): word, as stored in the known words file
+        -key (str): word.lower()
+
+        Returns:
+        -int: one of lower_case, proper_noun, acronym, mixed_case
+        """
+        if word == key:
+            return CaseTable.lower_case
+        if word == key.capitalize():
+            return CaseTable.proper_noun
+        if word == key.upper():
+            return CaseTable.acronym
+        return CaseTable.mixed_case
+
+    def accepts(self, word):
+        """
+        Checks a token, as typed, against known words: always-lower words match
+        any capitalization, proper nouns match capitalized or all caps, acronyms
+        match all caps, and mixed-case words match their exact form or all caps.
+
+        Arguments:
+        -word (str): token to check
+
+        Returns:
+        -bool: True if the token is a known word, else False
+        """
+        key = word.lower()
+        if key in self.lower:
+            return True
+        case = self.classes.get(key)
+        if case is None:
+            return False
+        if word.isupper():
+            return True
+        return bool((case & CaseTable.proper_noun and word == key.capitalize()) or (
+            case & CaseTable.mixed_case and word in self.forms[key]))
+
+    def add(self, word):
+        """
+        Adds a word to the table.
+
+        Arguments:
+        -word (str): word to be added
+
+        Returns:
+        -bool: True if word was added, False if it was already known
+        """
+        if word in self:
+            return False
+        key = word.lower()
+        case = CaseTable.case_class(word, key)
+        if case == CaseTable.lower_case:
+            self.lower.add(word)
+        else:
+            self.classes[key] = self.classes.get(key, 0) | case
+        if case == CaseTable.mixed_case:
+            self.forms.setdefault(key, []).append(word)
+        self.size += 1
+        return True
+
+    def discard(self, word):
+        """
+        Removes a word from the table, if present.
+
+        Arguments:
+        -word (str): word to be removed
+
+        Returns:
+        -None
+        """
+        if word not in self:
+            return
+        key = word.lower()
+        case = CaseTable.case_class(word, key)
+        self.size -= 1
+        if case == CaseTable.lower_case:
+            self.lower.discard(word)
+            return
+        if case == CaseTable.mixed_case:
+            self.forms[key].remove(word)
+            if self.forms[key]:
+                return
+            del self.forms[key]
+        remaining = self.classes[key] & ~case
+        if remaining:
+            self.classes[key] = remaining
+        else:
+            del self.classes[key]
+
+    def copy(self):
+        """
+        Copies the table.
+
+        Returns:
+        -CaseTable: table with the same words
+        """
+        table = CaseTable()
+        table.lower = set(self.lower)
+        table.classes = dict(self.classes)
+        table.forms = {key: list(forms) for key, forms in self.forms.items()}
+        table.size = self.size
+        return table
+
+    def stats(self):
+        """
+        Reports the size of the table.
+
+        Returns:
+        -dict: number of words, number of entries of the other case classes, and
+         memory (bytes) of the containers
+        """
+        memory = sys.getsizeof(self.lower)+sys.getsizeof(self.classes)+sys.getsizeof(self.forms)
+        memory += sum(sys.getsizeof(forms) for forms in self.forms.values())
+        return {"words": self.size, "entries": len(self.classes), "memory": memory}
+
+#known words as a minimal acyclic automaton, flat arrays
+class Dawg():
+    """
+    Known words as a directed acyclic word graph (minimal deterministic acyclic
+    automaton): a trie in which identical subtrees, mostly shared word endings,
+    are stored once. It is built from sorted words, merging each finished
+    subtree with an equal one already seen, then flattened into integer arrays.
+    The edges of each node are stored contiguously, sorted by character, so a
+    lookup is one binary search per character of the word.
+
+    The graph cannot be changed once built; words added at runtime (personal
+    dictionary, 'Add to dictionary') are kept in a small set on top.
+
+    Attributes:
+    -edge_start (array): index of the first edge of each node, plus a final entry
+    -edge_chars (array): character (code point) of each edge
+    -edge_targets (array): node reached by each edge
+    -finals (array): 1 for nodes that end a word, else 0
+    -count (int): number of words in the graph
+    -added (set): words added at runtime
+    -max_distance (int): radius of the first, cheap search done by suggest
+
+    Arguments:
+    -known_words (iterable, optional): words to build the graph from. Defaulted to None.
+    -max_distance (int, optional): search radius for suggest. Defaulted to 2.
+
+    Methods:
+    -child(node, char): node reached from node by char, else None
+    -add(word): adds a word on top of the graph
+    -words_with_prefix(prefix): words starting with prefix, in sorted order
+    -nearest(word, limit, radius): closest words to word
+    -suggest(word, limit): closest words, same order as Suggester.get_suggestions
+    -stats(): size of the graph
+    """
+    def __init__(self, known_words=None, max_distance=2):
+        self.max_distance = max_distance
+        self.added = set()
+        words = sorted(set(known_words or ()))
+        self.count = len(words)
+        edges = [{}]
+        finals = [False]
+        register = {}
+        unchecked = []
+
+        def minimize(down_to):
+            while len(unchecked) > down_to:
+                parent, char, child = unchecked.pop()
+                key = (finals[child], tuple(sorted(edges[child].items())))
+                existing = register.get(key)
+                if existing is None:
+                    register[key] = child
+                else:
+                    edges[parent][char] = existing
+                    edges[child] = None
+
+        previous = ""
+        for word in words:
+            common = 0
+            for previous_char, char in zip(previous, word):
+                if previous_char != char:
+                    break
+                common += 1
+            minimize(common)
+            node = unchecked[-1][2] if unchecked else 0
+            for char in word[common:]:
+                child = len(edges)
+                edges.append({})
+                finals.append(False)
+                edges[node][char] = child
+                unchecked.append((node, char, child))
+                node = child
+            finals[node] = True
+            previous = word
+        minimize(0)
+        #number the reachable nodes, and lay their edges out contiguously
+        numbers = {0: 0}
+        order = [0]
+        for node in order:
+            for char, child in sorted(edges[node].items()):
+                if child not in numbers:
+                    numbers[child] = len(order)
+                    order.append(child)
+        self.edge_start = array('I', [0])
+        self.edge_chars = array('I')
+        self.edge_targets = array('I')
+        self.finals = array('B')
+        for node in order:
+            for char, child in sorted(edges[node].items()):
+                self.edge_chars.append(ord(char))
+                self.edge_targets.append(numbers[child])
+            self.edge_start.append(len(self.edge_chars))
+            self.finals.append(finals[node])
+
+    def __len__(self):
+        return self.count+len(self.added)
+
+    def __contains__(self, word):
+        if not isinstance(word, str):
+            return False
+        if word in self.added:
+            return True
+        node = 0
+        for char in word:
+            node = self.child(node, char)
+            if node is None:
+                return False
+        return self.finals[node] == 1
+
+    def __iter__(self):
+        yield from self.words_with_prefix("")
+        yield from self.added
+
+    def child(self, node, char):
+        """
+        Follows the edge labelled char out of node, by binary search over the
+        node's edges.
+
+        Arguments:
+        -node (int): node number
+        -char (str): one character
+
+        Returns:
+        -int: node reached, else None
+        """
+        code = ord(char)
+        end = self.edge_start[node+1]
+        position = bisect.bisect_left(self.edge_chars, code, self.edge_start[node], end)
+        if position < end and self.edge_chars[position] == code:
+            return self.edge_targets[position]
+        return None
+
+    def add(self, word):
+        """
+        Adds a word on top of the graph.
+
+        Arguments:
+        -word (str): word to be added
+
+        Returns:
+        -bool: True if word was added, False if it was already known
+        """
+        if word in self:
+            return False
+        self.added.add(word)
+        return True
+
+    def words_with_prefix(self, prefix):
+        """
+        Enumerates the words of the graph that start with prefix (words added at
+        runtime are not included).
+
+        Arguments:
+        -prefix (str): prefix to search for
+
+        Returns:
+        -generator: words starting with prefix, in sorted order
+        """
+        node = 0
+        for char in prefix:
+            node = self.child(node, char)
+            if node is None:
+                return
+        stack = [(node, prefix)]
+        while stack:
+            node, word = stack.pop()
+            if self.finals[node]:
+                yield word
+            for position in range(self.edge_start[node+1]-1, self.edge_start[node]-1, -1):
+                stack.append((self.edge_targets[position], word+chr(self.edge_chars[position])))
+
+    def nearest(self, word, limit, radius=None):
+        """
+        Finds the closest words to word, walking the graph while carrying one row
+        of the Levenshtein distance table per path (as SuggestionTrie.nearest), and
+        pruning paths whose row cannot beat the worst kept result.
+
+        Arguments:
+        -word (str): word to search around
+        -limit (int): maximum number of results
+        -radius (int, optional): maximum Levenshtein distance of results. Defaulted
+         to None (no maximum).
+
+        Returns:
+        -list: list of (distance, word) tuples, sorted by distance then word
+        """
+        best = []
+        if limit <= 0:
+            return best
+        bound = radius
+
+        def keep(distance, known_word):
+            nonlocal bound
+            if (bound is None or distance <= bound) and (len(best) < limit or (distance, known_word) < best[-1]):
+                bisect.insort(best, (distance, known_word))
+                if len(best) > limit:
+                    best.pop()
+                if len(best) == limit:
+                    bound = best[-1][0]
+
+        first_row = list(range(len(word)+1))
+        if self.finals[0]:
+            keep(first_row[-1], "")
+        stack = [(0, "", first_row)]
+        while stack:
+            node, prefix, prev_row = stack.pop()
+            for position in range(self.edge_start[node], self.edge_start[node+1]):
+                char = chr(self.edge_chars[position])
+                child = self.edge_targets[position]
+                left = prev_row[0]+1
+                row = [left]
+                for word_char, diagonal, above in zip(word, prev_row, prev_row[1:]):
+                    left = min(left+1, above+1, diagonal+(word_char != char))
+                    row.append(left)
+                if self.finals[child]:
+                    keep(row[-1], prefix+char)
+                if self.edge_start[child] < self.edge_start[child+1] and (bound is None or min(row) <= bound):
+                    stack.append((child, prefix+char, row))
+        for known_word in self.added:
+            keep(Levenshtein.distance(word, known_word), known_word)
+        return best
+
+    def suggest(self, word, limit=3):
+        """
+        Gets the closest words to word, searching within max_distance first and
+        widening the radius one edit at a time while that finds fewer than limit
+        words.
+
+        Arguments:
+        -word (str): word to produce suggestions for
+        -limit (int, optional): number of suggestions. Defaulted to 3.
+
+        Returns:
+        -list: list of suggestions, closest first (ties alphabetical)
+        """
+        radius = self.max_distance
+        best = self.nearest(word, limit, radius)
+        while len(best) < limit and len(best) < len(self):
+            radius += 1
+            best = self.nearest(word, limit, radius)
+        return [known_word for distance, known_word in best]
+
+    def stats(self):
+        """
+        Reports the size of the graph.
+
+        Returns:
+        -dict: number of words, number of nodes, and memory (bytes) of the arrays
+        """
+        memory = sum(values.itemsize*len(values) for values in
+                     (self.edge_start, self.edge_chars, self.edge_targets, self.finals))
+        return {"words": len(self), "entries": len(self.finals), "memory": memory}
+
+#vectorized suggestion scan, NumPy
+class NumpySuggester():
+    """
+    Full scan of known words, vectorized with NumPy. Words are kept as a padded
+    uint8 matrix, one row per word, sorted by length. The Levenshtein table is
+    filled one word-character column at a time for every word at once; the
+    insertion step within a column is done with a running minimum, so each column
+    is a handful of array operations. Since rows are sorted by length, each column
+    only covers the words long enough to reach it, and a word's distance is read
+    off at the column equal to its length. The three closest words are taken
+    with argpartition instead of a sort of the whole dictionary.
+
+    Words that are not ASCII, and words added after the matrix was built, are
+    kept in a list and scored with Levenshtein.distance.
+
+    Attributes:
+    -words (list): ASCII words, in matrix row order
+    -matrix (ndarray): uint8 array, one zero-padded row of character codes per word
+    -lengths (ndarray): length of each word
+    -length_starts (list): index of the first row of at least each length
+    -alpha_rank (ndarray): alphabetical position of each word, for breaking ties
+    -others (list): words scored outside the matrix
+    -size (int): number of words
+
+    Arguments:
+    -known_words (iterable, optional): words to build the matrix from. Defaulted to None.
+
+    Methods:
+    -add(word): adds a word (to others)
+    -distances(word): Levenshtein distance from word to every matrix row
+    -suggest(word, limit): closest words, same order as Suggester.get_suggestions
+    -stats(): size of the matrix
+    """
+    def __init__(self, known_words=None):
+        words = set()
+        self.others = []
+        for word in known_words or ():
+            if word.isascii() and word:
+                words.add(word)
+            else:
+                self.others.append(word)
+        self.words = sorted(words, key=lambda word: (len(word), word))
+        self.size = len(self.words)+len(self.others)
+        self.word_set = set(self.words)
+        self.word_set.update(self.others)
+        width = len(self.words[-1]) if self.words else 0
+        padded = b"".join(word.encode("ascii").ljust(width, b"\0") for word in self.words)
+        self.matrix = np.frombuffer(padded, dtype=np.uint8).reshape(len(self.words), width)
+        self.lengths = np.array([len(word) for word in self.words], dtype=np.int32)
+        self.length_starts = [int(np.searchsorted(self.lengths, length)) for length in range(width+2)]
+        alpha_rank = np.empty(len(self.words), dtype=np.int32)
+        alpha_rank[sorted(range(len(self.words)), key=self.words.__getitem__)] = np.arange(len(self.words))
+        self.alpha_rank = alpha_rank
+
+    def __len__(self):
+        return self.size
+
+    def add(self, word):
+        """
+        Adds a word, outside of the matrix.
+
+        Arguments:
+        -word (str): word to be added
+
+        Returns:
+        -bool: True if word was added, False if it was already known
+        """
+        if word in self.word_set:
+            return False
+        self.word_set.add(word)
+        self.others.append(word)
+        self.size += 1
+        return True
+
+    def distances(self, word):
+        """
+        Computes the Levenshtein distance from word to every word in the matrix.
+
+        Arguments:
+        -word (str): word to measure from
+
+        Returns:
+        -ndarray: distance for each matrix row
+        """
+        rows = len(self.words)
+        columns = len(word)+1
+        result = np.full(rows, columns-1, dtype=np.int32)
+        if not rows:
+            return result
+        query = np.array([ord(char) if ord(char) < 128 else 0 for char in word], dtype=np.uint8)
+        offsets = np.arange(columns, dtype=np.int32)
+        start = self.length_starts[1]
+        prev = np.broadcast_to(offsets, (rows-start, columns)).copy()
+        for position in range(self.matrix.shape[1]):
+            curr = np.empty_like(prev)
+            curr[:, 0] = position+1
+            if columns > 1:
+                mismatch = self.matrix[start:, position, None] != query[None, :]
+                curr[:, 1:] = np.minimum(prev[:, 1:]+1, prev[:, :-1]+mismatch)
+                curr = np.minimum.accumulate(curr-offsets, axis=1)+offsets
+            end = self.length_starts[position+2]
+            result[start:end] = curr[:end-start, -1]
+            prev = curr[end-start:]
+            start = end
+            if start >= rows:
+                break
+        return result
+
+    def suggest(self, word, limit=3):
+        """
+        Gets the closest known words to word.
+
+        Arguments:
+        -word (str): word to produce suggestions for
+        -limit (int, optional): number of suggestions. Defaulted to 3.
+
+        Returns:
+        -list: list of suggestions, closest first (ties alphabetical)
+        """
+        best = []
+        if self.words and limit > 0:
+            distances = self.distances(word)
+            if limit < len(distances):
+                cutoff = np.partition(distances, limit-1)[limit-1]
+                candidates = np.nonzero(distances <= cutoff)[0]
+            else:
+                candidates = np.arange(len(distances))
+            order = np.lexsort((self.alpha_rank[candidates], distances[candidates]))[:limit]
+            best = [(int(distances[candidates[index]]), self.words[candidates[index]]) for index in order]
+        for other in self.others:
+            best.append((Levenshtein.distance(word, other), other))
+        best.sort()
+        return [known_word for distance, known_word in best[:limit]]
+
+    def stats(self):
+        """
+        Reports the size of the matrix.
+
+        Returns:
+        -dict: number of words, number of matrix rows, and memory (bytes) of the
+         arrays
+        """
+        memory = self.matrix.nbytes+self.lengths.nbytes+self.alpha_rank.nbytes
+        return {"words": self.size, "entries": len(self.words), "memory": memory}
+
+#trigram inverted index, prefilter for suggestions
+class NgramIndex():
+    """
+    Inverted index from character trigrams to known words. Words are padded with
+    two boundary markers on each side, so "the" has the trigrams "$$t", "$th",
+    "the", "he$" and "e$$". A lookup counts, for each known word, how many of the
+    misspelling's trigrams it shares, and computes the exact Levenshtein distance
+    only for the candidates words sharing the most.
+
+    This is a prefilter: a known word sharing few or no trigrams with the
+    misspelling is not considered, even if its edit distance is small (mostly
+    very short words). Close misspellings of longer words share most trigrams, so
+    their suggestions match the full scan.
+
+    Attributes:
+    -words (list): known words; a word's position is its word ID
+    -postings (dict): maps trigram (str) to array('I') of word IDs
+    -word_ids (dict): maps word to word ID
+    -candidates (int): number of words, with the most shared trigrams (ties
+     alphabetical), scored by Levenshtein distance
+
+    Arguments:
+    -known_words (iterable, optional): words to index. Defaulted to None.
+    -candidates (int, optional): defaulted to 300
+
+    Methods:
+    -get_ngrams(word): set of padded trigrams of word
+    -add(word): adds a word to the index
+    -suggest(word, limit): closest candidates, ties alphabetical
+    -stats(): size of the index
+    """
+    def __init__(self, known_words=None, candidates=300):
+        self.words = []
+        self.word_ids = {}
+        self.postings = {}
+        self.candidates = candidates
+        for word in known_words or ():
+            self.add(word)
+
+    def __len__(self):
+        return len(self.words)
+
+    @staticmethod
+    def get_ngrams(word):
+        """
+        Gets the trigrams of a word, padded with boundary markers.
+
+        Arguments:
+        -word (str): word to split
+
+        Returns:
+        -set: set of trigrams (str)
+        """
+        padded = "$$"+word+"$$"
+        return {padded[index:index+3] for index in range(len(padded)-2)}
+
+    def add(self, word):
+        """
+        Adds a word to the index.
+
+        Arguments:
+        -word (str): word to be added
+
+        Returns:
+        -bool: True if word was added, False if it was already indexed
+        """
+        if word in self.word_ids:
+            return False
+        word_id = len(self.words)
+        self.words.append(word)
+        self.word_ids[word] = word_id
+        for ngram in self.get_ngrams(word):
+            posting = self.postings.get(ngram)
+            if posting is None:
+                posting = array('I')
+                self.postings[ngram] = posting
+            posting.append(word_id)
+        return True
+
+    def suggest(self, word, limit=3):
+        """
+        Gets the closest known words to word, among the words sharing the most
+        trigrams with it.
+
+        Arguments:
+        -word (str): word to produce suggestions for
+        -limit (int, optional): number of suggestions. Defaulted to 3.
+
+        Returns:
+        -list: list of suggestions, closest first (ties alphabetical)
+        """
+        shared = Counter()
+        for ngram in self.get_ngrams(word):
+            posting = self.postings.get(ngram)
+            if posting is not None:
+                shared.update(posting)
+        candidates = shared.most_common(self.candidates)
+        if len(candidates) == self.candidates:
+            cutoff = candidates[-1][1]
+            candidates = [word_id for word_id, count in candidates if count > cutoff]
+            tied = sorted(self.words[word_id] for word_id, count in shared.items() if count == cutoff)
+            candidate_words = [self.words[word_id] for word_id in candidates]+tied[:self.candidates-len(candidates)]
+        else:
+            candidate_words = [self.words[word_id] for word_id, count in candidates]
+        found = [(Levenshtein.distance(word, known_word), known_word) for known_word in candidate_words]
+        return [known_word for distance, known_word in heapq.nsmallest(limit, found)]
+
+    def stats(self):
+        """
+        Reports the size of the index.
+
+        Returns:
+        -dict: number of words, number of trigrams, and approximate memory (bytes)
+         of the postings and word lists (words themselves are shared with
+         known_words)
+        """
+        memory = sys.getsizeof(self.postings)+sys.getsizeof(self.words)+sys.getsizeof(self.word_ids)
+        for ngram, posting in self.postings.items():
+            memory += sys.getsizeof(ngram)+sys.getsizeof(posting)
+        return {"words": len(self.words), "entries": len(self.postings), "memory": memory}
+
+#phonetic index, Soundex buckets
+class PhoneticIndex():
+    """
+    Index of known words by Soundex code, so that sound-alike candidates come
+    from a dict lookup instead of a scan, and are then reranked by Levenshtein
+    distance. Soundex keeps the first letter of a word, and codes the following
+    consonants by sound (b/f/p/v as 1, c/g/j/k/q/s/x/z as 2, ...), to four
+    characters. "grass" and "grascvd" both start "G62".
+
+    If the misspelling's code has fewer than limit words, the search widens to
+    codes sharing its first three, two, then one characters.
+
+    Attributes:
+    -buckets (dict): maps Soundex code to list of known words
+    -prefixes (dict): maps the first one to three characters of a code to the
+     set of codes beginning with them
+    -size (int): number of words
+
+    Arguments:
+    -known_words (iterable, optional): words to index. Defaulted to None.
+
+    Methods:
+    -soundex(word): static method, Soundex code of word
+    -add(word): adds a word to its bucket
+    -suggest(word, limit): closest sound-alike words, ties alphabetical
+    -stats(): size of the index
+    """
+    sound_codes = {letter: code for letters, code in (("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"), ("l", "4"),
+                                                      ("mn", "5"), ("r", "6"), ("aeiouy", "0"), ("hw", ""))
+                   for letter in letters}
+
+    def __init__(self, known_words=None):
+        self.buckets = {}
+        self.prefixes = {}
+        self.size = 0
+        for word in known_words or ():
+            self.add(word)
+
+    def __len__(self):
+        return self.size
+
+    @staticmethod
+    def soundex(word):
+        """
+        Computes the Soundex code of a word. Characters other than letters are
+        skipped.
+
+        Arguments:
+        -word (str): word to code
+
+        Returns:
+        -str: code of a letter and three digits, ex. 'G620'; '' if word has no letters
+        """
+        letters = [char for char in word.lower() if char in PhoneticIndex.sound_codes]
+        if not letters:
+            return ""
+        code = letters[0].upper()
+        previous = PhoneticIndex.sound_codes[letters[0]]
+        for letter in letters[1:]:
+            digit = PhoneticIndex.sound_codes[letter]
+            if digit == "":
+                continue
+            if digit != "0" and digit != previous:
+                code += digit
+                if len(code) == 4:
+                    break
+            previous = digit
+        return code.ljust(4, "0")
+
+    def add(self, word):
+        """
+        Adds a word to the bucket for its code.
+
+        Arguments:
+        -word (str): word to be added
+
+        Returns:
+        -bool: True if word was added, False if it was already indexed
+        """
+        code = self.soundex(word)
+        bucket = self.buckets.get(code)
+        if bucket is None:
+            bucket = []
+            self.buckets[code] = bucket
+            for length in range(1, 4):
+                self.prefixes.setdefault(code[:length], set()).add(code)
+        elif word in bucket:
+            return False
+        bucket.append(word)
+        self.size += 1
+        return True
+
+    def suggest(self, word, limit=3):
+        """
+        Gets the closest known words to word, among words that sound alike.
+
+        Arguments:
+        -word (str): word to produce suggestions for
+        -limit (int, optional): number of suggestions. Defaulted to 3.
+
+        Returns:
+        -list: list of suggestions, closest first (ties alphabetical)
+        """
+        code = self.soundex(word)
+        searched = set()
+        found = []
+        for length in (4, 3, 2, 1):
+            codes = {code} if length == 4 else self.prefixes.get(code[:length], set())
+            for known_code in codes - searched:
+                for known_word in self.buckets.get(known_code, ()):
+                    found.append((Levenshtein.distance(word, known_word), known_word))
+            searched.update(codes)
+            if len(found) >= limit:
+                break
+        return [known_word for distance, known_word in heapq.nsmallest(limit, found)]
+
+    def stats(self):
+        """
+        Reports the size of the index.
+
         Returns:
-        -bool: True if word in set of known words, else False
+        -dict: number of words, number of codes, and approximate memory (bytes)
+         of the buckets (words themselves are shared with known_words)
         """
-        if word in self.known_words:
-            return True
-        else:
-            return False
+        memory = sys.getsizeof(self.buckets)+sys.getsizeof(self.prefixes)
+        for code, bucket in self.buckets.items():
+            memory += sys.getsizeof(code)+sys.getsizeof(bucket)
+        for prefix, codes in self.prefixes.items():
+            memory += sys.getsizeof(prefix)+sys.getsizeof(codes)
+        return {"words": self.size, "entries": len(self.buckets), "memory": memory}
 
 #subclass parsing
 class TextFile(ReferenceFile):
@@ -281,6 +3981,15 @@ class TextFile(ReferenceFile):
         """
         return re.split(r'\s', self.text.strip())
 
+    def iter_blocks(self):
+        """
+        Yields the text in blocks, with their character offsets.
+
+        Returns:
+        -iterator: (text, offset) tuples
+        """
+        return text_blocks(self.text)
+
 #subclass parsing
 class HTMLFile(ReferenceFile):
     """
@@ -310,6 +4019,15 @@ class HTMLFile(ReferenceFile):
         html_content = soup.get_text()
         return html_content.split()
 
+    def iter_blocks(self):
+        """
+        Yields the extracted text in blocks, with their character offsets in it.
+
+        Returns:
+        -iterator: (text, offset) tuples
+        """
+        return text_blocks(BeautifulSoup(self.text, "lxml").get_text())
+
 #subclass parsing
 class PDFFile(ReferenceFile):
     """
@@ -340,6 +4058,21 @@ class PDFFile(ReferenceFile):
                 content += page.get_text()
         return content
 
+    def iter_blocks(self):
+        """
+        Yields the text one page at a time, with its character offset in the
+        combined text, so the whole text is never held at once.
+
+        Returns:
+        -generator: (text, offset) tuples
+        """
+        with fitz.open(self.file_path) as document:
+            offset = 0
+            for page in document:
+                page_text = page.get_text()
+                yield page_text, offset
+                offset += len(page_text)
+
 #subclass parsing
 class DocxFile(ReferenceFile):
     """
@@ -367,6 +4100,15 @@ class DocxFile(ReferenceFile):
         """
         return self.text.split()
 
+    def iter_blocks(self):
+        """
+        Yields the paragraphs' text in blocks, with their character offsets.
+
+        Returns:
+        -iterator: (text, offset) tuples
+        """
+        return text_blocks(self.text)
+
 #'the' GUI
 class SpellcheckerApp:
     """
@@ -415,12 +4157,23 @@ class SpellcheckerApp:
     -arrow_key_count (int): counts arrow key presses, allowing for activation of arrow mode
     -arrow_key_req (int): number of arrow key presses required to activate arrow mode
     -last_select (str/None): last selected word
-    -curr_word_pos (tuple/None): current position of word being modified
+    -curr_word_pos (tuple/None): (start, end) text indexes of the unknown word
+     being modified, from its highlight (see show_menu)
     -timer_delay (int/None): stored time for delayed actions
     -time_delay (int): time for delay, before given action triggered
     -menu (tk.Menu): pop-up menu, providing modification options for word under cursor
     -working_file (str): path of currently opened text file
-    -translator (Translator): object of Translator class; used for translation feature
+    -translator (Translator/None): object of Translator class; used for translation feature,
+     created on first use (see get_translator)
+    -pending_actions (OrderedDict): actions asked for while the dictionary was loading,
+     by name, run once it has loaded (see when_loaded)
+    -app_title (str): window title, without the loading notice
+    -dirty_lines (tuple/None): (first, last) lines about to be edited by key presses,
+     not yet re-checked (see keypress_action and text_modified)
+    -check_timer (str/None): pending idle call of check_dirty
+    -pending_lines (tuple/None): (first, last) lines edited since the last
+     check_dirty, or (1, None) for the whole text
+    -line_count (int/None): number of lines when highlight_indexes was last updated
 
     Arguments:
     -window (tk.Tk): Tkinter window
@@ -430,6 +4183,7 @@ class SpellcheckerApp:
     -handles interactions between attributes
     """
     def __init__(self, window, spellchecker):
+        load_tkinter()
         self.window = window
         self.window.title("Spellchecker EECE2140")
         self.frm = tk.Frame(self.window)
@@ -531,7 +4285,75 @@ class SpellcheckerApp:
         self.time_delay = 500
         self.menu=tk.Menu(self.text, tearoff=0)
         self.working_file = None
-        self.translator = Translator()
+        self.translator = None
+        self.pending_actions = OrderedDict()
+        self.app_title = self.window.title()
+        self.dirty_lines = None
+        self.check_timer = None
+        self.pending_lines = None
+        self.line_count = None
+        self.text.edit_modified(False)
+        self.text.bind("<<Modified>>", self.text_modified)
+        if not self.spellchecker.loaded.is_set():
+            self.window.title("{} - dictionary loading...".format(self.app_title))
+            self.window.after(100, self.check_loading)
+
+    def when_loaded(self, name, action):
+        """
+        Checks whether the dictionary has loaded. If it has not, action is queued
+        under name (replacing any earlier action of that name) to run once it has,
+        and the window title reports that the dictionary is loading. The Tk
+        mainloop is never blocked waiting for the load.
+
+        Arguments:
+        -name (str): name of the action, e.g. 'refresh'
+        -action (callable): called with no arguments once loaded
+
+        Returns:
+        -bool: True if the dictionary has loaded (caller should go ahead), else False
+        """
+        if self.spellchecker.loaded.is_set():
+            return True
+        self.pending_actions[name] = action
+        return False
+
+    def check_loading(self):
+        """
+        Polls, from the Tk mainloop, for the end of the background dictionary load;
+        once loaded, restores the window title and runs queued actions in order.
+
+        Arguments:
+        -None
+
+        Returns:
+        -None
+        """
+        if not self.spellchecker.loaded.is_set():
+            self.window.after(100, self.check_loading)
+            return
+        if self.window.title() == "{} - dictionary loading...".format(self.app_title):
+            self.window.title(self.app_title)
+        while self.pending_actions:
+            name, action = self.pending_actions.popitem(last=False)
+            try:
+                action()
+            except Exception as e:
+                print("Error in queued {}: {}".format(name, e))
+
+    def get_translator(self):
+        """
+        Gets the Translator, creating it on first use (it is slow to create, and
+        only needed for translation).
+
+        Arguments:
+        -None
+
+        Returns:
+        -Translator: translator object
+        """
+        if self.translator is None:
+            self.translator = Translator()
+        return self.translator
 
 #file opening, on separate thread from rest
     def refresh(self, event=None):
@@ -552,7 +4374,10 @@ class SpellcheckerApp:
         -Nothing
 
         -If no text is selected, currently, nothing happens        
+        -While the dictionary is loading, the refresh is queued
         """
+        if not self.when_loaded("refresh", self.refresh):
+            return
         curr_index = self.text.index(tk.INSERT)
         start_index = self.text.index("sel.first")
         end_index = self.text.index("sel.last")
@@ -577,32 +4402,19 @@ class SpellcheckerApp:
         Returns:
         -Nothing
         
-        -If file ends with .txt, read as plain text
-        -If file ends with .html or .htm, read as HTML
-        -If file ends with .pdf, read as PDF
-        -If file ends with .docx, read as .docx file (read, lines joined)
+        -File is read by open_reference_file (see it for supported types)
+        -If file ends with .pdf, the text of its pages is shown
         -If file ends with something else, error message printed
         """
         try:
             self.working_file = file_to_open
-            if file_to_open.lower().endswith('.txt'):
-                with open(file_to_open, 'rt') as file:
-                    text_content = file.read()
-                self.spellchecker.reference_file = TextFile(text_content)
-            elif file_to_open.lower().endswith('.html') or file_to_open.lower().endswith('.htm'):
-                with open(file_to_open, 'rt') as file:
-                    text_content = file.read()
-                self.spellchecker.reference_file= HTMLFile(text_content)
-            elif file_to_open.lower().endswith('.pdf'):
-                self.spellchecker.reference_file = PDFFile(file_to_open)
+            self.spellchecker.reference_file = open_reference_file(file_to_open)
+            text_content = self.spellchecker.reference_file.text
+            if text_content is None:
                 text_content = self.spellchecker.reference_file.parse()
-            elif file_to_open.lower().endswith('.docx'):
-                document = Document(file_to_open)
-                text_content = '\n'.join(paragraph.text for paragraph in document.paragraphs if paragraph.text)
-                self.spellchecker.reference_file = DocxFile(text_content)
-            else:
-                print("File not supported")
-                return
+        except ValueError:
+            print("File not supported")
+            return
         except Exception as e:
             print("Unable to open {}: {}".format(file_to_open,e))
         self.update_window(text_content)
@@ -906,10 +4718,12 @@ class SpellcheckerApp:
         Returns:
         -None
         """
+        if not self.when_loaded("processing_event", self.processing_event):
+            return
         curr_index = self.text.index(tk.INSERT)
         curr_word = self.get_curr_word(curr_index)
         if curr_word:
-            suggestions = Suggester.get_suggestions(curr_word, self.spellchecker.known_words)
+            suggestions = self.spellchecker.suggest(curr_word)
         if self.timer_delay:
             self.window.after_cancel(self.timer_delay)
             self.timer_delay = None
@@ -943,6 +4757,8 @@ class SpellcheckerApp:
         """
         Allows for a more custom undo feature, saving individual histories up
         until certain punctuation, in addition to discrete changes in the text.
+        Keys that may edit the text record the lines they are about to change
+        (the cursor line and any selection) in dirty_lines, for text_modified.
 
         Arguments:
         -event (Event): Tkinter event object, captures keypress event
@@ -956,6 +4772,14 @@ class SpellcheckerApp:
             self.timer_delay = self.window.after(self.time_delay, self.processing_event)
         if event.char in '.!?,;)("][':
             self.save_undo()
+        if event.char or event.keysym in ("BackSpace", "Delete", "Return", "Tab"):
+            lines = [self.text.index(tk.INSERT)]
+            if self.text.tag_ranges("sel"):
+                lines.extend((self.text.index("sel.first"), self.text.index("sel.last")))
+            lines = [int(index.split('.')[0]) for index in lines]
+            if self.dirty_lines:
+                lines.extend(self.dirty_lines)
+            self.dirty_lines = (min(lines), max(lines))
         
     def keyrelease_action(self, event):
         """
@@ -1126,23 +4950,20 @@ class SpellcheckerApp:
         -modifies spellchecker known words set
         -modifies unknown words list
         """
+        if not self.when_loaded("add_dict", self.add_dict):
+            return
         try:
             curr_view = self.text.yview()
             curr_index = self.text.index(tk.INSERT)
             curr_word = self.get_cur_unknown()
             if curr_word:
                 curr_lower_word = curr_word.lower()
-                self.spellchecker.known_words.add(curr_lower_word)
+                self.spellchecker.add_personal_word(curr_lower_word)
                 unknowns = []
                 for word, suggestions in self.unknown_words:
                     if word.lower() != curr_lower_word:
                         unknowns.append((word, suggestions))
                 self.unknown_words = unknowns
-                try:
-                    with open(self.spellchecker.personal_dict_file_path, 'at') as dict_file:
-                        dict_file.write(curr_word+'\n')
-                except IOError as e:
-                    print("Error writing to dict_file: {}".format(e))
                 self.highlight_unknown()
             self.text.yview_moveto(curr_view[0])
             self.text.mark_set(tk.INSERT, curr_index)
@@ -1152,8 +4973,9 @@ class SpellcheckerApp:
 
     def ignore_unknown(self):
         """
-        Adds the current unknown word, at the mouse cursor, to the ignored words
-        set. Removes word from list of unknown words, and refreshes text highlights.
+        Adds the current unknown word (the selected one, else the one at the mouse
+        cursor) to the ignored words set. Removes word from list of unknown words,
+        and refreshes text highlights.
         Stores y-view and cursor position to make it seem as if there was no program
         change.
         
@@ -1171,22 +4993,20 @@ class SpellcheckerApp:
             return
         try:
             curr_view = self.text.yview()
-            curr_index = self.text.index(tk.INSERT)
-            curr_word_start = curr_index + " wordstart"
-            curr_word_end = curr_index + " wordend"
+            if self.text.tag_ranges("selected"):
+                curr_word_start = self.text.index("selected.first")
+                curr_word_end = self.text.index("selected.last")
+            else:
+                curr_index = self.text.index(tk.INSERT)
+                curr_word_start = curr_index + " wordstart"
+                curr_word_end = curr_index + " wordend"
             word = self.text.get(curr_word_start, curr_word_end)
             if word in self.unknown_words:
                 self.unknown_words.remove(word)
-                self.spellchecker.ignored_words.add(word)
+                self.spellchecker.ignore_word(word)
                 self.text.tag_remove("highlight", curr_word_start, curr_word_end)
                 self.text.tag_remove("selected", curr_word_start, curr_word_end)
                 self.highlight_unknown()
-                try:
-                    with open(self.spellchecker.ignored_words_file_path, 'at') as ignored_file:
-                        ignored_file.write(word + '\n')
-                except IOError as e:
-                    print("Error writing to ignored_file: {}".format(e))
-                self.highlight_unknown()
                 self.text.yview_moveto(curr_view[0])
         except Exception as e:
             print("Error in ignore_unknown: {}".format(e))
@@ -1208,11 +5028,13 @@ class SpellcheckerApp:
         -removes ignored word from unknown words
         -writes ignored word to ign_words file
         """
+        if not self.when_loaded("ignore_all", self.ignore_all):
+            return
         try:
             curr_word = self.get_curr_word(self.text.index(tk.INSERT))
             if not curr_word:
                 return
-            self.spellchecker.ignored_words.add(curr_word)
+            self.spellchecker.ignore_word(curr_word)
             updated_words = []
             for word in self.unknown_words:
                 if word[0] != curr_word:
@@ -1226,11 +5048,6 @@ class SpellcheckerApp:
                     updated_hlight.append((start_index, end_index))
             self.highlight_indexes = updated_hlight
             self.highlight_unknown()
-            try:
-                with open("ign_words.txt", 'at') as ignored_file:
-                    ignored_file.write(curr_word+'\n')
-            except IOError as e:
-                print("Error writing {} to ignored_file".format(curr_word))
         except Exception as e:
             print("Error in ignore_all: {}".format(e))
 
@@ -1257,19 +5074,21 @@ class SpellcheckerApp:
         Returns:
         -None
         """
+        if not self.when_loaded("accept_suggestion", self.accept_suggestion):
+            return
         if self.curr_word_pos:
             try:
-                word = self.text.get(self.curr_word_pos+" wordstart", self.curr_word_pos+" wordend")
+                word = self.text.get(*self.curr_word_pos)
                 if word:
-                    suggestions = Suggester.get_suggestions(word, self.spellchecker.known_words) if word else []
+                    suggestions = self.spellchecker.suggest(word) if word else []
                     self.suggestion_menu(word, suggestions)
             except Exception as e:
                 print("Error in accept_suggestion: {}".format(e))
 
     def replace_unknown(self, unknown_word, suggestion):
         """
-        Replaces current instance of unknown word with a suggestion, if called.
-        Stores y-view and cursor position to make it seem as if there was no
+        Replaces current instance of unknown word (the selected one, whose position
+        highlight_unknown recorded) with a suggestion, if called. Stores y-view and cursor position to make it seem as if there was no
         apparent change in the program.
         
         Arguments:
@@ -1282,20 +5101,14 @@ class SpellcheckerApp:
         try:
             curr_view = self.text.yview()
             curr_index = self.text.index(tk.INSERT)
-            start_index = self.text.search(unknown_word, "1.0", tk.END)
-            while start_index:
-                end_index = self.text.index("{}+{}c".format(start_index, len(unknown_word)))
-                curr_word = self.text.get(start_index, end_index)
-                if curr_word == unknown_word and self.text.tag_ranges("selected"):
-                    start_word = self.text.index("selected.first")
-                    end_word = self.text.index("selected.last")
-                    if start_index == start_word and end_index == end_word:
-                        self.text.delete(start_index, end_index)
-                        self.text.insert(start_index, suggestion)
-                        self.update_known(unknown_word, suggestion)
-                        self.curr_word_pos = None
-                        break
-                start_index = self.text.search(unknown_word, end_index, tk.END)
+            if self.text.tag_ranges("selected"):
+                start_index = self.text.index("selected.first")
+                end_index = self.text.index("selected.last")
+                if self.text.get(start_index, end_index) == unknown_word:
+                    self.text.delete(start_index, end_index)
+                    self.text.insert(start_index, suggestion)
+                    self.update_known(unknown_word, suggestion)
+                    self.curr_word_pos = None
             self.text.yview_moveto(curr_view[0])
             self.text.mark_set(tk.INSERT, curr_index)
             self.text.see(curr_index)
@@ -1319,7 +5132,7 @@ class SpellcheckerApp:
             if prev in self.unknown_words:
                 self.unknown_words.remove(prev)
             self.spellchecker.ignored_words.discard(prev)
-            self.spellchecker.known_words.add(new)
+            self.spellchecker.add_known_word(new)
             self.highlight_unknown()
         except AttributeError as e:
             print("Error in update_known")
@@ -1401,17 +5214,18 @@ class SpellcheckerApp:
         Returns:
         -None
 
-        -listbox display for unknown words are stored as tuples, with list of suggestions
-         ex. (word, [suggestions])
+        -unknown words are stored as tuples, with list of suggestions ex. (word, [suggestions]),
+         or as words found by highlight_unknown; suggestions for either come from the
+         spellchecker's suggestion cache, searched only when missing
         -handles event in which there are no unknown words, wiping clean the listbox
         """
         try:
             self.sug_listbox.delete(0, tk.END)
             if self.current_unknown_index<(len(self.unknown_words)):
                 unknown = self.unknown_words[self.current_unknown_index]
-                if isinstance(unknown, tuple) and len(unknown) == 2:
-                    (curr_word, suggestions) = unknown
-                    for suggestion in suggestions:
+                curr_word = unknown[0] if isinstance(unknown, tuple) else unknown
+                if curr_word:
+                    for suggestion in self.spellchecker.suggest(curr_word.lower()):
                         self.sug_listbox.insert(tk.END, suggestion)
         except Exception as e:
             print("Error in add_listbox: {}".format(e))
@@ -1420,6 +5234,8 @@ class SpellcheckerApp:
         """
         Displays menu when user right clicks on an unknown word in text. The
         menu options include 'ignore', 'get suggestions', and '+personal dict'.
+        The word is the whole highlighted token under the click (as tokenize found
+        it, e.g. "jlly's"), not the widget's notion of a word.
 
         Arguments:
         -event (Event, optional): event object, containing x- and y-coordinates
@@ -1430,13 +5246,16 @@ class SpellcheckerApp:
         """
         try:
             curr_index = self.text.index(tk.CURRENT)
-            word = self.text.get(curr_index + " wordstart", curr_index + " wordend")
             r_move_insert = self.text.index("@%d, %d"%(event.x, event.y))
             self.text.mark_set(tk.INSERT, r_move_insert)
-            if "highlight" in self.text.tag_names(curr_index) and word and word in self.unknown_words:
-                self.curr_word_pos = curr_index
+            if "highlight" not in self.text.tag_names(curr_index):
+                return
+            word_range = self.text.tag_prevrange("highlight", curr_index+"+1c")
+            word = self.text.get(*word_range) if word_range else ""
+            if word and word.lower() in self.unknown_words:
+                self.curr_word_pos = tuple(word_range)
                 self.text.tag_remove("selected", "1.0", tk.END)
-                self.text.tag_add("selected", curr_index + " wordstart", curr_index + " wordend")
+                self.text.tag_add("selected", *word_range)
                 self.text.tag_config("selected", background="CadetBlue1")
                 menu = tk.Menu(self.text, tearoff=1)
                 menu.add_command(label="Ignore", command=self.ignore_unknown)
@@ -1498,7 +5317,7 @@ class SpellcheckerApp:
                 return "break"
             lang_key = self.autofix_lang(typed_lang)
             if lang_key:
-                trans_text = self.translator.translate(selected, dest=lang_key).text
+                trans_text = self.get_translator().translate(selected, dest=lang_key).text
                 if trans_text:    
                     self.text.delete("sel.first", "sel.last")
                     self.text.insert("insert", trans_text)
@@ -1659,14 +5478,16 @@ class SpellcheckerApp:
         except Exception as e:
             print("Error in previous_unknown: {}".format(e))
 
-    def hlight_word(self, word, line_start, now_known_indexes):
+    def hlight_word(self, word, start_pos, end_pos, now_known_indexes):
         """
-        Highlights a given word in the text (by x.x position), recording its
-        index. The word is added to the list of unknown words, if not already in it.
+        Highlights a given word in the text, at the position tokenize found it,
+        recording its index. The word is added to the list of unknown words, if
+        not already in it.
         
         Arguments:
         -word (str): word to be highlighted
-        -line_start (str): text index representing start of the line
+        -start_pos (str): text index of the start of the word
+        -end_pos (str): text index of the end of the word
         -now_known_indexes (list): list, updated with start and end indexes
          of the word
         
@@ -1674,22 +5495,18 @@ class SpellcheckerApp:
         -None
         """
         try:
-            match = re.search(r'\b{}\b'.format(re.escape(word)), self.text.get(line_start, line_start+"lineend"))
-            if match:
-                start_pos = "{}+{}c".format(line_start, match.start())
-                end_pos = "{}+{}c".format(line_start, match.end())
-                self.text.tag_add("highlight", start_pos, end_pos)
-                now_known_indexes.append((start_pos, end_pos))
-                if (word.lower() not in self.unknown_words) and (word not in self.unknown_words):
-                    self.unknown_words.append(word.lower())
+            self.text.tag_add("highlight", start_pos, end_pos)
+            now_known_indexes.append((start_pos, end_pos))
+            lower_word = word.lower()
+            if lower_word not in self.unknown_words:
+                self.unknown_words.append(lower_word)
         except Exception as e:
             print("Error in hlight_word: {}".format(e))
 
     def highlight_unknown(self):
         """
         Checks the entire text, highlighting unknown words (words not in spellchecker's
-        known words list, ignored words list). Ignores capitalization and punctuation
-        when checking.
+        known words list, ignored words list), through check_lines.
         
         Arguments:
         -None
@@ -1704,42 +5521,164 @@ class SpellcheckerApp:
             if self.arrow_key_mode and (curr_time-self.arrow_last_time>self.arrow_time_reset):
                 self.arrow_key_mode = False
             if not self.arrow_key_mode:
-                curr_index = self.text.index(tk.INSERT)
-                curr_line_num = int(curr_index.split('.')[0])
-                self.text.tag_remove("highlight", "1.0", tk.END)
-                now_known_indexes = []
-                punctuation_mark = True
-                for line_num in range(1, int(self.text.index(tk.END).split('.')[0])+1):
-                    line_start= "{}.0".format(line_num)
-                    line_end= "{}.end".format(line_num)
-                    line_text = self.text.get(line_start, line_end)
-                    for match in re.finditer(r'\b[a-zA-Z]+\b', line_text):
-                        word=match.group()
-                        lower_word = word.lower()
-                        exclusions = word.istitle() and lower_word in self.spellchecker.known_words
-                        capital_known_word = (word.isupper() or (
-                            word.istitle() and not punctuation_mark)) and lower_word in self.spellchecker.known_words
-                        start_pos = "{}+{}c".format(line_start, match.start())
-                        end_pos = "{}+{}c".format(line_start, match.end())
-                        if not exclusions and not capital_known_word:
-                            if (lower_word not in self.spellchecker.known_words) and (
-                                lower_word not in self.spellchecker.ignored_words):
-                                self.text.tag_add("highlight", start_pos, end_pos)
-                                now_known_indexes.append((start_pos, end_pos))
-                                if lower_word not in self.unknown_words:
-                                    self.unknown_words.append(lower_word)
-                        punctuation_mark = re.match(r".*[.!?;]$", line_text[:match.end()])
-                    self.highlight_indexes = now_known_indexes
-                    self.current_unknown_index = len(self.highlight_indexes)-1
-                    self.text.tag_config("highlight", background="yellow")
-                    self.set_insertion("1.0")
-                    self.text.tag_bind("highlight", "<Button-1>", self.show_menu)
+                self.check_lines(1, None)
+                self.current_unknown_index = len(self.highlight_indexes)-1
+                self.set_insertion("1.0")
+                self.text.tag_bind("highlight", "<Button-1>", self.show_menu)
         except Exception as e:
             print("Error in highlight_unknown: {}".format(e))
 
+    def check_lines(self, first_line, last_line):
+        """
+        Re-checks a range of lines, replacing their highlights; highlights on other
+        lines are kept (tags move with the text as it is edited, so they stay on
+        their words). highlight_indexes is spliced for the range, or rebuilt from
+        the tags if the number of lines changed, since its indexes then moved. The lines are read from the widget once and split by
+        tokenize, the same tokenizer spell_check uses, and the unknown words are
+        found by the spellchecker's find_unknown; their text indexes come from the
+        offsets tokenize reports, so the widget is never searched for them.
+        Whether the first word begins a sentence is taken from the text before
+        the range (see sentence_start_at).
+
+        Arguments:
+        -first_line (int): first line to check
+        -last_line (int/None): last line to check, else None for the end of the text
+
+        Returns:
+        -None
+        """
+        end_line = int(self.text.index("end-1c").split('.')[0])
+        last_line = end_line if last_line is None else min(last_line, end_line)
+        start_index = "{}.0".format(first_line)
+        end_index = "{}.end".format(last_line)
+        text_content = self.text.get(start_index, end_index)
+        self.text.tag_remove("highlight", start_index, end_index)
+        line_starts = [0]+[match.end() for match in re.finditer(r'\n', text_content)]
+        words = []
+        offsets = []
+        sentence_starts = []
+        for word, offset, sentence_start in tokenize(text_content, self.sentence_start_at(start_index)):
+            words.append(word)
+            offsets.append(offset)
+            sentence_starts.append(sentence_start)
+        now_known_indexes = []
+        for index in self.spellchecker.find_unknown(words, sentence_starts):
+            word = words[index]
+            line_num = bisect.bisect_right(line_starts, offsets[index])
+            column = offsets[index]-line_starts[line_num-1]
+            start_pos = "{}.{}".format(first_line+line_num-1, column)
+            end_pos = "{}.{}".format(first_line+line_num-1, column+len(word))
+            self.hlight_word(word, start_pos, end_pos, now_known_indexes)
+        if end_line == self.line_count:
+            self.highlight_indexes[self.highlight_position(first_line):
+                                   self.highlight_position(last_line+1)] = now_known_indexes
+        else:
+            ranges = [str(index) for index in self.text.tag_ranges("highlight")]
+            self.highlight_indexes = list(zip(ranges[::2], ranges[1::2]))
+            self.line_count = end_line
+        self.text.tag_config("highlight", background="yellow")
+
+    def highlight_position(self, line_num):
+        """
+        Finds where a line's highlights start in highlight_indexes, by binary search.
+
+        Arguments:
+        -line_num (int): line number
+
+        Returns:
+        -int: index of the first highlight on or after the line
+        """
+        low = 0
+        high = len(self.highlight_indexes)
+        while low < high:
+            middle = (low+high)//2
+            if int(self.highlight_indexes[middle][0].split('.')[0]) < line_num:
+                low = middle+1
+            else:
+                high = middle
+        return low
+
+    def sentence_start_at(self, index):
+        """
+        Tells whether a word at a text index would begin a sentence, from the
+        nearest letter or sentence-ending mark before it.
+
+        Arguments:
+        -index (str): text index
+
+        Returns:
+        -bool: True if nothing but sentence-ending marks, or nothing at all,
+         separates index from the last word before it
+        """
+        previous = self.text.search(r'[.!?;[:alpha:]]', index, stopindex="1.0", backwards=True, regexp=True)
+        return not previous or self.text.get(previous) in ".!?;"
+
+    def text_modified(self, event=None):
+        """
+        Handles the text widget's <<Modified>> event, raised on the first edit after
+        the modified flag is cleared. The flag is cleared again, and the edited
+        lines are queued for check_dirty: the lines recorded by keypress_action, up
+        to the cursor line after the edit, and on to the line of the next word, for
+        the sentence context (an edit can change whether that word begins a
+        sentence, even across blank lines). Edits not made by typing (undo, redo, a
+        newly opened file) queue the whole text.
+
+        Arguments:
+        -event (Event, optional): Tkinter event object. Defaulted to None.
+
+        Returns:
+        -None
+        """
+        try:
+            if not self.text.edit_modified():
+                return
+            self.text.edit_modified(False)
+            if self.dirty_lines is None:
+                lines = (1, None)
+            else:
+                insert_line = int(self.text.index(tk.INSERT).split('.')[0])
+                last_line = max(self.dirty_lines[1], insert_line)
+                next_word = self.text.search(r'[[:alpha:]]', "{}.end".format(last_line), stopindex=tk.END,
+                                             regexp=True)
+                if next_word:
+                    last_line = int(next_word.split('.')[0])
+                lines = (min(self.dirty_lines[0], insert_line), last_line)
+            self.dirty_lines = None
+            if self.pending_lines is not None:
+                last = None if None in (lines[1], self.pending_lines[1]) else max(lines[1], self.pending_lines[1])
+                lines = (min(lines[0], self.pending_lines[0]), last)
+            self.pending_lines = lines
+            if self.check_timer is None:
+                self.check_timer = self.window.after_idle(self.check_dirty)
+        except Exception as e:
+            print("Error in text_modified: {}".format(e))
+
+    def check_dirty(self):
+        """
+        Re-checks the lines queued by text_modified, once the edits that queued them
+        are done. While the dictionary is loading, the check is queued.
+
+        Arguments:
+        -None
+
+        Returns:
+        -None
+        """
+        self.check_timer = None
+        if not self.when_loaded("check_dirty", self.check_dirty):
+            return
+        try:
+            if self.pending_lines is not None:
+                first_line, last_line = self.pending_lines
+                self.pending_lines = None
+                self.check_lines(first_line, last_line)
+        except Exception as e:
+            print("Error in check_dirty: {}".format(e))
+
     def get_next_unknown_start(self, from_index):
         """
-        Finds the starting index of the next unknown word, starting at a given index.
+        Finds the starting index of the next unknown word, starting at a given index,
+        from the positions recorded by highlight_unknown.
         
         Arguments:
         -from_index (str): text index from which search for next unknown word starts
@@ -1748,12 +5687,10 @@ class SpellcheckerApp:
         -str: index of start of next unknown word, else None
         """
         try:
-            next_index = self.text.search(r'\b[a-zA-Z]+\b', from_index, tk.END, regexp=True)
-            while next_index:
-                if self.text.get(next_index + " wordstart", next_index + " wordend") in self.unknown_words:
-                    return next_index
-                next_index = self.text.index(next_index + " wordend")
-                next_index = self.text.search(r'\b[a-zA-Z]+\b', next_index + " +1c", tk.END, regexp=True)
+            from_position = tuple(int(part) for part in self.text.index(from_index).split('.'))
+            for start_index, end_index in self.highlight_indexes:
+                if tuple(int(part) for part in start_index.split('.')) >= from_position:
+                    return start_index
             return None
         except Exception as e:
             print("Error in get_next_unknown_start: {}".format(e))
@@ -1777,20 +5714,13 @@ class SpellcheckerApp:
             curr_view = self.text.yview()
             curr_index = self.text.index(tk.INSERT)
             if self.curr_word_pos:
-                new_word = self.text.get(self.curr_word_pos+" wordstart",self.curr_word_pos+" wordend")
+                new_word = self.text.get(*self.curr_word_pos)
                 if new_word:
                     new_word = new_word.strip()
                     if new_word and (new_word not in self.spellchecker.known_words):
-                        self.spellchecker.known_words.add(new_word)
-                        self.text.tag_remove("highlight", self.curr_word_pos+" wordstart", self.curr_word_pos+" wordend")
-                        self.text.tag_remove("selected", self.curr_word_pos+" wordstart", self.curr_word_pos+" wordend")
-                        try:
-                            with open(self.spellchecker.personal_dict_file, 'rt') as personal_dict_file:
-                                if new_word not in personal_dict_file:
-                                    with open(personal_dict_file_path, 'at') as personal_dict_file:
-                                        personal_dict_file.write(new_word+'\n')
-                        except IOError as e:
-                            print("Error reading personal_dict: {}".format(e))
+                        self.spellchecker.add_personal_word(new_word)
+                        self.text.tag_remove("highlight", *self.curr_word_pos)
+                        self.text.tag_remove("selected", *self.curr_word_pos)
                         self.highlight_unknown()
                         self.text.yview_moveto(curr_view[0])
                         self.text.mark_set(tk.INSERT, curr_index)
@@ -1798,6 +5728,416 @@ class SpellcheckerApp:
         except Exception as e:
             print("Error in personal_dict: {}".format(e))
 
+SUGGEST_BACKENDS = {"bktree": BKTree, "symspell": SymSpellSuggester, "bounded": LengthBuckets,
+                    "trie": SuggestionTrie, "numpy": NumpySuggester, "ngram": NgramIndex,
+                    "phonetic": PhoneticIndex, "dawg": Dawg}
+
+#known-word stores, for Spellchecker(dictionary=...)
+DICTIONARY_BACKENDS = {"set": set, "case": CaseTable, "dawg": Dawg}
+
+#WordStores, flushed at exit; held weakly, so stores (of Spellcheckers, workers,
+#tests) are not kept alive until exit just to be flushed
+open_word_stores = weakref.WeakSet()
+
+def close_word_stores():
+    """
+    Flushes every WordStore still in use. Registered with atexit once, for all
+    stores.
+
+    Returns:
+    -None
+    """
+    for store in list(open_word_stores):
+        store.close()
+
+atexit.register(close_word_stores)
+
+#worker process state, for Spellchecker.iter_check
+worker_spellchecker = None
+
+def init_check_worker(known_words, suggest_backend, keyboard_ranking, frequencies=None, ignored_words=None,
+                      suggest_index=None):
+    """
+    Sets up a worker process for parallel spellchecking, with its own Spellchecker
+    over the known words (and suggestion index) sent at pool start.
+
+    Arguments:
+    -known_words (set): set of known words
+    -suggest_backend (str/None): suggestion backend, see build_suggest_index
+    -keyboard_ranking (bool): whether suggestions are reranked by KeyboardDistance
+    -frequencies (FrequencyTable, optional): word frequencies. Defaulted to None.
+    -ignored_words (set, optional): words to be ignored. Defaulted to None.
+    -suggest_index (optional): suggestion index built for known_words. Defaulted
+     to None (built here, from suggest_backend).
+
+    Returns:
+    -None
+    """
+    global worker_spellchecker
+    worker_spellchecker = Spellchecker(None, None, None, None, suggest_backend if suggest_index is None else None,
+                                       keyboard_ranking, known_words=known_words)
+    if suggest_index is not None:
+        worker_spellchecker.suggest_backend = suggest_backend
+        worker_spellchecker.suggest_index = suggest_index
+    worker_spellchecker.frequencies = frequencies
+    worker_spellchecker.ignored_words = ignored_words or set()
+
+def check_chunk(words, sentence_starts):
+    """
+    Checks a chunk of words in a worker process.
+
+    Arguments:
+    -words (list): chunk of words, from tokenize
+    -sentence_starts (list): for each word, True if it begins a sentence
+
+    Returns:
+    -list: list of (index, word, suggestions) tuples for unknown words, in text order
+    """
+    return worker_spellchecker.check_words(words, sentence_starts)
+
+def check_file(file_path, spellchecker=None):
+    """
+    Checks one file, for the 'check' command; in a worker process (see
+    check_files), with the worker's Spellchecker. Messages printed while the file
+    is read go to stderr, so they never mix with results written to stdout.
+
+    Arguments:
+    -file_path (str): path to the file, of a type open_reference_file supports
+    -spellchecker (Spellchecker, optional): Spellchecker to check with. Defaulted
+     to None (the worker's, see init_check_worker).
+
+    Returns:
+    -dict: 'file' (file_path), 'words' (number of words read), 'unknown' (list of
+     (offset, word, suggestions) tuples, in text order) and 'error' (message if
+     the file could not be opened, else None)
+    """
+    spellchecker = spellchecker or worker_spellchecker
+    result = {"file": file_path, "words": 0, "unknown": [], "error": None}
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            spellchecker.reference_file = open_reference_file(file_path)
+            result["unknown"] = [(offset, word, suggestions)
+                                 for word, offset, suggestions in spellchecker.iter_check()]
+            result["words"] = spellchecker.words_checked
+            result["error"] = spellchecker.parse_error
+        except Exception as e:
+            result["error"] = str(e)
+    return result
+
+def check_files(file_paths, spellchecker, workers=1):
+    """
+    Checks files for the 'check' command. With more than one worker and more than
+    one file, files are checked in worker processes, one file per task; otherwise
+    they are checked here, one after another (a single large file is still
+    split across spellchecker.workers, see Spellchecker.iter_check).
+
+    Arguments:
+    -file_paths (list): paths to the files
+    -spellchecker (Spellchecker): loaded Spellchecker, sent to the workers once
+     (see worker_initargs)
+    -workers (int, optional): number of worker processes. Defaulted to 1.
+
+    Returns:
+    -generator: results of check_file, in the order of file_paths
+    """
+    if workers > 1 and len(file_paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_check_worker,
+                                 initargs=spellchecker.worker_initargs()) as pool:
+            yield from pool.map(check_file, file_paths)
+    else:
+        for file_path in file_paths:
+            yield check_file(file_path, spellchecker)
+
+def expand_paths(patterns):
+    """
+    Expands file paths and glob patterns ('**' matches any folders) for the
+    'check' command. Paths without wildcards are kept as given, so a missing
+    file is reported rather than dropped.
+
+    Arguments:
+    -patterns (list): file paths and glob patterns
+
+    Returns:
+    -list: file paths, without duplicates or folders, in the order given
+     (matches of each pattern sorted)
+    """
+    file_paths = []
+    seen = set()
+    for pattern in patterns:
+        if any(char in pattern for char in "*?["):
+            matches = sorted(path for path in glob.glob(pattern, recursive=True) if not os.path.isdir(path))
+        else:
+            matches = [pattern]
+        for path in matches:
+            if path not in seen:
+                seen.add(path)
+                file_paths.append(path)
+    return file_paths
+
+def write_results(results, out, output_format="jsonl"):
+    """
+    Writes results of check_files as they come, one record per unknown word (file,
+    offset, word, suggestions) and one per file that could not be read (file,
+    error).
+
+    Arguments:
+    -results (iterable): results of check_file
+    -out (file): open text file to write to
+    -output_format (str, optional): 'jsonl' (one JSON object per line), 'json'
+     (one JSON list) or 'csv' (suggestions joined with '|'). Defaulted to 'jsonl'.
+
+    Returns:
+    -tuple: (files, words, unknown words, errors) totals
+    """
+    totals = [0, 0, 0, 0]
+    separator = "\n"
+    writer = None
+    if output_format == "csv":
+        writer = csv.writer(out)
+        writer.writerow(["file", "offset", "word", "suggestions", "error"])
+    elif output_format == "json":
+        out.write("[")
+    for result in results:
+        totals[0] += 1
+        totals[1] += result["words"]
+        totals[2] += len(result["unknown"])
+        if result["error"] is not None:
+            totals[3] += 1
+            records = [{"file": result["file"], "error": result["error"]}]
+        else:
+            records = [{"file": result["file"], "offset": offset, "word": word, "suggestions": suggestions}
+                       for offset, word, suggestions in result["unknown"]]
+        for record in records:
+            if writer is not None:
+                writer.writerow([record["file"], record.get("offset", ""), record.get("word", ""),
+                                 "|".join(record.get("suggestions", ())), record.get("error", "")])
+            elif output_format == "json":
+                out.write(separator+json.dumps(record))
+                separator = ",\n"
+            else:
+                out.write(json.dumps(record)+"\n")
+    if output_format == "json":
+        out.write("\n]\n")
+    return tuple(totals)
+
+def open_reference_file(file_path):
+    """
+    Opens a file as the ReferenceFile for its type, by extension.
+
+    -.txt is read as plain text (TextFile)
+    -.html or .htm is read as HTML (HTMLFile)
+    -.pdf is read as PDF (PDFFile), a page at a time when checked
+    -.docx is read as .docx file (DocxFile, paragraphs joined)
+
+    Arguments:
+    -file_path (str): path to the file
+
+    Returns:
+    -ReferenceFile: the opened file
+
+    Raises:
+    -ValueError: if the file type is not supported
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".txt":
+        with open(file_path, 'rt') as file:
+            return TextFile(file.read())
+    if extension in (".html", ".htm"):
+        with open(file_path, 'rt') as file:
+            return HTMLFile(file.read())
+    if extension == ".pdf":
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError("No such file: '{}'".format(file_path))
+        return PDFFile(file_path)
+    if extension == ".docx":
+        document = Document(file_path)
+        return DocxFile('\n'.join(paragraph.text for paragraph in document.paragraphs if paragraph.text))
+    raise ValueError("File not supported: {}".format(file_path))
+
+def make_spellchecker(args, reference_file=None, **overrides):
+    """
+    Creates the Spellchecker described by the command line arguments, shared by
+    the window and the 'check' command. Each --layer is NAME=PATH, or a PATH
+    named after its file.
+
+    Arguments:
+    -args (argparse.Namespace): parsed command line arguments
+    -reference_file (ReferenceFile, optional): text to check. Defaulted to None.
+    -overrides: further Spellchecker arguments (e.g. background, watch_interval)
+
+    Returns:
+    -Spellchecker: the Spellchecker
+    """
+    layers = [tuple(layer.split("=", 1)) if "=" in layer else (os.path.splitext(os.path.basename(layer))[0], layer)
+              for layer in args.layer]
+    return Spellchecker(reference_file, args.words, args.pd, args.ignored, suggest_backend=args.suggester,
+                        keyboard_ranking=args.keyboard, workers=args.workers, frequency_file_path=args.freq,
+                        compiled_dict_path=args.compiled, dictionary=args.dictionary, bloom_rate=args.bloom,
+                        layers=layers, **overrides)
+
+def load_tkinter():
+    """
+    Imports tkinter (and its file dialogs) on first use, so the 'check' command
+    and scripts that only check text never load it, and run without a display.
+
+    Returns:
+    -None
+
+    Raises:
+    -ImportError: if tkinter is not installed
+    """
+    global tk, filedialog
+    if tk is None:
+        try:
+            import tkinter
+            from tkinter import filedialog as tk_filedialog
+        except ImportError as e:
+            raise ImportError("tkinter is needed for the Spellchecker window ({}); "
+                              "use the 'check' command to spellcheck without it".format(e))
+        tk, filedialog = tkinter, tk_filedialog
+
+#words are runs of letters, with inner apostrophes or hyphens; sentences end at .!?;
+token_pattern = re.compile(r"(?P<end>[.!?;])|(?<!\w)(?P<word>[^\W\d_]+(?:['-][^\W\d_]+)*)(?!\w)")
+
+def tokenize(blocks, sentence_start=True):
+    """
+    Splits text into words in one pass of token_pattern, the only tokenizer used
+    for checking (by Spellchecker and SpellcheckerApp alike). Surrounding
+    punctuation is not part of a word, and a word begins a sentence if it is the
+    first of the text or follows one of . ! ? ;
+
+    Arguments:
+    -blocks (str/iterable): text, or (text, offset) tuples of consecutive blocks
+     of it, each ending at whitespace (see text_blocks)
+    -sentence_start (bool, optional): whether the text begins a sentence.
+     Defaulted to True.
+
+    Returns:
+    -generator: (word, offset, sentence_start) tuples; offset is the character
+     offset of the word in the text
+    """
+    if isinstance(blocks, str):
+        blocks = [(blocks, 0)]
+    for text, offset in blocks:
+        for match in token_pattern.finditer(text):
+            if match.lastgroup == "end":
+                sentence_start = True
+                continue
+            yield match.group(), offset+match.start(), sentence_start
+            sentence_start = False
+
+def text_blocks(text, block_size=65536):
+    """
+    Cuts text into blocks of about block_size characters, each ending at
+    whitespace, so no word is cut.
+
+    Arguments:
+    -text (str): text to cut
+    -block_size (int, optional): characters per block. Defaulted to 65536.
+
+    Returns:
+    -generator: (block, offset) tuples
+    """
+    whitespace = re.compile(r'\s')
+    position = 0
+    while position < len(text):
+        end = whitespace.search(text, position+block_size)
+        end = end.start() if end else len(text)
+        yield text[position:end], position
+        position = end
+
+def iter_reference_blocks(reference_file):
+    """
+    Reads text from a reference file in blocks, through its iter_blocks method,
+    or its parse method if it has none (a list of words is joined with spaces).
+
+    Arguments:
+    -reference_file (ReferenceFile): the text to be checked
+
+    Returns:
+    -iterator: (text, offset) tuples
+    """
+    iter_blocks = getattr(reference_file, "iter_blocks", None)
+    if iter_blocks is not None:
+        return iter_blocks()
+    return ReferenceFile.iter_blocks(reference_file)
+
+def build_suggest_index(suggest_backend, known_words):
+    """
+    Builds the suggestion index named by suggest_backend, from known words.
+
+    Arguments:
+    -suggest_backend (str/None): 'bktree' for a BKTree, 'symspell' for a
+     SymSpellSuggester, 'bounded' for LengthBuckets, 'trie' for a
+     SuggestionTrie, 'numpy' for a NumpySuggester, 'ngram' for an NgramIndex,
+     'phonetic' for a PhoneticIndex, 'dawg' for a Dawg; 'scan' or None for no
+     index (full scan in Suggester.get_suggestions)
+    -known_words (set): set of known words to index
+
+    Returns:
+    -index object with suggest, add and stats methods, else None
+
+    -The time taken to build the index is stored on it, as build_time (seconds)
+    -If 'numpy' is asked for and NumPy is not installed, None is returned
+    -If 'dawg' is asked for and known_words is already a Dawg, it is used as the index
+    -If known_words is a LayeredDictionary, it gets an index per layer and is
+     used as the index
+    """
+    if suggest_backend in (None, "scan"):
+        return None
+    if suggest_backend not in SUGGEST_BACKENDS:
+        raise ValueError("Unknown suggestion backend: {}".format(suggest_backend))
+    if suggest_backend == "numpy" and not module_available(np):
+        print("NumPy not available, suggestions use the full scan")
+        return None
+    if suggest_backend == "dawg" and isinstance(known_words, Dawg):
+        return known_words
+    start_time = time.perf_counter()
+    if isinstance(known_words, LayeredDictionary):
+        known_words.set_suggest_backend(suggest_backend)
+        known_words.build_time = time.perf_counter()-start_time
+        return known_words
+    index = SUGGEST_BACKENDS[suggest_backend](known_words)
+    index.build_time = time.perf_counter()-start_time
+    return index
+
+def report_suggest_index(suggest_backend, index):
+    """
+    Formats build time and memory of a suggestion index, for printing.
+
+    Arguments:
+    -suggest_backend (str): name of the backend
+    -index: index returned by build_suggest_index
+
+    Returns:
+    -str: one-line report
+    """
+    stats = index.stats()
+    return "Suggestion index '{}': {} words, {} entries, built in {:.2f}s, ~{:.1f} MB".format(
+        suggest_backend, stats["words"], stats["entries"], index.build_time, stats["memory"]/(1024*1024))
+
+def load_layer(file_path, intern=True):
+    """
+    Reads a word list for a LayeredDictionary layer, interning each word so that
+    words shared between layers are stored once. The interned-string table costs
+    more per word than it saves for words that are not shared, so the (large)
+    base list is read without interning.
+
+    Arguments:
+    -file_path (str): path to file of words, one per line
+    -intern (bool, optional): defaulted to True
+
+    Returns:
+    -set: set of words, empty if the file could not be read
+    """
+    try:
+        with open(file_path, 'rt', encoding='utf-8') as layer_file:
+            words = layer_file.read().split()
+            return set(map(sys.intern, words)) if intern else set(words)
+    except (IOError, UnicodeDecodeError) as e:
+        print("Error reading the file-{}: {}".format(file_path, e))
+        return set()
+
 def load_files(file_path):
     try:
         if os.path.isfile(file_path):
@@ -1810,9 +6150,57 @@ def load_files(file_path):
         print("Error reading the file-{}: {}".format(file_path,e))
         return set()
 
+def compile_dictionary(words_file_path, compiled_dict_path):
+    """
+    Writes a compiled dictionary (see CompiledDictionary) of a known words file.
+    The file is written under a temporary name and then renamed, so a running
+    spellchecker never maps a half-written file.
+
+    Arguments:
+    -words_file_path (str): path to file of known words, one word per line
+    -compiled_dict_path (str): path of compiled dictionary to write
+
+    Returns:
+    -int: number of distinct words written
+    """
+    with open(words_file_path, 'rt', encoding='utf-8') as words_file:
+        words = sorted({word.encode('utf-8') for word in words_file.read().split()})
+    offsets = array('I', [0])
+    for word in words:
+        offsets.append(offsets[-1]+len(word))
+    temporary_path = compiled_dict_path+".tmp"
+    with open(temporary_path, 'wb') as compiled_file:
+        compiled_file.write(CompiledDictionary.header.pack(CompiledDictionary.magic, len(words)))
+        offsets.tofile(compiled_file)
+        compiled_file.write(b"".join(words))
+    os.replace(temporary_path, compiled_dict_path)
+    return len(words)
+
+def load_compiled_dictionary(words_file_path, compiled_dict_path):
+    """
+    Opens a compiled dictionary, first (re)compiling it from the known words file
+    if it is missing, older than the known words file, or unreadable.
+
+    Arguments:
+    -words_file_path (str): path to file of known words
+    -compiled_dict_path (str): path to compiled dictionary
+
+    Returns:
+    -CompiledDictionary: known words
+    """
+    stale = not os.path.isfile(compiled_dict_path) or (
+        os.path.isfile(words_file_path) and os.path.getmtime(words_file_path) > os.path.getmtime(compiled_dict_path))
+    if not stale:
+        try:
+            return CompiledDictionary(compiled_dict_path)
+        except (ValueError, OSError, struct.error) as e:
+            print("Recompiling {}: {}".format(compiled_dict_path, e))
+    compile_dictionary(words_file_path, compiled_dict_path)
+    return CompiledDictionary(compiled_dict_path)
+
 #application loop, command line
 if __name__ == "__main__":
-    
+    startup_time = time.perf_counter()
     default_folder = os.path.dirname(os.path.abspath(__file__))
     default_words_file = os.path.join(default_folder, "words.txt")
     default_ignored_file = os.path.join(default_folder, "ign_words.txt")
@@ -1824,12 +6212,75 @@ if __name__ == "__main__":
     parser.add_argument("--ignored", type=str, default=default_ignored_file, help="Path to ignored words file")
     parser.add_argument("--pd", type=str, default=default_personal_dict_file, help="Path to personal dictionary file")
     parser.add_argument("--ex", type=str, default=default_txt_example_file, help="Path to example text file")
+    parser.add_argument("--suggester", type=str, default="scan", choices=["scan"]+sorted(SUGGEST_BACKENDS),
+                        help="Suggestion backend (full scan, BK-tree index, SymSpell delete index, length-bounded scan, "
+                             "trie search, NumPy batch scan, trigram prefilter, Soundex buckets, or word graph search)")
+    parser.add_argument("--freq", type=str, default=None,
+                        help="Path to word-frequency list, for ranking suggestions")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes used to spellcheck large documents")
+    parser.add_argument("--keyboard", action="store_true",
+                        help="Rerank suggestions by keyboard-weighted edit distance (similarity_scores.py)")
+    parser.add_argument("--dictionary", type=str, default="case", choices=sorted(DICTIONARY_BACKENDS),
+                        help="Store for known words (case table, Python set, or compact word graph)")
+    parser.add_argument("--layer", type=str, action="append", default=[], metavar="NAME=PATH",
+                        help="Extra word list (e.g. medical=medical.txt), checked after --pd and before --words; "
+                             "may be repeated, highest priority first")
+    parser.add_argument("--watch", type=float, default=2.0, metavar="SECONDS",
+                        help="Poll --words, --pd and --ignored for changes every SECONDS, applying them without "
+                             "a restart (0 turns this off)")
+    parser.add_argument("--timing", action="store_true",
+                        help="Print time to first paint of the window, time to load the dictionary, and "
+                             "suggestion cache statistics on exit")
+    parser.add_argument("--bloom", type=float, default=None,
+                        help="False-positive rate of a Bloom filter checked before --dictionary dawg or --compiled lookups")
+    parser.add_argument("--compiled", type=str, default=None,
+                        help="Path to compiled dictionary of --words (compiled when missing or older than --words)")
+    subparsers = parser.add_subparsers(dest="command")
+    compile_parser = subparsers.add_parser("compile-dict", help="Compile the known words file and exit")
+    compile_parser.add_argument("--out", type=str, default=None,
+                                help="Path of compiled dictionary (defaults to --compiled, else --words with '.dict')")
+    check_parser = subparsers.add_parser("check", help="Spellcheck files without opening the window, and exit")
+    check_parser.add_argument("files", type=str, nargs="+",
+                              help="Files or glob patterns (.txt, .html, .htm, .pdf, .docx), e.g. 'docs/**/*.txt'")
+    check_parser.add_argument("--format", type=str, default="jsonl", choices=["jsonl", "json", "csv"],
+                              help="Format of results: one JSON object per line, a JSON list, or CSV")
+    check_parser.add_argument("--out", type=str, default=None, help="Path of results file (defaults to stdout)")
     args = parser.parse_args()
-            
 
-    known_words_file_path = args.words
-    personal_dict_file_path = args.pd
-    ign_words_file_path = args.ignored
+    if args.command == "compile-dict":
+        compiled_dict_path = args.out or args.compiled or os.path.splitext(args.words)[0]+".dict"
+        start_time = time.perf_counter()
+        count = compile_dictionary(args.words, compiled_dict_path)
+        print("Compiled {} words into {} in {:.2f}s".format(count, compiled_dict_path,
+                                                           time.perf_counter()-start_time))
+        if args.bloom:
+            bloom = BloomFilter(CompiledDictionary(compiled_dict_path), count, args.bloom)
+            bloom.save(compiled_dict_path+".bloom")
+            print("Bloom filter: {} bytes, {} hashes per word".format(len(bloom.bits), bloom.num_hashes))
+        sys.exit(0)
+
+    if args.command == "check":
+        file_paths = expand_paths(args.files)
+        spellchecker = make_spellchecker(args)
+        start_time = time.perf_counter()
+        with (open(args.out, 'wt', newline="") if args.out else contextlib.nullcontext(sys.stdout)) as out:
+            files, words, unknown, errors = write_results(check_files(file_paths, spellchecker, args.workers),
+                                                          out, args.format)
+        elapsed = time.perf_counter()-start_time
+        spellchecker.close_pool()
+        spellchecker.close_stores()
+        print("Checked {} files ({} words) in {:.2f}s after {:.2f}s loading: {:.1f} files/s, {:.0f} words/s; "
+              "{} unknown words, {} files unreadable".format(
+                  files, words, elapsed, spellchecker.load_time or 0, files/elapsed if elapsed else 0,
+                  words/elapsed if elapsed else 0, unknown, errors), file=sys.stderr)
+        sys.exit(1 if unknown or errors else 0)
+
+    try:
+        load_tkinter()
+    except ImportError as e:
+        print(e)
+        sys.exit(1)
 
     try:
         with open(args.ex, 'rt') as example_text_file:
@@ -1840,10 +6291,30 @@ if __name__ == "__main__":
 
     reference_file = TextFile(example_text)
     window = tk.Tk()
-    spellchecker = Spellchecker(reference_file,known_words_file_path,personal_dict_file_path, ign_words_file_path)
-    spellchecker.ignored_words = load_files(ign_words_file_path)
+    spellchecker = make_spellchecker(args, reference_file, background=True, watch_interval=args.watch or None)
     app = SpellcheckerApp(window, spellchecker)
+
+    def report_loaded():
+        if spellchecker.suggest_index is not None:
+            print(report_suggest_index(args.suggester, spellchecker.suggest_index))
+        if args.timing:
+            print("Dictionary loaded: {:.0f} ms after start ({:.0f} ms loading)".format(
+                (time.perf_counter()-startup_time)*1000, spellchecker.load_time*1000))
+
+    def report_first_paint(event):
+        window.unbind("<Expose>")
+        print("First paint: {:.0f} ms after start".format((time.perf_counter()-startup_time)*1000))
+
+    if args.timing:
+        window.bind("<Expose>", report_first_paint)
+    if app.when_loaded("report", report_loaded):
+        report_loaded()
     window.mainloop()
+    spellchecker.stop_watching()
+    spellchecker.close_pool()
+    spellchecker.close_stores()
+    if args.timing:
+        print("Suggestion cache: {}".format(spellchecker.cache_stats()))
 
 ###phrase entry, personal-use###
 #python "C:\Users\cb6f1\OneDrive\Desktop\Project\spellchecker\spellchecker.py"
@@ -1,8 +1,28 @@
 
 import unittest
+from unittest import mock
 import tkinter as tk
 from spellchecker import Spellchecker, SpellcheckerApp, Suggester, ReferenceFile
 from spellchecker import TextFile, PDFFile, HTMLFile, DocxFile
+from spellchecker import BKTree, SymSpellSuggester, LengthBuckets, SuggestionTrie, build_suggest_index
+from spellchecker import KeyboardDistance, NumpySuggester, SuggestionCache, NgramIndex, PhoneticIndex
+from spellchecker import FrequencyTable, CompiledDictionary, compile_dictionary, load_compiled_dictionary, Dawg
+from spellchecker import BloomFilter, WordStore, LayeredDictionary, CaseTable, tokenize, text_blocks
+from spellchecker import open_reference_file, expand_paths, check_files, write_results
+import os
+import pickle
+import io
+import json
+import argparse
+import gc
+import weakref
+import math
+import subprocess
+import sys
+import tempfile
+import time
+import threading
+import spellchecker as spellchecker_module
 
 reference_file = "C:\\Users\\cb6f1\\OneDrive\\Desktop\\Project\\spellchecker\\example.txt"
 known_words_file_path = "C:\\Users\\cb6f1\\OneDrive\\Desktop\\Project\\spellchecker\\words.txt"
@@ -29,7 +49,7 @@ class TestSpellchecker(unittest.TestCase):
         ignored_words_file_path = "ign_words.txt"
         spellchecker = Spellchecker(reference_file, known_words_file_path,personal_dict_file_path,ignored_words_file_path)
         spellchecker.spell_check()
-        self.assertEqual(spellchecker.unknown_words, [("Jlly", [])])
+        self.assertEqual(spellchecker.unknown_words, [("Jlly", []), ("christmas", [])])
     
     def test_spell_check_known(self):
         class MockReferenceFile:
@@ -44,6 +64,92 @@ class TestSpellchecker(unittest.TestCase):
         spellchecker.spell_check()
         self.assertNotIn(spellchecker.unknown_words, [("Holly", []), ("Jolly", []), ("christmas.", [])])
 
+    def test_spell_check_repeated(self):
+        class MockReferenceFile:
+            def parse(self):
+                return ["And", "Jlly", "and", "jlly", "again."]
+        spellchecker = Spellchecker(MockReferenceFile(), "known_words.txt", "pers_dict.txt", "ign_words.txt")
+        spellchecker.known_words = {"jolly", "and", "again"}
+        spellchecker.spell_check()
+        suggestions = Suggester.get_suggestions("jlly", spellchecker.known_words)
+        self.assertEqual(spellchecker.unknown_words, [("Jlly", suggestions), ("jlly", suggestions)])
+        self.assertEqual(spellchecker.cache_stats()["misses"], 1)
+
+    def test_parallel_spell_check(self):
+        class MockReferenceFile:
+            def parse(self):
+                return ["Hlly", "jlly.", "Chrstmas", "and", "jlly", "Hlly", "jlly!", "Chrstmas", "evry", "one"]
+        known_words = {"holly", "jolly", "christmas", "and", "every", "one"}
+        serial = Spellchecker(MockReferenceFile(), None, None, None, known_words=set(known_words))
+        serial.spell_check()
+        parallel = Spellchecker(MockReferenceFile(), None, None, None, known_words=set(known_words),
+                                workers=2, chunk_size=2)
+        parallel.spell_check()
+        parallel.close_pool()
+        self.assertEqual(parallel.unknown_words, serial.unknown_words)
+        self.assertEqual([word for word, suggestions in serial.unknown_words], ["jlly", "jlly", "Hlly", "jlly", "evry"])
+
+    def test_iter_check(self):
+        text = "Jolly jlly and hlly.  Hlly jolly evry one"
+        known_words = {"holly", "jolly", "and", "every", "one"}
+        spellchecker = Spellchecker(TextFile(text), None, None, None, known_words=set(known_words), chunk_size=3)
+        found = [(word, offset) for word, offset, suggestions in spellchecker.iter_check()]
+        self.assertEqual(found, [("jlly", 6), ("hlly", 15), ("evry", 33)])
+        first = spellchecker.spell_check()
+        self.assertEqual(spellchecker.spell_check(), first)
+        self.assertEqual(len(spellchecker.unknown_words), 3)
+
+    def test_suggestion_cache_version(self):
+        spellchecker = Spellchecker(None, "known_words.txt", "pers_dict.txt", None)
+        spellchecker.known_words = {"jolly"}
+        self.assertEqual(spellchecker.suggest("jlly"), ["jolly"])
+        self.assertEqual(spellchecker.suggest("jlly"), ["jolly"])
+        self.assertEqual(spellchecker.cache_stats()["hits"], 1)
+        spellchecker.add_known_word("jlly")
+        self.assertEqual(spellchecker.suggest("jlly"), ["jlly", "jolly"])
+        version = spellchecker.dict_version
+        spellchecker.ignore_word("xyz")
+        self.assertEqual(spellchecker.dict_version, version+1)
+
+    def test_dawg_dictionary(self):
+        class MockReferenceFile:
+            def parse(self):
+                return ["Hlly", "jlly", "and", "jolly"]
+        known_words = {"holly", "jolly", "and"}
+        spellchecker = Spellchecker(MockReferenceFile(), None, None, None, known_words=set(known_words),
+                                    dictionary="dawg", suggest_backend="dawg")
+        self.assertIsInstance(spellchecker.known_words, Dawg)
+        self.assertIs(spellchecker.suggest_index, spellchecker.known_words)
+        spellchecker.spell_check()
+        self.assertEqual(spellchecker.unknown_words, [("jlly", Suggester.get_suggestions("jlly", known_words))])
+        spellchecker.add_known_word("hlly")
+        self.assertIn("hlly", spellchecker.known_words)
+
+    def test_case_table(self):
+        class MockReferenceFile:
+            def parse(self):
+                return ["holly", "JOLLY", "christmas", "CHRISTMAS", "Nasa", "NASA", "iphone", "iPhone", "jlly"]
+        known_words = {"holly", "jolly", "Christmas", "NASA", "iPhone"}
+        table = CaseTable(known_words)
+        self.assertEqual(set(table), known_words)
+        self.assertEqual(len(table), 5)
+        self.assertIn("Christmas", table)
+        self.assertNotIn("christmas", table)
+        self.assertTrue(table.accepts("Jolly"))
+        self.assertFalse(table.accepts("Iphone"))
+        spellchecker = Spellchecker(MockReferenceFile(), None, None, None, known_words=set(known_words),
+                                    dictionary="case")
+        self.assertIsInstance(spellchecker.known_words, CaseTable)
+        spellchecker.spell_check()
+        self.assertEqual([word for word, suggestions in spellchecker.unknown_words],
+                         ["christmas", "Nasa", "iphone", "jlly"])
+        copy = table.copy()
+        copy.discard("NASA")
+        copy.discard("iPhone")
+        self.assertNotIn("NASA", copy)
+        self.assertIn("NASA", table)
+        self.assertEqual(set(copy), {"holly", "jolly", "Christmas"})
+
     def test_start_sentence(self):
         words_to_check = ["Have", "a", "holly", ",", "jolly,", "Christmas", "."]
         spellchecker = Spellchecker(reference_file, known_words_file_path,personal_dict_file_path,ignored_words_file_path)
@@ -58,6 +164,315 @@ class TestSpellchecker(unittest.TestCase):
         known_words = spellchecker.get_known_words(known_words_file_path,personal_dict_file_path)
         self.assertIsInstance(known_words, set)
     
+class TempFolderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.words_file_path = os.path.join(self.folder.name, "words.txt")
+        self.compiled_dict_path = os.path.join(self.folder.name, "words.dict")
+        self.personal_dict_file_path = os.path.join(self.folder.name, "pers_dict.txt")
+        with open(self.words_file_path, 'wt', encoding='utf-8') as words_file:
+            words_file.write("jolly\nholly\nChristmas\ncafé\njolly\n")
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+class TestCompiledDictionary(TempFolderTestCase):
+    def test_compile_and_lookup(self):
+        self.assertEqual(compile_dictionary(self.words_file_path, self.compiled_dict_path), 4)
+        known_words = CompiledDictionary(self.compiled_dict_path)
+        for word in ["jolly", "holly", "Christmas", "café"]:
+            self.assertIn(word, known_words)
+        for word in ["jlly", "christmas", "", "zzz", "a", 5]:
+            self.assertNotIn(word, known_words)
+        self.assertEqual(list(known_words), ["Christmas", "café", "holly", "jolly"])
+        known_words.add("jlly")
+        self.assertIn("jlly", known_words)
+        self.assertEqual(len(known_words), 5)
+        copy = pickle.loads(pickle.dumps(known_words))
+        self.assertIn("jlly", copy)
+        self.assertIn("holly", copy)
+        copy.close()
+        known_words.close()
+
+    def test_recompile_when_words_newer(self):
+        compile_dictionary(self.words_file_path, self.compiled_dict_path)
+        with open(self.words_file_path, 'at', encoding='utf-8') as words_file:
+            words_file.write("merry\n")
+        compiled_time = os.path.getmtime(self.compiled_dict_path)
+        os.utime(self.words_file_path, (compiled_time+10, compiled_time+10))
+        known_words = load_compiled_dictionary(self.words_file_path, self.compiled_dict_path)
+        self.assertIn("merry", known_words)
+        known_words.close()
+
+    def test_spellchecker_compiled(self):
+        class MockReferenceFile:
+            def parse(self):
+                return ["Holly", "jlly", "Christmas"]
+        spellchecker = Spellchecker(MockReferenceFile(), self.words_file_path, self.personal_dict_file_path, None,
+                                    compiled_dict_path=self.compiled_dict_path)
+        self.assertIsInstance(spellchecker.known_words, CompiledDictionary)
+        spellchecker.spell_check()
+        suggestions = Suggester.get_suggestions("jlly", {"jolly", "holly", "Christmas", "café"})
+        self.assertEqual(spellchecker.unknown_words, [("jlly", suggestions)])
+        spellchecker.known_words.close()
+
+class TestBloomFilter(TempFolderTestCase):
+    def test_bloom_filter(self):
+        words = ["word{}".format(number) for number in range(2000)]
+        bloom = BloomFilter(words, false_positive_rate=0.01)
+        for word in words:
+            self.assertIn(word, bloom)
+        false_positives = sum("other{}".format(number) in bloom for number in range(2000))
+        self.assertLess(false_positives, 80)
+        bloom_path = os.path.join(self.folder.name, "words.bloom")
+        bloom.save(bloom_path)
+        loaded = BloomFilter.load(bloom_path)
+        self.assertEqual(loaded.bits, bloom.bits)
+        self.assertEqual(loaded.false_positive_rate, 0.01)
+        self.assertIn("word7", loaded)
+
+    def test_spellchecker_bloom(self):
+        class MockReferenceFile:
+            def parse(self):
+                return ["Holly", "jlly", "Christmas"]
+        spellchecker = Spellchecker(MockReferenceFile(), self.words_file_path, self.personal_dict_file_path, None,
+                                    compiled_dict_path=self.compiled_dict_path, bloom_rate=0.01)
+        self.assertTrue(os.path.isfile(self.compiled_dict_path+".bloom"))
+        self.assertTrue(spellchecker.is_known("holly"))
+        self.assertFalse(spellchecker.is_known("jlly"))
+        spellchecker.spell_check()
+        self.assertEqual([word for word, suggestions in spellchecker.unknown_words], ["jlly"])
+        spellchecker.add_known_word("jlly")
+        self.assertTrue(spellchecker.is_known("jlly"))
+        spellchecker.known_words.close()
+
+    def test_spellchecker_bloom_reused(self):
+        options = dict(compiled_dict_path=self.compiled_dict_path, dictionary="dawg", bloom_rate=1e-6)
+        spellchecker = Spellchecker(None, self.words_file_path, self.personal_dict_file_path, None, **options)
+        spellchecker.add_personal_word("quuxly")
+        spellchecker.close_stores()
+        bloom_path = self.compiled_dict_path+".bloom"
+        os.utime(bloom_path, (time.time()+10, time.time()+10))
+        spellchecker = Spellchecker(None, self.words_file_path, self.personal_dict_file_path, None, **options)
+        self.assertNotIn("quuxly", BloomFilter.load(bloom_path))
+        self.assertTrue(spellchecker.is_known("quuxly"))
+        self.assertFalse(spellchecker.is_known("jlly"))
+
+    def test_layered_bloom_reused(self):
+        medical_path = os.path.join(self.folder.name, "medical.txt")
+        options = dict(compiled_dict_path=self.compiled_dict_path, bloom_rate=1e-6,
+                       layers=[("medical", medical_path)])
+        with open(medical_path, 'wt', encoding='utf-8') as medical_file:
+            medical_file.write("jollitis\n")
+        spellchecker = Spellchecker(None, self.words_file_path, self.personal_dict_file_path, None, **options)
+        spellchecker.known_words.layers["base"].close()
+        bloom_path = self.compiled_dict_path+".bloom"
+        self.assertNotIn("jollitis", BloomFilter.load(bloom_path))
+        with open(medical_path, 'wt', encoding='utf-8') as medical_file:
+            medical_file.write("carditis\n")
+        with open(self.personal_dict_file_path, 'wt', encoding='utf-8') as personal_file:
+            personal_file.write("zorbly\n")
+        os.utime(bloom_path, (time.time()+10, time.time()+10))
+        spellchecker = Spellchecker(None, self.words_file_path, self.personal_dict_file_path, None, **options)
+        for word in ("carditis", "zorbly", "holly"):
+            self.assertTrue(spellchecker.is_known(word))
+        self.assertFalse(spellchecker.is_known("jollitis"))
+        spellchecker.known_words.layers["base"].close()
+
+class TestDictionaryLoading(TempFolderTestCase):
+    def test_background_load(self):
+        class MockReferenceFile:
+            def parse(self):
+                return ["Holly", "jlly"]
+        spellchecker = Spellchecker(MockReferenceFile(), self.words_file_path, self.personal_dict_file_path, None,
+                                    suggest_backend="bktree", background=True)
+        self.assertIsNotNone(spellchecker.load_thread)
+        spellchecker.spell_check()
+        self.assertTrue(spellchecker.loaded.is_set())
+        self.assertIn("holly", spellchecker.known_words)
+        self.assertIsNotNone(spellchecker.suggest_index)
+        self.assertEqual([word for word, suggestions in spellchecker.unknown_words], ["jlly"])
+
+    def test_make_spellchecker(self):
+        args = argparse.Namespace(words=self.words_file_path, pd=None, ignored=None, suggester="scan",
+                                  keyboard=False, workers=1, freq=None, compiled=None, dictionary="case", bloom=None,
+                                  layer=["medical=med.txt", os.path.join("lists", "team.txt")])
+        spellchecker = spellchecker_module.make_spellchecker(args, TextFile("Jolly"), chunk_size=10)
+        self.assertEqual(spellchecker.layers, [("medical", "med.txt"), ("team", os.path.join("lists", "team.txt"))])
+        self.assertEqual(spellchecker.chunk_size, 10)
+        self.assertEqual(spellchecker.spell_check(), [])
+
+class TestWordStore(TempFolderTestCase):
+    def test_word_store(self):
+        store_path = os.path.join(self.folder.name, "pers_dict.txt")
+        with open(store_path, 'wt', encoding='utf-8') as store_file:
+            store_file.write("jolly\nholly\n"+"jolly\n"*5)
+        store = WordStore(store_path, flush_interval=60)
+        self.assertEqual(set(store), {"jolly", "holly"})
+        self.assertTrue(store.add("merry"))
+        self.assertFalse(store.add("merry"))
+        self.assertIn("merry", store)
+        with open(store_path, 'rt', encoding='utf-8') as store_file:
+            self.assertNotIn("merry", store_file.read())
+        store.flush()
+        with open(store_path, 'rt', encoding='utf-8') as store_file:
+            self.assertEqual(sorted(store_file.read().split()), ["holly", "jolly", "merry"])
+        self.assertTrue(store.add("berry"))
+        store.flush()
+        with open(store_path, 'rt', encoding='utf-8') as store_file:
+            self.assertEqual(store_file.read(), "holly\njolly\nmerry\nberry\n")
+        store.discard("holly")
+        store.close()
+        with open(store_path, 'rt', encoding='utf-8') as store_file:
+            self.assertEqual(store_file.read(), "berry\njolly\nmerry\n")
+        self.assertIsNone(store.timer)
+        store.add("holly")
+        spellchecker_module.close_word_stores()
+        with open(store_path, 'rt', encoding='utf-8') as store_file:
+            self.assertEqual(store_file.read(), "berry\njolly\nmerry\nholly\n")
+        store_ref = weakref.ref(store)
+        del store
+        gc.collect()
+        self.assertIsNone(store_ref())
+
+    def test_personal_and_ignored_words(self):
+        ignored_words_file_path = os.path.join(self.folder.name, "ign_words.txt")
+        spellchecker = Spellchecker(None, self.words_file_path, self.personal_dict_file_path, ignored_words_file_path)
+        spellchecker.add_personal_word("jlly")
+        spellchecker.ignore_word("hlly")
+        self.assertTrue(spellchecker.is_known("jlly"))
+        self.assertIn("hlly", spellchecker.ignored_words)
+        self.assertFalse(os.path.isfile(self.personal_dict_file_path))
+        spellchecker.close_stores()
+        reloaded = Spellchecker(None, self.words_file_path, self.personal_dict_file_path, ignored_words_file_path)
+        self.assertIn("jlly", reloaded.known_words)
+        self.assertIn("hlly", reloaded.ignored_words)
+
+class TestLayeredDictionary(TempFolderTestCase):
+    def test_layered_dictionary(self):
+        medical_path = os.path.join(self.folder.name, "medical.txt")
+        with open(medical_path, 'wt', encoding='utf-8') as medical_file:
+            medical_file.write("jollitis\nholly\n")
+        with open(self.personal_dict_file_path, 'wt', encoding='utf-8') as personal_file:
+            personal_file.write("jollitis\n")
+        spellchecker = Spellchecker(None, self.words_file_path, self.personal_dict_file_path, None,
+                                    suggest_backend="bktree", layers=[("medical", medical_path)])
+        known_words = spellchecker.known_words
+        self.assertIsInstance(known_words, LayeredDictionary)
+        self.assertEqual(list(known_words.layers), ["personal", "medical", "base"])
+        self.assertIs(spellchecker.suggest_index, known_words)
+        self.assertEqual(known_words.layer_of("holly"), "medical")
+        self.assertEqual(known_words.layer_of("café"), "base")
+        self.assertEqual(known_words.layer_of("jollitis"), "personal")
+        self.assertIs(next(iter(known_words.layers["personal"])),
+                      next(word for word in known_words.layers["medical"] if word == "jollitis"))
+        self.assertEqual(len(known_words), 5)
+        all_words = {"jolly", "holly", "Christmas", "café", "jollitis"}
+        self.assertEqual(set(known_words), all_words)
+        self.assertEqual(spellchecker.suggest("jolli"), Suggester.get_suggestions("jolli", all_words))
+        base_index = known_words.indexes["base"]
+        team_path = os.path.join(self.folder.name, "team.txt")
+        with open(team_path, 'wt', encoding='utf-8') as team_file:
+            team_file.write("jollo\n")
+        spellchecker.attach_layer("team", team_path)
+        self.assertEqual(list(known_words.layers), ["personal", "medical", "team", "base"])
+        self.assertIs(known_words.indexes["base"], base_index)
+        self.assertEqual(spellchecker.suggest("jolli"), Suggester.get_suggestions("jolli", all_words | {"jollo"}))
+        spellchecker.detach_layer("medical")
+        self.assertEqual(known_words.layer_of("jollitis"), "personal")
+        self.assertEqual(known_words.layer_of("holly"), "base")
+        spellchecker.add_known_word("jlly")
+        self.assertEqual(known_words.layer_of("jlly"), "personal")
+        self.assertEqual(spellchecker.suggest("jlly"), Suggester.get_suggestions("jlly", set(known_words)))
+
+    def test_attach_layer_builds_index_unlocked(self):
+        team_path = os.path.join(self.folder.name, "team.txt")
+        with open(team_path, 'wt', encoding='utf-8') as team_file:
+            team_file.write("jollo\n")
+        spellchecker = Spellchecker(None, self.words_file_path, self.personal_dict_file_path, None,
+                                    suggest_backend="bktree", layers=[("medical", team_path)])
+        spellchecker.detach_layer("medical")
+        lock_free = []
+        def try_lock():
+            lock_free.append(spellchecker.update_lock.acquire(blocking=False))
+            if lock_free[-1]:
+                spellchecker.update_lock.release()
+        def build(suggest_backend, words):
+            thread = threading.Thread(target=try_lock)
+            thread.start()
+            thread.join()
+            return BKTree(words)
+        known_words = spellchecker.known_words
+        attach = known_words.attach
+        def locked_attach(*args, **kwargs):
+            build(None, ())
+            attach(*args, **kwargs)
+        with mock.patch.object(spellchecker_module, "build_suggest_index", side_effect=build), (
+                mock.patch.object(known_words, "attach", side_effect=locked_attach)):
+            spellchecker.attach_layer("team", team_path)
+        self.assertEqual(lock_free, [True, False])
+        self.assertEqual(spellchecker.suggest("jollx"), ["jollo", "jolly", "holly"])
+        spellchecker.detach_layer("team")
+        self.assertNotIn("team", spellchecker.known_words.indexes)
+
+class TestHotReload(TempFolderTestCase):
+    def test_hot_reload(self):
+        ignored_words_file_path = os.path.join(self.folder.name, "ign_words.txt")
+        with open(self.personal_dict_file_path, 'wt', encoding='utf-8') as personal_file:
+            personal_file.write("holly\n")
+        spellchecker = Spellchecker(None, self.words_file_path, self.personal_dict_file_path, ignored_words_file_path,
+                                    suggest_backend="bktree", watch_interval=60)
+        self.assertEqual(spellchecker.watcher.check(), [])
+        self.assertEqual(spellchecker.suggest("hlly"), ["holly", "jolly", "café"])
+        spellchecker.add_known_word("hollo")
+        with open(self.words_file_path, 'wt', encoding='utf-8') as words_file:
+            words_file.write("jolly\nholly\nChristmas\nmerry\nhollo\n")
+        with open(ignored_words_file_path, 'wt', encoding='utf-8') as ignored_file:
+            ignored_file.write("hlly\n")
+        for path in (self.words_file_path, ignored_words_file_path):
+            os.utime(path, ns=(1, 1))
+        self.assertEqual(sorted(spellchecker.watcher.check()), sorted([self.words_file_path, ignored_words_file_path]))
+        self.assertIn("merry", spellchecker.known_words)
+        self.assertNotIn("café", spellchecker.known_words)
+        self.assertIn("holly", spellchecker.known_words)
+        self.assertIn("hollo", spellchecker.known_words)
+        self.assertIn("hlly", spellchecker.ignored_words)
+        self.assertEqual(spellchecker.suggest("hlly"), Suggester.get_suggestions("hlly", spellchecker.known_words))
+        self.assertNotIn("café", spellchecker.suggest("cafe"))
+        with open(self.personal_dict_file_path, 'wt', encoding='utf-8') as personal_file:
+            personal_file.write("")
+        os.utime(self.personal_dict_file_path, ns=(2, 2))
+        spellchecker.watcher.check()
+        self.assertIn("holly", spellchecker.known_words)
+        self.assertNotIn("holly", spellchecker.personal_words)
+        spellchecker.stop_watching()
+        self.assertIsNone(spellchecker.watcher)
+
+    def test_hot_reload_own_writes(self):
+        ignored_words_file_path = os.path.join(self.folder.name, "ign_words.txt")
+        spellchecker = Spellchecker(None, self.words_file_path, self.personal_dict_file_path, ignored_words_file_path,
+                                    suggest_backend="bktree", dictionary="dawg", watch_interval=60)
+        known_words = spellchecker.known_words
+        spellchecker.add_personal_word("jlly")
+        spellchecker.ignore_word("hlly")
+        spellchecker.close_stores()
+        self.assertEqual(spellchecker.watcher.check(), [])
+        spellchecker.file_snapshots[self.personal_dict_file_path] = b""
+        with mock.patch.object(spellchecker, "update_known_words") as update_known_words:
+            spellchecker.reload_file(self.personal_dict_file_path)
+        update_known_words.assert_not_called()
+        with open(self.personal_dict_file_path, 'at', encoding='utf-8') as personal_file:
+            personal_file.write("merry\n")
+        self.assertEqual(spellchecker.watcher.check(), [self.personal_dict_file_path])
+        self.assertIn("merry", spellchecker.known_words)
+        self.assertIn("merry", spellchecker.suggest("mery"))
+        with open(self.personal_dict_file_path, 'wt', encoding='utf-8') as personal_file:
+            personal_file.write("jlly\n")
+        spellchecker.watcher.check()
+        self.assertNotIn("merry", spellchecker.known_words)
+        self.assertIs(spellchecker.known_words, known_words)
+        spellchecker.stop_watching()
+
 class TestReferenceFile(unittest.TestCase):
     def test_text_parse(self):
         text = "It's the best time of the year."
@@ -77,6 +492,43 @@ class TestReferenceFile(unittest.TestCase):
         words = ["and", "everyone", "you", "meet."]
         self.assertEqual(docx_file.parse(), words)
 
+    def test_tokenize(self):
+        text = "It's the best, \"well-known\" time. Of the\nyear2 café!  Jolly"
+        tokens = list(tokenize(text))
+        self.assertEqual([(word, start) for word, offset, start in tokens],
+                         [("It's", True), ("the", False), ("best", False), ("well-known", False), ("time", False),
+                          ("Of", True), ("the", False), ("café", False), ("Jolly", True)])
+        self.assertTrue(all(text[offset:offset+len(word)] == word for word, offset, start in tokens))
+        blocks = list(text_blocks(text, 10))
+        self.assertEqual("".join(block for block, offset in blocks), text)
+        self.assertEqual(list(tokenize(blocks)), tokens)
+
+    def test_check_files(self):
+        spellchecker = Spellchecker(None, None, None, None, known_words={"jolly", "holly"})
+        with tempfile.TemporaryDirectory() as folder:
+            with open(os.path.join(folder, "a.txt"), "w") as file:
+                file.write("jolly hlly")
+            with open(os.path.join(folder, "b.htm"), "w") as file:
+                file.write("<p>Holly <b>jlly</b></p>")
+            self.assertIsInstance(open_reference_file(os.path.join(folder, "b.htm")), HTMLFile)
+            self.assertRaises(ValueError, open_reference_file, os.path.join(folder, "c.rtf"))
+            file_paths = expand_paths([os.path.join(folder, "*.t*"), os.path.join(folder, "**", "*.htm"),
+                                       os.path.join(folder, "missing.txt")])
+            self.assertEqual([os.path.basename(path) for path in file_paths], ["a.txt", "b.htm", "missing.txt"])
+            results = list(check_files(file_paths, spellchecker))
+        self.assertEqual([(result["words"], result["unknown"]) for result in results[:2]],
+                         [(2, [(6, "hlly", ["holly", "jolly"])]), (2, [(6, "jlly", ["jolly", "holly"])])])
+        self.assertIsNotNone(results[2]["error"])
+        out = io.StringIO()
+        self.assertEqual(write_results(results, out), (3, 4, 2, 1))
+        self.assertEqual([json.loads(line).get("word") for line in out.getvalue().splitlines()],
+                         ["hlly", "jlly", None])
+        spellchecker = Spellchecker(None, None, None, None, suggest_backend="bktree", known_words={"jolly", "holly"})
+        with mock.patch.object(spellchecker_module, "build_suggest_index") as build_index:
+            spellchecker_module.init_check_worker(*spellchecker.worker_initargs())
+        self.assertEqual([call.args[0] for call in build_index.call_args_list], [None])
+        self.assertIs(spellchecker_module.worker_spellchecker.suggest_index, spellchecker.suggest_index)
+
 class TestSuggester(unittest.TestCase):
     def test_get_suggestions(self):
         known_words = {"tech", "ten", "the"}
@@ -86,6 +538,265 @@ class TestSuggester(unittest.TestCase):
         suggestions = suggester.get_suggestions(unknown, known_words)
         self.assertEqual(suggestions, pos_sug)
 
+    def test_get_suggestions_batch(self):
+        class CountingIndex:
+            calls = 0
+            def suggest(self, word, limit):
+                CountingIndex.calls += 1
+                return ["jolly"][:limit]
+        known_words = {"jolly", "holly"}
+        suggestions = Suggester.get_suggestions_batch(["Jlly", "jlly", "hlly", "JLLY"], known_words, 3)
+        self.assertEqual(suggestions, {"jlly": ["jolly", "holly"], "hlly": ["holly", "jolly"]})
+        Suggester.get_suggestions_batch(["jlly"]*500, known_words, 1, CountingIndex())
+        self.assertEqual(CountingIndex.calls, 1)
+
+    def test_bktree_matches_scan(self):
+        known_words = {"the", "then", "than", "tech", "ten", "teeth", "wheat", "what", "want", "hat", "a"}
+        index = BKTree(known_words)
+        for unknown in ["teh", "waht", "ekeven", "grascvd", "x", ""]:
+            self.assertEqual(Suggester.get_suggestions(unknown, known_words, index),
+                             Suggester.get_suggestions(unknown, known_words))
+
+    def test_bktree_add_word(self):
+        known_words = {"cat", "dog"}
+        index = BKTree(known_words)
+        self.assertTrue(index.add("bat"))
+        self.assertFalse(index.add("cat"))
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.query("bat", 0), [(0, "bat")])
+
+    def test_symspell_matches_scan(self):
+        known_words = {"the", "then", "than", "tech", "ten", "teeth", "wheat", "what", "want", "hat", "a"}
+        index = SymSpellSuggester(known_words)
+        self.assertEqual(index.suggest("teh"), Suggester.get_suggestions("teh", known_words))
+        self.assertEqual(index.suggest("waht"), Suggester.get_suggestions("waht", known_words))
+
+    def test_symspell_max_distance(self):
+        index = SymSpellSuggester({"christmas", "jolly"})
+        self.assertEqual(index.suggest("chrstms"), ["christmas"])
+        self.assertEqual(index.suggest("xyzzy"), [])
+        self.assertTrue(index.add("holly"))
+        self.assertFalse(index.add("holly"))
+        self.assertEqual(index.suggest("jlly"), ["jolly", "holly"])
+
+    def test_length_buckets_matches_scan(self):
+        known_words = {"the", "then", "than", "tech", "ten", "teeth", "wheat", "what", "want", "hat", "a",
+                       "extraordinarily"}
+        index = LengthBuckets(known_words)
+        for unknown in ["teh", "waht", "ekeven", "grascvd", "extraordinary", ""]:
+            self.assertEqual(index.suggest(unknown), Suggester.get_suggestions(unknown, known_words))
+
+    def test_length_buckets_bound(self):
+        index = LengthBuckets({"the", "then", "extraordinarily"}, max_distance=1)
+        self.assertEqual(index.suggest("teh"), [])
+        self.assertTrue(index.add("tea"))
+        self.assertEqual(index.suggest("teh"), ["tea"])
+
+    def test_trie_matches_scan(self):
+        known_words = {"the", "then", "than", "tech", "ten", "teeth", "wheat", "what", "want", "hat", "a",
+                       "extraordinarily"}
+        index = SuggestionTrie(known_words)
+        for unknown in ["teh", "waht", "ekeven", "grascvd", "extraordinary", ""]:
+            self.assertEqual(index.suggest(unknown), Suggester.get_suggestions(unknown, known_words))
+
+    def test_trie_add_word(self):
+        index = SuggestionTrie({"jolly"})
+        self.assertTrue(index.add("jolt"))
+        self.assertFalse(index.add("jolly"))
+        self.assertEqual(index.nearest("jol", 2, 1), [(1, "jolt")])
+        self.assertEqual(index.nearest("jol", 2, 2), [(1, "jolt"), (2, "jolly")])
+
+    def test_keyboard_distance(self):
+        ranker = KeyboardDistance()
+        self.assertEqual(ranker.distance("what", "what"), 0)
+        self.assertEqual(ranker.distance("", "ab"), 2)
+        self.assertLess(ranker.distance("wgat", "what"), ranker.distance("wpat", "what"))
+        self.assertLess(ranker.distance("wgat", "what"), ranker.distance("wgat", "wat"))
+
+    def test_keyboard_rerank(self):
+        known_words = {"what", "wat", "wart"}
+        ranker = KeyboardDistance()
+        self.assertEqual(Suggester.get_suggestions("wgat", known_words, ranker=ranker)[0], "what")
+        index = LengthBuckets(known_words)
+        self.assertEqual(Suggester.get_suggestions("wgat", known_words, index, ranker),
+                         Suggester.get_suggestions("wgat", known_words, ranker=ranker))
+
+    @unittest.skipIf(not spellchecker_module.module_available(spellchecker_module.np), "NumPy not installed")
+    def test_numpy_matches_scan(self):
+        known_words = {"the", "then", "than", "tech", "ten", "teeth", "wheat", "what", "want", "hat", "a",
+                       "extraordinarily", "naïve"}
+        index = NumpySuggester(known_words)
+        for unknown in ["teh", "waht", "ekeven", "grascvd", "extraordinary", "naive", ""]:
+            self.assertEqual(index.suggest(unknown), Suggester.get_suggestions(unknown, known_words))
+        self.assertTrue(index.add("wat"))
+        self.assertEqual(index.suggest("waht"), Suggester.get_suggestions("waht", known_words | {"wat"}))
+
+    def test_suggestion_cache_eviction(self):
+        cache = SuggestionCache(2)
+        cache.put("a", 0, ["x"])
+        cache.put("b", 0, ["y"])
+        self.assertEqual(cache.get("a", 0), ["x"])
+        cache.put("c", 0, ["z"])
+        self.assertIsNone(cache.get("b", 0))
+        self.assertIsNone(cache.get("a", 1))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "evictions": 1, "size": 2, "maxsize": 2})
+
+    def test_suggestion_cache_copies(self):
+        cache = SuggestionCache()
+        suggestions = ["jolly", "holly"]
+        cache.put("jlly", 0, suggestions)
+        suggestions.append("folly")
+        cache.get("jlly", 0).clear()
+        self.assertEqual(cache.get("jlly", 0), ["jolly", "holly"])
+        cache.put("xqz", 0, [])
+        self.assertEqual(cache.get("xqz", 0), [])
+
+    def test_ngram_index(self):
+        self.assertEqual(NgramIndex.get_ngrams("the"), {"$$t", "$th", "the", "he$", "e$$"})
+        known_words = {"christmas", "christian", "jolly", "holly", "chris"}
+        index = NgramIndex(known_words, candidates=3)
+        self.assertEqual(index.suggest("chrismas"), Suggester.get_suggestions("chrismas", known_words))
+        self.assertTrue(index.add("christmastime"))
+        self.assertFalse(index.add("jolly"))
+        self.assertEqual(index.suggest("christmastme", 1), ["christmastime"])
+
+    def test_ngram_index_hash_seed(self):
+        script = ("from spellchecker import NgramIndex; import string; "
+                  "index = NgramIndex({first+second+'ish' for first in string.ascii_lowercase "
+                  "for second in string.ascii_lowercase}, candidates=4); "
+                  "print([index.suggest(word) for word in ('tealoish', 'zzish', 'qish')])")
+        outputs = set()
+        for seed in ("1", "2", "3"):
+            completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                                       cwd=os.path.dirname(os.path.abspath(spellchecker_module.__file__)),
+                                       env=dict(os.environ, PYTHONHASHSEED=seed))
+            self.assertEqual(completed.returncode, 0, completed.stderr)
+            self.assertTrue(completed.stdout.strip(), completed.stderr)
+            outputs.add(completed.stdout)
+        self.assertEqual(len(outputs), 1)
+
+    def test_soundex(self):
+        self.assertEqual(PhoneticIndex.soundex("Robert"), "R163")
+        self.assertEqual(PhoneticIndex.soundex("Ashcraft"), "A261")
+        self.assertEqual(PhoneticIndex.soundex("grascvd"), "G621")
+        self.assertEqual(PhoneticIndex.soundex("'"), "")
+
+    def test_phonetic_index(self):
+        index = PhoneticIndex({"grass", "grace", "glass", "eleven", "jolly"})
+        self.assertEqual(index.suggest("grascvd"), ["grace", "grass", "glass"])
+        self.assertTrue(index.add("grascv"))
+        self.assertFalse(index.add("grass"))
+        self.assertEqual(index.suggest("grascvd", 1), ["grascv"])
+        self.assertEqual(index.suggest("ekeven"), ["eleven"])
+
+    def test_frequency_table(self):
+        known_words = {"the", "then", "than", "they", "tea", "eleven"}
+        table = FrequencyTable(known_words, ["the 500", "then 20", "than 90", "tea 7", "unknown 3"])
+        self.assertEqual(table.frequency("than"), 90)
+        self.assertEqual(table.frequency("eleven"), 0)
+        self.assertIsNone(table.word_id("unknown"))
+        self.assertEqual(table.nearest("thn", 3), ["the", "than", "then"])
+        self.assertEqual(table.rerank("thn", ["then", "the", "than"]), ["the", "than", "then"])
+        ranked = FrequencyTable(known_words, ["then", "the"])
+        self.assertEqual(ranked.frequency("then"), 2)
+        self.assertTrue(table.add("thne"))
+        self.assertFalse(table.add("the"))
+        self.assertEqual(table.nearest("thne", 1), ["thne"])
+
+    def test_frequency_suggestions(self):
+        known_words = {"the", "then", "than", "they", "tea", "eleven"}
+        table = FrequencyTable(known_words, ["then 500", "than 90"])
+        scan = Suggester.get_suggestions("thn", known_words)
+        self.assertEqual(scan, ["than", "the", "then"])
+        self.assertEqual(Suggester.get_suggestions("thn", known_words, frequencies=table),
+                         ["then", "than", "the"])
+        index = build_suggest_index("bktree", known_words)
+        self.assertEqual(Suggester.get_suggestions("thn", known_words, index, frequencies=table),
+                         ["then", "than", "the"])
+
+    def test_dawg(self):
+        known_words = {"jolly", "holly", "hollies", "jollies", "tap", "taps", "top", "tops", "a", ""}
+        dawg = Dawg(known_words)
+        for word in known_words:
+            self.assertIn(word, dawg)
+        for word in ["jol", "hollys", "t", "topss", "b", None]:
+            self.assertNotIn(word, dawg)
+        self.assertEqual(list(dawg), sorted(known_words))
+        self.assertEqual(list(dawg.words_with_prefix("t")), ["tap", "taps", "top", "tops"])
+        self.assertEqual(list(dawg.words_with_prefix("x")), [])
+        self.assertLess(dawg.stats()["entries"], sum(len(word) for word in known_words))
+        for word in ["jlly", "hollie", "tp", "b", "xyzzy"]:
+            self.assertEqual(dawg.suggest(word), Suggester.get_suggestions(word, known_words))
+        self.assertTrue(dawg.add("jlly"))
+        self.assertFalse(dawg.add("jolly"))
+        self.assertIn("jlly", dawg)
+        self.assertEqual(dawg.suggest("jlly", 1), ["jlly"])
+
+class TestSuggestIndex(unittest.TestCase):
+    def test_add_known_word_updates_index(self):
+        spellchecker = Spellchecker(None, "known_words.txt", "pers_dict.txt", "ign_words.txt", suggest_backend="bktree")
+        spellchecker.add_known_word("jolly")
+        self.assertIn("jolly", spellchecker.known_words)
+        self.assertEqual(spellchecker.suggest("jlly"), ["jolly"])
+
+    def test_build_suggest_index(self):
+        self.assertIsNone(build_suggest_index("scan", {"a"}))
+        index = build_suggest_index("symspell", {"jolly", "holly"})
+        self.assertEqual(index.stats()["words"], 2)
+        self.assertGreaterEqual(index.build_time, 0)
+        with self.assertRaises(ValueError):
+            build_suggest_index("unknown", set())
+
+    def test_pruned_index_matches_rebuilt(self):
+        syllables = ["ba", "ce", "di", "fo", "gu", "ha", "je", "ki", "lo", "mu"]
+        known_words = {a+b+c for a in syllables for b in syllables for c in syllables}
+        removed = set(sorted(known_words)[::20])
+        unknowns = ["bacedx", "cedifu", "abcde", "kilomu", "hajeki", "mumumu", "bace"]
+        for suggest_backend in spellchecker_module.SUGGEST_BACKENDS:
+            index = build_suggest_index(suggest_backend, set(known_words))
+            if index is None:
+                continue
+            pruned = spellchecker_module.PrunedIndex.update(index, set(), removed)
+            rebuilt = build_suggest_index(suggest_backend, known_words-removed)
+            if suggest_backend in ("ngram", "phonetic"):
+                self.assertTrue(pruned.needs_rebuild(), suggest_backend)
+                continue
+            self.assertFalse(pruned.needs_rebuild(), suggest_backend)
+            for unknown in unknowns:
+                self.assertEqual(pruned.suggest(unknown, 5), rebuilt.suggest(unknown, 5), suggest_backend)
+
+    def test_update_rebuilds_pruned_index(self):
+        known_words = {"abide", "abode", "abcd", "abcdef", "bcde", "cade", "ace", "jolly", "holly"}
+        for suggest_backend, max_removed in (("phonetic", 100), ("bktree", 1)):
+            spellchecker = Spellchecker(None, None, None, None, known_words=set(known_words),
+                                        suggest_backend=suggest_backend)
+            spellchecker.add_known_word("abcdx")
+            with mock.patch.object(spellchecker_module.PrunedIndex, "max_removed", max_removed):
+                spellchecker.update_known_words(None, set(), {"abcd", "abcdef"})
+            self.assertNotIsInstance(spellchecker.suggest_index, spellchecker_module.PrunedIndex)
+            rebuilt = build_suggest_index(suggest_backend, known_words-{"abcd", "abcdef"} | {"abcdx"})
+            for unknown in ("abcde", "jlly", "abde"):
+                self.assertEqual(spellchecker.suggest_index.suggest(unknown), rebuilt.suggest(unknown))
+
+    def test_numpy_fallback(self):
+        with mock.patch.object(spellchecker_module, "np", None):
+            self.assertIsNone(build_suggest_index("numpy", {"jolly"}))
+
+    def test_lazy_imports(self):
+        optional = ["bs4", "fitz", "docx", "fuzzywuzzy", "googletrans", "Levenshtein", "numpy", "tkinter"]
+        completed = subprocess.run([sys.executable, "-c", "import spellchecker, sys; print(sorted(set({}) & "
+                                    "set(name.split('.')[0] for name in sys.modules)))".format(optional)],
+                                   cwd=os.path.dirname(os.path.abspath(spellchecker_module.__file__)),
+                                   capture_output=True, text=True)
+        self.assertEqual(completed.stdout.strip(), "[]")
+        missing = spellchecker_module.LazyImport("missing", "no_such_module", None, "testing", "no-such-package")
+        with self.assertRaisesRegex(ImportError, "needed for testing; install it with 'pip install no-such-package'"):
+            missing.thing
+        self.assertFalse(spellchecker_module.module_available(missing))
+        with mock.patch.object(spellchecker_module, "np", spellchecker_module.LazyImport("np", "math")):
+            self.assertEqual(spellchecker_module.np.sqrt(4), 2)
+            self.assertIs(spellchecker_module.np, math)
+
 class TestSpellcheckerApp(unittest.TestCase):
     def test_refresh(self):
         window = tk.Tk()
@@ -107,6 +818,22 @@ class TestSpellcheckerApp(unittest.TestCase):
         curr_index = spellcheckerapp.text.index(tk.INSERT)
         assert curr_index == "1.0"
 
+    def test_check_lines(self):
+        window = tk.Tk()
+        spellchecker = Spellchecker(None, None, None, None, known_words={"holly", "jolly", "and", "one", "time"})
+        spellcheckerapp = SpellcheckerApp(window, spellchecker)
+        spellcheckerapp.text.delete("1.0", tk.END)
+        spellcheckerapp.text.insert("1.0", "Holly jlly and\nwrd one.\nEvry time")
+        spellcheckerapp.highlight_unknown()
+        self.assertEqual(spellcheckerapp.highlight_indexes, [("1.6", "1.10"), ("2.0", "2.3")])
+        spellcheckerapp.text.delete("2.7")
+        spellcheckerapp.check_lines(2, 3)
+        self.assertEqual(spellcheckerapp.highlight_indexes, [("1.6", "1.10"), ("2.0", "2.3"), ("3.0", "3.4")])
+        spellcheckerapp.text.insert("1.0", "jolly\n")
+        spellcheckerapp.check_lines(1, 2)
+        self.assertEqual(spellcheckerapp.highlight_indexes, [("2.6", "2.10"), ("3.0", "3.3"), ("4.0", "4.4")])
+        window.destroy()
+
     def test_arrow_mode_activation(self):
         from tkinter import Event
         window = tk.Tk()
@@ -119,4 +846,51 @@ class TestSpellcheckerApp(unittest.TestCase):
         spellcheckerapp.on_arrow_mode(event)
         spellcheckerapp.on_arrow_mode(event)
         spellcheckerapp.on_arrow_mode(event)
-        assert spellcheckerapp.arrow_key_mode == True
\ No newline at end of file
+        assert spellcheckerapp.arrow_key_mode == True
+
+    def test_show_menu_whole_token(self):
+        app = mock.Mock()
+        app.unknown_words = ["jlly's"]
+        app.text.index.side_effect = lambda index: "1.2"
+        app.text.tag_names.return_value = ("highlight",)
+        app.text.tag_prevrange.return_value = ("1.0", "1.6")
+        app.text.get.side_effect = lambda start, end: "Jlly's" if (start, end) == ("1.0", "1.6") else "Jlly"
+        with mock.patch.object(spellchecker_module, "tk") as tk_module:
+            SpellcheckerApp.show_menu(app, mock.Mock(x=1, y=1, x_root=1, y_root=1))
+            tk_module.Menu.return_value.post.assert_called_once()
+        app.text.tag_prevrange.assert_called_with("highlight", "1.2+1c")
+        self.assertEqual(app.curr_word_pos, ("1.0", "1.6"))
+        app.text.tag_add.assert_called_with("selected", "1.0", "1.6")
+        SpellcheckerApp.accept_suggestion(app)
+        app.suggestion_menu.assert_called_once_with("Jlly's", app.spellchecker.suggest.return_value)
+
+    def test_text_modified_next_word(self):
+        app = mock.Mock()
+        app.text.edit_modified.return_value = True
+        app.text.index.return_value = "3.5"
+        app.text.search.return_value = "6.0"
+        app.dirty_lines = (2, 3)
+        app.pending_lines = None
+        app.check_timer = None
+        with mock.patch.object(spellchecker_module, "tk") as tk_module:
+            SpellcheckerApp.text_modified(app)
+            app.text.search.assert_called_with(r'[[:alpha:]]', "3.end", stopindex=tk_module.END, regexp=True)
+        self.assertEqual(app.pending_lines, (2, 6))
+        app.window.after_idle.assert_called_once_with(app.check_dirty)
+
+    def test_queue_while_loading(self):
+        app = mock.Mock()
+        app.spellchecker.loaded = spellchecker_module.threading.Event()
+        app.pending_actions = spellchecker_module.OrderedDict()
+        app.app_title = "Spellchecker"
+        calls = []
+        self.assertFalse(SpellcheckerApp.when_loaded(app, "refresh", lambda: calls.append("first")))
+        self.assertFalse(SpellcheckerApp.when_loaded(app, "refresh", lambda: calls.append("refresh")))
+        self.assertFalse(SpellcheckerApp.when_loaded(app, "report", lambda: calls.append("report")))
+        SpellcheckerApp.check_loading(app)
+        self.assertEqual(calls, [])
+        app.window.after.assert_called_with(100, app.check_loading)
+        app.spellchecker.loaded.set()
+        SpellcheckerApp.check_loading(app)
+        self.assertEqual(calls, ["refresh", "report"])
+        self.assertTrue(SpellcheckerApp.when_loaded(app, "refresh", lambda: calls.append("again")))